@@ -30,11 +30,13 @@ INSTALLED_APPS = [
 # ---------------- Middleware ----------------
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'users.middleware.QueryBudgetMiddleware',  # Per-view SQL counts (see users/querybudget.py)
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.ProfileMiddleware',  # Lazy request.role / request.profile
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -54,6 +56,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'users.context_processors.profile',
             ],
         },
     },
@@ -100,10 +103,52 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# ---------------- Private Files ----------------
+# Files that must never be served, such as onboarding intake lists with
+# plaintext passwords. Keep this outside MEDIA_ROOT and any web server alias.
+PRIVATE_FILES_ROOT = os.environ.get("PRIVATE_FILES_ROOT", str(BASE_DIR / "private"))
+
+# ---------------- Protected Media ----------------
+# Uploads are served by users.views.download_file after an access check.
+# Set to "x-accel" (nginx) or "x-sendfile" (Apache/lighttpd) to let the web
+# server stream the file; nginx needs an `internal` location at the prefix
+# aliased to MEDIA_ROOT.
+PROTECTED_MEDIA_SERVER = os.environ.get("PROTECTED_MEDIA_SERVER", "")
+PROTECTED_MEDIA_ACCEL_PREFIX = os.environ.get("PROTECTED_MEDIA_ACCEL_PREFIX", "/protected-media/")
+
 # ---------------- Email ----------------
 EMAIL_BACKEND = os.environ.get(
     "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
 )
+# With EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend, one file per connection lands here.
+EMAIL_FILE_PATH = os.environ.get("EMAIL_FILE_PATH", str(BASE_DIR / "sent_emails"))
+DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "SmartClass <no-reply@smartclass.local>")
+# Assignment notifications are sent by the worker at most this fast (0 = unthrottled).
+NOTIFICATION_RATE_PER_MINUTE = int(os.environ.get("NOTIFICATION_RATE_PER_MINUTE", "600"))
+
+# ---------------- Cache ----------------
+# Local memory by default; set DJANGO_CACHE_DIR to share one file-based cache
+# between all worker processes on the host.
+if os.environ.get("DJANGO_CACHE_DIR"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ["DJANGO_CACHE_DIR"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "smartclass",
+        }
+    }
+
+# ---------------- Query Budgets ----------------
+# Expose X-Query-Count / X-Query-Time-Ms response headers.
+QUERY_BUDGET_HEADERS = os.environ.get("QUERY_BUDGET_HEADERS", str(DEBUG)) == "True"
+# Raise QueryBudgetExceeded instead of logging a warning when a view goes over budget.
+QUERY_BUDGET_STRICT = os.environ.get("QUERY_BUDGET_STRICT", "False") == "True"
 
 # ---------------- Default Auto Field ----------------
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
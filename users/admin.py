@@ -1,13 +1,30 @@
-from django.contrib import admin
+import io
+
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+
+from .caching import bump_generations
+from .forms import StudentOnboardingForm
+from .onboarding import StudentOnboarder, queue_onboarding
 from .models import (
     Profile,
     StudentProfile,
     FacultyProfile,
     Course,
     CourseMaterial,
+    Enrollment,
     Attendance,
+    AttendanceSummary,
     Assignment,
     AssignmentSubmission,
+    Assessment,
+    CourseResult,
+    Job,
+    SemesterResult,
+    UploadSession,
 )
 
 # ---------------- Profile Admin ----------------
@@ -24,6 +41,54 @@ class StudentProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "roll_no", "department", "semester")
     search_fields = ("user__username", "user__email", "roll_no")
     list_filter = ("department", "semester")
+    change_list_template = "admin/users/studentprofile/change_list.html"
+
+    def get_urls(self):
+        return [
+            path(
+                "onboard/",
+                self.admin_site.admin_view(self.onboard_view),
+                name="users_studentprofile_onboard",
+            ),
+            *super().get_urls(),
+        ]
+
+    def onboard_view(self, request):
+        """Bulk-create student accounts from an uploaded CSV intake list.
+
+        The file is validated here, which needs no password hashing; the
+        accounts themselves are created by a background job.
+        """
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        report = None
+        if request.method == "POST":
+            form = StudentOnboardingForm(request.POST, request.FILES)
+            if form.is_valid():
+                upload = form.cleaned_data["file"]
+                lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+                report = StudentOnboarder(dry_run=True).run(lines)
+                lines.detach()  # Leave the upload open for the job to store.
+                summary = (
+                    f"{report.written} of {report.rows} students valid; "
+                    f"{report.existing} already existed, {len(report.errors)} errors."
+                )
+                if report.written and not form.cleaned_data["dry_run"]:
+                    upload.seek(0)
+                    job = queue_onboarding(upload)
+                    summary += f" Creating them in the background (job #{job.pk})."
+                level = messages.WARNING if report.errors else messages.SUCCESS
+                self.message_user(request, summary, level)
+        else:
+            form = StudentOnboardingForm()
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Onboard students",
+            "form": form,
+            "report": report,
+        }
+        return TemplateResponse(request, "admin/users/studentprofile/onboard.html", context)
 
 
 # ---------------- Faculty Profile Admin ----------------
@@ -51,6 +116,17 @@ class CourseAdmin(admin.ModelAdmin):
     list_filter = ("faculty__department",)
 
 
+# ---------------- Enrollment Admin ----------------
+@admin.register(Enrollment)
+class EnrollmentAdmin(admin.ModelAdmin):
+    list_display = ("student", "course", "semester", "status", "enrolled_at")
+    search_fields = ("student__user__username", "student__roll_no", "course__code", "course__name")
+    list_filter = ("status", "semester", "course")
+    list_select_related = ("student__user", "course")
+    raw_id_fields = ("student",)
+    readonly_fields = ("enrolled_at",)
+
+
 # ---------------- Course Materials Admin ----------------
 @admin.register(CourseMaterial)
 class CourseMaterialAdmin(admin.ModelAdmin):
@@ -70,6 +146,30 @@ class AttendanceAdmin(admin.ModelAdmin):
     date_hierarchy = "date"
     ordering = ("-date",)
 
+    # Attendance has no post_delete cache receiver (see users/caching.py).
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_generations("attendance", [obj.course_id])
+
+    def delete_queryset(self, request, queryset):
+        course_ids = list(queryset.values_list("course_id", flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        bump_generations("attendance", course_ids)
+
+
+# ---------------- Attendance Summary Admin ----------------
+@admin.register(AttendanceSummary)
+class AttendanceSummaryAdmin(admin.ModelAdmin):
+    list_display = ("student", "course", "present", "total", "percentage")
+    search_fields = ("student__user__username", "student__roll_no", "course__code")
+    list_filter = ("course",)
+    list_select_related = ("student__user", "course")
+    readonly_fields = ("student", "course", "present", "total")
+
+    def has_add_permission(self, request):
+        # Maintained from Attendance; use `manage.py attendance_summary --rebuild` to fix drift.
+        return False
+
 
 # ---------------- Assignment Admin ----------------
 @admin.register(Assignment)
@@ -90,3 +190,65 @@ class AssignmentSubmissionAdmin(admin.ModelAdmin):
     readonly_fields = ("submitted_at",)
     date_hierarchy = "submitted_at"
     ordering = ("-submitted_at",)
+
+    # Submissions have no post_delete cache receiver (see users/caching.py).
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_generations("submissions", [obj.student_id])
+
+    def delete_queryset(self, request, queryset):
+        student_ids = list(queryset.values_list("student_id", flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        bump_generations("submissions", student_ids)
+
+
+# ---------------- Upload Session Admin ----------------
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ("filename", "user", "purpose", "status", "received", "size", "updated_at", "completed_at")
+    search_fields = ("filename", "user__username")
+    list_filter = ("purpose", "status", "completed_at")
+    list_select_related = ("user",)
+    readonly_fields = ("id", "received", "parts", "status", "error", "created_at", "updated_at", "completed_at")
+
+
+# ---------------- Gradebook Admin ----------------
+@admin.register(Assessment)
+class AssessmentAdmin(admin.ModelAdmin):
+    list_display = ("title", "course", "kind", "max_marks", "weight", "position")
+    search_fields = ("title", "course__code", "course__name")
+    list_filter = ("kind",)
+    list_select_related = ("course",)
+
+
+@admin.register(CourseResult)
+class CourseResultAdmin(admin.ModelAdmin):
+    list_display = ("student", "course", "semester", "total", "grade", "rank", "published_at")
+    search_fields = ("student__user__username", "student__roll_no", "course__code")
+    list_filter = ("semester", "grade")
+    list_select_related = ("student__user", "course")
+
+
+@admin.register(SemesterResult)
+class SemesterResultAdmin(admin.ModelAdmin):
+    list_display = ("student", "semester", "credits", "sgpa", "cgpa", "rank", "published_at")
+    search_fields = ("student__user__username", "student__roll_no")
+    list_filter = ("semester",)
+    list_select_related = ("student__user",)
+
+
+# ---------------- Background Job Admin ----------------
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("task", "status", "priority", "attempts", "run_at", "finished_at", "locked_by")
+    search_fields = ("task", "last_error")
+    list_filter = ("status", "task")
+    readonly_fields = ("attempts", "locked_by", "locked_at", "locked_until", "last_error", "created_at", "finished_at")
+    actions = ["retry_now"]
+
+    @admin.action(description="Queue selected jobs to run now")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=Job.RUNNING).update(
+            status=Job.QUEUED, run_at=timezone.now(), attempts=0, finished_at=None,
+        )
+        self.message_user(request, f"Queued {updated} jobs.")
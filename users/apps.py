@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import caching  # noqa: F401  (connects the cache invalidation receivers)
+        from . import images  # noqa: F401  (registers the thumbnail job and its receiver)
+        from . import notifications  # noqa: F401  (registers the email jobs)
+        from . import onboarding  # noqa: F401  (registers the student onboarding job)
+        from . import uploads  # noqa: F401  (registers the upload assembly job)
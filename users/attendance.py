@@ -0,0 +1,146 @@
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .caching import bump_generation
+from .models import Attendance, AttendanceSummary, Course
+
+VALID_STATUSES = frozenset(value for value, _ in Attendance.STATUS_CHOICES)
+
+
+# ---------------- Bulk Writes ----------------
+def save_course_attendance(course, day, statuses, existing=None):
+    """Upsert one day of attendance for a course.
+
+    ``statuses`` maps student id -> status. ``existing`` is the
+    ``{student_id: Attendance}`` map the caller already loaded for the same
+    course and date (it is fetched here when omitted). Unchanged rows are
+    skipped and everything else is written with a single
+    INSERT ... ON CONFLICT DO UPDATE, then the course's summary counters
+    are recounted with one tally and one upsert, so a save costs the same
+    number of queries for 30 students as for 3,000. The one exception is
+    the backend's limit on bound parameters: Django splits an upsert into
+    as many INSERTs as that needs (about 250 rows each on SQLite, a single
+    statement on PostgreSQL).
+
+    Returns ``(created, updated)`` counts.
+    """
+    invalid = {status for status in statuses.values() if status not in VALID_STATUSES}
+    if invalid:
+        raise ValueError(f"Invalid attendance status: {', '.join(sorted(invalid))}")
+
+    if existing is None:
+        existing = {
+            att.student_id: att
+            for att in Attendance.objects.filter(course=course, date=day).only("id", "student_id", "status")
+        }
+
+    rows = []
+    created = updated = 0
+    for student_id, status in statuses.items():
+        current = existing.get(student_id)
+        if current is None:
+            created += 1
+        elif current.status != status:
+            updated += 1
+        else:
+            continue
+        rows.append(Attendance(student_id=student_id, course=course, date=day, status=status))
+
+    if rows:
+        with transaction.atomic():
+            Attendance.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["student", "course", "date"],
+                update_fields=["status"],
+            )
+            # bulk_create skips post_save, so keep the summary table in step here.
+            AttendanceSummary.objects.refresh(course.id)
+        bump_generation(f"attendance:{course.id}")
+    return created, updated
+
+
+# ---------------- Aggregates ----------------
+def attendance_percentage(present, total):
+    return round((present / total) * 100, 2) if total else 0
+
+
+# ---------------- Summary Reads ----------------
+def summary_course_stats(student):
+    """Per-course attendance for one student as ``{Course: stats}``, in one query on AttendanceSummary."""
+    return {
+        summary.course: {
+            "total": summary.total,
+            "present": summary.present,
+            "percentage": summary.percentage,
+        }
+        for summary in AttendanceSummary.objects.filter(student=student)
+        .select_related("course")
+        .order_by("course__code")
+    }
+
+
+def faculty_course_overview(faculty):
+    """Attendance totals for every course a faculty member teaches, from the summary table."""
+    totals = {
+        row["course"]: row
+        for row in AttendanceSummary.objects.filter(course__faculty=faculty)
+        .values("course")
+        .annotate(students=Count("student"), present=Sum("present"), total=Sum("total"))
+        .order_by()
+    }
+    overview = []
+    for course in Course.objects.filter(faculty=faculty).order_by("code"):
+        row = totals.get(course.id, {"students": 0, "present": 0, "total": 0})
+        overview.append({
+            "course": course,
+            "students": row["students"],
+            "present": row["present"],
+            "total": row["total"],
+            "percentage": attendance_percentage(row["present"], row["total"]),
+        })
+    return overview
+
+
+# ---------------- Export ----------------
+EXPORT_CHUNK_SIZE = 5000
+EXPORT_MARKS = {Attendance.PRESENT: "P", Attendance.ABSENT: "A"}
+
+
+def attendance_sheet(course, semester=None, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Student x date pivot of a course's attendance as ``(header, rows)``.
+
+    ``rows`` is a generator over a server-side ``.iterator()``: only the
+    distinct dates and the student currently being assembled are held in
+    memory, however many attendance rows the course has.
+    """
+    records = Attendance.objects.filter(course=course)
+    if semester is not None:
+        records = records.filter(student__enrollments__course=course, student__enrollments__semester=semester)
+    if start is not None:
+        records = records.filter(date__gte=start)
+    if end is not None:
+        records = records.filter(date__lte=end)
+
+    dates = list(records.order_by("date").values_list("date", flat=True).distinct())
+    columns = {day: index for index, day in enumerate(dates)}
+    header = ["roll_no", "username", *[day.isoformat() for day in dates], "present", "total", "percentage"]
+
+    def rows():
+        stream = (
+            records.order_by("student__roll_no", "student_id", "date")
+            .values_list("student_id", "student__roll_no", "student__user__username", "date", "status")
+            .iterator(chunk_size=chunk_size)
+        )
+        for _, group in groupby(stream, key=lambda rec: rec[0]):
+            cells = [""] * len(dates)
+            present = total = 0
+            for _, roll_no, username, day, status in group:
+                cells[columns[day]] = EXPORT_MARKS.get(status, status)
+                total += 1
+                present += status == Attendance.PRESENT
+            yield [roll_no or "", username, *cells, present, total, attendance_percentage(present, total)]
+
+    return header, rows()
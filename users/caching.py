@@ -0,0 +1,181 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Assignment, AssignmentSubmission, Attendance, Course, CourseMaterial, FacultyProfile
+
+# Bounds how stale a per-process (locmem) cache can get in the other workers,
+# which never see this process's invalidations.
+CATALOG_CACHE_TIMEOUT = 300
+
+
+# ---------------- Generation Counters ----------------
+# Cached values are stored under ``<name>:<generation>``. Invalidating bumps
+# the generation, which orphans every old entry at once without having to
+# know their keys; the orphans simply expire.
+def _generation_key(name):
+    return f"gen:{name}"
+
+
+def _new_generation():
+    # Time-based, so a counter that was evicted never restarts at a value
+    # an older, still-cached entry was written under.
+    return time.time_ns()
+
+
+def get_generation(name):
+    key = _generation_key(name)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def get_generations(*names):
+    """Current generation for each name, fetched with one ``get_many``."""
+    keys = {_generation_key(name): name for name in names}
+    found = cache.get_many(keys)
+    generations = {keys[key]: value for key, value in found.items()}
+    for name in names:
+        if name not in generations:
+            generations[name] = get_generation(name)
+    return generations
+
+
+def bump_generation(name):
+    key = _generation_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_generation(), timeout=None)
+
+
+def cached(name, build, generations, timeout=CATALOG_CACHE_TIMEOUT):
+    """Return ``build()`` cached under ``name`` for the given generation names."""
+    stamps = get_generations(*generations)
+    key = ":".join([name, *(str(stamps[g]) for g in generations)])
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, timeout)
+    return value
+
+
+# ---------------- Course Catalog ----------------
+# Only what the catalog shows is cached: whole User rows would put password
+# hashes into the cache, and onto disk with the file backend.
+CATALOG_FIELDS = (
+    "code", "name", "credits", "faculty__designation", "faculty__department",
+    "faculty__user__username", "faculty__user__first_name", "faculty__user__last_name",
+)
+
+
+def course_catalog():
+    """Every course with its faculty member's name, as a cached list."""
+    return cached(
+        "catalog",
+        lambda: list(
+            Course.objects.select_related("faculty__user").only(*CATALOG_FIELDS).order_by("code", "id")
+        ),
+        ["catalog"],
+    )
+
+
+def catalog_course(course_id):
+    """A course from the cached catalog, or None."""
+    return next((course for course in course_catalog() if course.id == course_id), None)
+
+
+def course_materials(course_id):
+    """A course's materials in upload order, as a cached list."""
+    return cached(
+        f"materials:{course_id}",
+        lambda: list(CourseMaterial.objects.filter(course_id=course_id).order_by("id")),
+        [f"materials:{course_id}"],
+    )
+
+
+# ---------------- Dashboard Fragments ----------------
+FRAGMENT_KINDS = ("attendance", "assignments", "materials")
+
+
+def fragment_versions(course_ids, student_id=None):
+    """Version strings for ``{% cache %}`` keys, one per ``FRAGMENT_KINDS`` entry.
+
+    Each covers the generations of that kind for every course in
+    ``course_ids`` (and the catalog), so it changes when any of them is
+    bumped or when the set of courses itself changes. With ``student_id``
+    the assignments version also follows that student's own submissions.
+    """
+    course_ids = sorted(course_ids)
+    names = ["catalog", *(f"{kind}:{cid}" for kind in FRAGMENT_KINDS for cid in course_ids)]
+    if student_id is not None:
+        names.append(f"submissions:{student_id}")
+    stamps = get_generations(*names)
+    versions = {
+        kind: ",".join([str(stamps["catalog"]), *(f"{cid}.{stamps[f'{kind}:{cid}']}" for cid in course_ids)])
+        for kind in FRAGMENT_KINDS
+    }
+    if student_id is not None:
+        versions["assignments"] += f";{stamps[f'submissions:{student_id}']}"
+    return versions
+
+
+# ---------------- Invalidation ----------------
+# Attendance and submissions are deleted by the million when a course or a
+# student goes, so they get no post_delete receiver: any receiver would make
+# Django load and signal every row instead of deleting them in one
+# statement. Deletes bump generations once per course or student instead,
+# through ``invalidate_course`` for cascades and ``bump_generations`` for
+# direct deletes (see the admin).
+def bump_generations(prefix, ids):
+    """Bump ``<prefix>:<id>`` once for each distinct id."""
+    for value in set(ids):
+        bump_generation(f"{prefix}:{value}")
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=FacultyProfile)
+@receiver(post_delete, sender=FacultyProfile)
+def invalidate_catalog(sender, **kwargs):
+    bump_generation("catalog")
+
+
+@receiver(post_save, sender=User)
+def invalidate_catalog_names(sender, instance, created=False, update_fields=None, **kwargs):
+    # The catalog shows faculty names; logins only touch last_login.
+    if not created and update_fields != frozenset(["last_login"]):
+        bump_generation("catalog")
+
+
+@receiver(post_delete, sender=Course)
+def invalidate_course(sender, instance, **kwargs):
+    bump_generation("catalog")
+    for kind in FRAGMENT_KINDS:
+        bump_generation(f"{kind}:{instance.pk}")
+
+
+@receiver(post_save, sender=CourseMaterial)
+@receiver(post_delete, sender=CourseMaterial)
+def invalidate_materials(sender, instance, **kwargs):
+    bump_generation(f"materials:{instance.course_id}")
+
+
+@receiver(post_save, sender=Attendance)
+def invalidate_attendance(sender, instance, **kwargs):
+    bump_generation(f"attendance:{instance.course_id}")
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def invalidate_assignments(sender, instance, **kwargs):
+    bump_generation(f"assignments:{instance.course_id}")
+
+
+@receiver(post_save, sender=AssignmentSubmission)
+def invalidate_submissions(sender, instance, **kwargs):
+    bump_generation(f"submissions:{instance.student_id}")
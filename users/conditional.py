@@ -0,0 +1,81 @@
+import hashlib
+from datetime import datetime, time
+
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .caching import catalog_course, course_materials
+from .models import Assignment, AssignmentSubmission, Course
+from .profiles import STUDENT, require_profile
+
+# Validators for ``django.views.decorators.http.condition``. Each page's
+# state is computed once per request and shared by its etag and
+# last_modified functions; a matching If-None-Match / If-Modified-Since
+# then gets a 304 before the view runs. The state must come from whatever
+# the body is rendered from: a page built from a cached list is validated
+# against that list, not the live tables, so the ETag never runs ahead of
+# the body it names.
+
+
+def _etag(*parts):
+    return hashlib.md5("|".join(map(str, parts)).encode(), usedforsecurity=False).hexdigest()
+
+
+def _state(request, compute):
+    if not hasattr(request, "_conditional_state"):
+        request._conditional_state = compute()
+    return request._conditional_state
+
+
+# ---------------- Course Materials ----------------
+def _materials_state(request, course_id):
+    def compute():
+        # The same cached lists view_course_materials renders; updated_at
+        # moves on any edit and the ids catch additions and deletions.
+        course = catalog_course(course_id)
+        materials = course_materials(course_id) if course else []
+        etag = _etag(
+            "materials", request.user.pk, course_id, course and (course.code, course.name),
+            *((material.id, material.updated_at) for material in materials),
+        )
+        return etag, max((material.updated_at for material in materials), default=None)
+    return _state(request, compute)
+
+
+def materials_etag(request, course_id):
+    return _materials_state(request, course_id)[0]
+
+
+def materials_last_modified(request, course_id):
+    return _materials_state(request, course_id)[1]
+
+
+# ---------------- Student Assignments ----------------
+def _assignments_state(request):
+    def compute():
+        student = require_profile(request, STUDENT)
+        today = timezone.localdate()
+        assignments = Assignment.objects.filter(course__in=Course.objects.taken_by(student)).aggregate(
+            count=Count("id"), last_id=Max("id"), latest=Max("updated_at"),
+        )
+        submissions = AssignmentSubmission.objects.filter(student=student).aggregate(
+            count=Count("id"), latest=Max("submitted_at"),
+        )
+        etag = _etag(
+            "assignments", request.user.pk, today,
+            assignments["count"], assignments["last_id"], assignments["latest"],
+            submissions["count"], submissions["latest"],
+        )
+        # Pending turns overdue at midnight, so the page is never older than today.
+        midnight = timezone.make_aware(datetime.combine(today, time.min))
+        last_modified = max(filter(None, [assignments["latest"], submissions["latest"], midnight]))
+        return etag, last_modified
+    return _state(request, compute)
+
+
+def assignments_etag(request):
+    return _assignments_state(request)[0]
+
+
+def assignments_last_modified(request):
+    return _assignments_state(request)[1]
@@ -0,0 +1,6 @@
+def profile(request):
+    """Expose the request's lazy role and profile to every template."""
+    return {
+        "role": getattr(request, "role", None),
+        "profile": getattr(request, "profile", None),
+    }
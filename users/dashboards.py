@@ -0,0 +1,53 @@
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from .attendance import faculty_course_overview, summary_course_stats
+from .caching import fragment_versions
+from .models import Assignment, Course, CourseMaterial
+from .submissions import assignment_statuses, student_assignments
+
+DASHBOARD_ITEMS = 5
+
+# Each widget's data is wrapped lazily and only evaluated inside its
+# ``{% cache %}`` block (templates/users/dashboard/), so a warm fragment
+# costs no queries beyond the course-id lookup that builds its key.
+
+
+def student_dashboard_context(student):
+    today = timezone.localdate()
+    course_ids = list(Course.objects.taken_by(student).values_list("id", flat=True))
+    return {
+        "student": student,
+        "today": today,
+        "fragment_versions": fragment_versions(course_ids, student_id=student.id),
+        "upcoming_assignments": SimpleLazyObject(lambda: assignment_statuses(
+            student_assignments(student).filter(due_date__gte=today)[:DASHBOARD_ITEMS]
+        )),
+        "attendance_summary": SimpleLazyObject(lambda: summary_course_stats(student)),
+        "recent_materials": (
+            CourseMaterial.objects.filter(course_id__in=course_ids)
+            .select_related("course")
+            .order_by("-uploaded_at", "-id")[:DASHBOARD_ITEMS]
+        ),
+    }
+
+
+def faculty_dashboard_context(faculty):
+    today = timezone.localdate()
+    course_ids = list(Course.objects.filter(faculty=faculty).values_list("id", flat=True))
+    return {
+        "faculty": faculty,
+        "today": today,
+        "fragment_versions": fragment_versions(course_ids),
+        "course_attendance": SimpleLazyObject(lambda: faculty_course_overview(faculty)),
+        "upcoming_deadlines": (
+            Assignment.objects.filter(course_id__in=course_ids, due_date__gte=today)
+            .select_related("course")
+            .order_by("due_date", "id")[:DASHBOARD_ITEMS]
+        ),
+        "recent_materials": (
+            CourseMaterial.objects.filter(course_id__in=course_ids)
+            .select_related("course")
+            .order_by("-uploaded_at", "-id")[:DASHBOARD_ITEMS]
+        ),
+    }
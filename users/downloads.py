@@ -0,0 +1,195 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.http import content_disposition_header
+
+from .models import Assignment, AssignmentSubmission, CourseMaterial, Enrollment
+from .profiles import FACULTY, STUDENT, get_profile, get_role
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+ARCHIVE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+RANGE_BLOCK_SIZE = 64 * 1024
+
+# kind in the URL -> (model, file field, select_related)
+DOWNLOADS = {
+    "material": (CourseMaterial, "file", ("course",)),
+    "assignment": (Assignment, "file", ("course",)),
+    "submission": (AssignmentSubmission, "submitted_file", ("assignment__course",)),
+}
+
+
+# ---------------- Access ----------------
+def can_download(request, kind, obj):
+    """Who may fetch a file: the course's faculty, and students as far as the pages list it.
+
+    Every student can browse every course's materials; assignment briefs
+    are only shown to students taking the course; a submission is private
+    to the student who made it.
+    """
+    role, profile = get_role(request), get_profile(request)
+    if profile is None:
+        return False
+    course = obj.assignment.course if kind == "submission" else obj.course
+    if role == FACULTY:
+        return course.faculty_id == profile.pk
+    if role == STUDENT:
+        if kind == "submission":
+            return obj.student_id == profile.pk
+        if kind == "assignment":
+            return Enrollment.objects.filter(
+                student=profile, course=course, status=Enrollment.ACTIVE
+            ).exists()
+        return True
+    return False
+
+
+# ---------------- Range Requests ----------------
+def parse_range(header, size):
+    """``(start, end)`` inclusive for a single-range ``Range`` header.
+
+    Returns None when the header is absent or not one we honour (multiple
+    ranges, other units), meaning "send the whole file"; raises ValueError
+    when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match((header or "").strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None  # Syntactically invalid: ignore, per RFC 9110.
+    else:
+        start, end = max(0, size - int(last)), size - 1
+        if int(last) == 0:
+            raise ValueError("Empty suffix range")
+    if start >= size:
+        raise ValueError("Range starts past the end of the file")
+    return start, end
+
+
+class _RangeReader:
+    """File-like view of ``length`` bytes of ``fh`` starting at its current position.
+
+    Deliberately has no ``fileno``: the WSGI server's sendfile wrapper would
+    otherwise send the file to its end instead of stopping at the range.
+    """
+
+    def __init__(self, fh, length):
+        self.fh = fh
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.fh.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.fh.close()
+
+
+# ---------------- Responses ----------------
+def _offload(field_file, filename, content_type):
+    """Hand the transfer to the web server when configured to, else None."""
+    mode = getattr(settings, "PROTECTED_MEDIA_SERVER", "")
+    if not mode:
+        return None
+    response = HttpResponse(content_type=content_type)
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    if mode == "x-accel":
+        prefix = settings.PROTECTED_MEDIA_ACCEL_PREFIX.rstrip("/")
+        # Deduplicated uploads live under blobs/, not under their field name.
+        real_name = getattr(field_file.storage, "real_name", lambda name: name)(field_file.name)
+        response["X-Accel-Redirect"] = f"{prefix}/{quote(real_name)}"
+    elif mode == "x-sendfile":
+        response["X-Sendfile"] = field_file.path
+    else:
+        raise ValueError(f"Unknown PROTECTED_MEDIA_SERVER {mode!r}")
+    return response
+
+
+def file_response(request, field_file):
+    """Stream ``field_file`` with single-range support, or delegate it to the web server."""
+    filename = os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    offloaded = _offload(field_file, filename, content_type)
+    if offloaded is not None:
+        return offloaded  # nginx / Apache handle Range themselves.
+
+    try:
+        size = field_file.size
+        fh = field_file.storage.open(field_file.name, "rb")
+    except (FileNotFoundError, OSError):
+        raise Http404("File not found.")
+
+    try:
+        byte_range = parse_range(request.headers.get("Range"), size)
+    except ValueError:
+        fh.close()
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        response = FileResponse(fh, as_attachment=True, filename=filename, content_type=content_type)
+    else:
+        start, end = byte_range
+        fh.seek(start)
+        response = FileResponse(
+            _RangeReader(fh, end - start + 1), status=206, as_attachment=True,
+            filename=filename, content_type=content_type,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
+    response.block_size = RANGE_BLOCK_SIZE
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+# ---------------- Submission Archives ----------------
+def _file_blocks(field_file):
+    with field_file.storage.open(field_file.name, "rb") as fh:
+        while True:
+            block = fh.read(RANGE_BLOCK_SIZE)
+            if not block:
+                return
+            yield block
+
+
+def _archive_name(submission):
+    ext = os.path.splitext(submission.submitted_file.name)[1].lower()
+    stem = f"{submission.student.roll_no or 'no-roll'}_{submission.student.user.username}"
+    return ARCHIVE_NAME_RE.sub("-", stem) + ARCHIVE_NAME_RE.sub("", ext)
+
+
+def submission_archive_members(assignment):
+    """``(member name, blocks)`` for each submitted file, read lazily one block at a time.
+
+    Members are named ``<roll no>_<username><ext>``. A submission whose file
+    has gone missing from storage is listed in ``MISSING.txt`` at the end
+    rather than aborting the archive half-way through the download.
+    """
+    submissions = (
+        AssignmentSubmission.objects.filter(assignment=assignment)
+        .exclude(submitted_file="")
+        .select_related("student__user")
+        .order_by("student__roll_no", "student__user__username")
+        .iterator(chunk_size=200)
+    )
+    missing = []
+    for submission in submissions:
+        name = _archive_name(submission)
+        if not submission.submitted_file.storage.exists(submission.submitted_file.name):
+            missing.append(name)
+            continue
+        yield name, _file_blocks(submission.submitted_file)
+    if missing:
+        yield "MISSING.txt", ["\n".join(["Files no longer in storage:", *missing, ""]).encode()]
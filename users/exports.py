@@ -0,0 +1,179 @@
+import csv
+import re
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+# Rows joined into each chunk handed to the WSGI server.
+CSV_ROWS_PER_CHUNK = 500
+
+
+# ---------------- CSV ----------------
+class Echo:
+    """Write target for csv.writer that returns each line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(header, rows):
+    writer = csv.writer(Echo())
+    chunk = [writer.writerow(header)]
+    for row in rows:
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= CSV_ROWS_PER_CHUNK:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def stream_csv(filename, header, rows):
+    """Stream ``rows`` (any iterable, ideally a ``.iterator()``) as a CSV download."""
+    response = StreamingHttpResponse(csv_lines(header, rows), content_type="text/csv")
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+# ---------------- ZIP ----------------
+class _ZipSink:
+    """Unseekable write target for zipfile; bytes are held only until drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def zip_chunks(members, compression=zipfile.ZIP_DEFLATED):
+    """Build a ZIP archive on the fly from ``(name, iterable of bytes)`` members.
+
+    zipfile falls back to data descriptors when it cannot seek, so each
+    member is written as its chunks arrive and the archive is yielded piece
+    by piece; only the chunk in flight is ever held in memory.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=compression, allowZip64=True) as archive:
+        for name, chunks in members:
+            info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+            info.compress_type = compression
+            with archive.open(info, "w", force_zip64=True) as member:
+                for chunk in chunks:
+                    member.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def stream_zip(filename, members, compression=zipfile.ZIP_DEFLATED):
+    """Stream ``(name, iterable of bytes)`` members as a .zip download."""
+    response = StreamingHttpResponse(zip_chunks(members, compression), content_type="application/zip")
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+# ---------------- XLSX ----------------
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_SHEET_END = "</sheetData></worksheet>"
+
+# Characters XML 1.0 does not allow, even escaped.
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_cell(value):
+    if value is None or value == "":
+        return "<c/>"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = escape(_XML_ILLEGAL.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t>{text}</t></is></c>'
+
+
+def _xlsx_sheet(header, rows):
+    chunk = [_XLSX_SHEET_START, "<row>", *map(_xlsx_cell, header), "</row>"]
+    count = 0
+    for row in rows:
+        chunk += ["<row>", *map(_xlsx_cell, row), "</row>"]
+        count += 1
+        if count % CSV_ROWS_PER_CHUNK == 0:
+            yield "".join(chunk).encode()
+            chunk = []
+    chunk.append(_XLSX_SHEET_END)
+    yield "".join(chunk).encode()
+
+
+def xlsx_chunks(header, rows, sheet_name="Sheet1"):
+    """Single-sheet .xlsx workbook streamed row by row (inline strings, no shared-string table)."""
+    # The name sits in an XML attribute, so quotes are escaped too.
+    sheet_name = escape(re.sub(r"[\[\]:*?/\\]", "-", sheet_name)[:31], {'"': "&quot;"})
+    return zip_chunks([
+        ("[Content_Types].xml", [_XLSX_CONTENT_TYPES.encode()]),
+        ("_rels/.rels", [_XLSX_ROOT_RELS.encode()]),
+        ("xl/workbook.xml", [_XLSX_WORKBOOK.format(name=sheet_name).encode()]),
+        ("xl/_rels/workbook.xml.rels", [_XLSX_WORKBOOK_RELS.encode()]),
+        ("xl/worksheets/sheet1.xml", _xlsx_sheet(header, rows)),
+    ])
+
+
+def stream_xlsx(filename, header, rows, sheet_name="Sheet1"):
+    """Stream ``rows`` as an .xlsx download without building the workbook in memory."""
+    response = StreamingHttpResponse(
+        xlsx_chunks(header, rows, sheet_name),
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
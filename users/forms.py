@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from .models import (
+    Assessment,
     StudentProfile,
     FacultyProfile,
     Assignment,
@@ -46,7 +47,7 @@ class StudentProfileForm(forms.ModelForm):
         user = profile.user
         user.email = self.cleaned_data.get("email", user.email)
         if commit:
-            user.save()
+            user.save(update_fields=["email"])
             profile.save()
         return profile
 
@@ -114,7 +115,7 @@ class FacultyProfileForm(forms.ModelForm):
             user.first_name = full_name
             user.last_name = ""
         if commit:
-            user.save()
+            user.save(update_fields=["email", "first_name", "last_name"])
             profile.save()
         return profile
 
@@ -125,8 +126,12 @@ class FacultyProfileForm(forms.ModelForm):
 class CourseForm(forms.ModelForm):
     class Meta:
         model = Course
-        fields = ["code", "name"]
+        fields = ["code", "name", "credits"]
         widgets = {
+            "credits": forms.NumberInput(attrs={
+                "min": 1,
+                "class": "w-full border p-2 rounded focus:outline-none focus:ring-2 focus:ring-blue-500",
+            }),
             "code": forms.TextInput(attrs={
                 "class": "w-full border p-2 rounded focus:outline-none focus:ring-2 focus:ring-blue-500",
                 "placeholder": "Enter course code",
@@ -196,3 +201,80 @@ class AssignmentSubmissionForm(forms.ModelForm):
                 "class": "w-full border p-2 rounded focus:outline-none focus:ring-2 focus:ring-blue-500",
             }),
         }
+
+
+# -------------------------------------------------------------------
+# Assessment Form
+# -------------------------------------------------------------------
+class AssessmentForm(forms.ModelForm):
+    class Meta:
+        model = Assessment
+        fields = ["title", "kind", "max_marks", "weight"]
+        widgets = {
+            "title": forms.TextInput(attrs={
+                "class": "w-full border p-2 rounded focus:outline-none focus:ring-2 focus:ring-blue-500",
+                "placeholder": "e.g. Mid-term exam",
+            }),
+            "kind": forms.Select(attrs={
+                "class": "w-full border p-2 rounded focus:outline-none focus:ring-2 focus:ring-blue-500",
+            }),
+            "max_marks": forms.NumberInput(attrs={
+                "min": "0.01", "step": "0.01",
+                "class": "w-full border p-2 rounded focus:outline-none focus:ring-2 focus:ring-blue-500",
+            }),
+            "weight": forms.NumberInput(attrs={
+                "min": "0.01", "step": "0.01",
+                "class": "w-full border p-2 rounded focus:outline-none focus:ring-2 focus:ring-blue-500",
+            }),
+        }
+
+    def clean_max_marks(self):
+        value = self.cleaned_data["max_marks"]
+        if value <= 0:
+            raise forms.ValidationError("Maximum marks must be positive.")
+        return value
+
+    def clean_weight(self):
+        value = self.cleaned_data["weight"]
+        if value <= 0:
+            raise forms.ValidationError("Weight must be positive.")
+        return value
+
+
+# -------------------------------------------------------------------
+# Attendance Import Form
+# -------------------------------------------------------------------
+class AttendanceImportForm(forms.Form):
+    course = forms.ModelChoiceField(
+        queryset=Course.objects.none(),
+        required=False,
+        empty_label="Use the course column in the file",
+        widget=forms.Select(attrs={
+            "class": "w-full border p-2 rounded focus:outline-none focus:ring-2 focus:ring-blue-500",
+        }),
+    )
+    file = forms.FileField(
+        label="CSV file",
+        widget=forms.ClearableFileInput(attrs={
+            "accept": ".csv,text/csv",
+            "class": "w-full border p-2 rounded focus:outline-none focus:ring-2 focus:ring-blue-500",
+        }),
+    )
+
+    def __init__(self, *args, faculty=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if faculty is not None:
+            self.fields["course"].queryset = Course.objects.filter(faculty=faculty)
+
+
+# -------------------------------------------------------------------
+# Student Onboarding Form
+# -------------------------------------------------------------------
+class StudentOnboardingForm(forms.Form):
+    file = forms.FileField(
+        label="CSV file",
+        help_text="Columns: username, roll_no and optionally password, email, first_name, "
+                  "last_name, semester, department.",
+        widget=forms.ClearableFileInput(attrs={"accept": ".csv,text/csv"}),
+    )
+    dry_run = forms.BooleanField(label="Validate only", required=False)
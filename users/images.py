@@ -0,0 +1,149 @@
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import FacultyProfile, StudentProfile
+from .tasks import task
+
+logger = logging.getLogger("users.images")
+
+VARIANT_DIR = "variants"
+# name -> (width, height, mode); "crop" fills the box, "fit" fits inside it.
+VARIANTS = {
+    "thumb": (64, 64, "crop"),
+    "avatar": (240, 240, "crop"),
+    "signature": (480, 160, "fit"),
+}
+# Which variants each profile image field gets.
+FIELD_VARIANTS = {
+    "photo": ("thumb", "avatar"),
+    "signature": ("signature",),
+}
+# format extension -> Pillow save options. WebP first: pages offer it before the JPEG fallback.
+FORMATS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "jpg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+}
+
+
+# ---------------- Names ----------------
+def variant_name(name, variant, ext):
+    """Storage name of one variant of the image stored as ``name``.
+
+    Derived from the original's name, so a new upload gets new variants and
+    cached URLs of the old ones never show the wrong picture.
+    """
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return f"{VARIANT_DIR}/{directory}/{stem}.{variant}.{ext}"
+
+
+def variant_names(name, variants):
+    return [variant_name(name, variant, ext) for variant in variants for ext in FORMATS]
+
+
+# ---------------- Rendering ----------------
+def _normalize(image):
+    """Upright RGB copy of ``image``; flattening onto white drops alpha for JPEG."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _resize(image, width, height, mode):
+    if mode == "crop":
+        return ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+    image = image.copy()
+    image.thumbnail((width, height), Image.Resampling.LANCZOS)
+    return image
+
+
+def render_variants(fh, variants):
+    """``{(variant, ext): bytes}`` for an open image file.
+
+    Nothing is copied across from the original's metadata: no EXIF (and so
+    no GPS position or camera serial), no ICC profile, no comments.
+    """
+    with Image.open(fh) as original:
+        # Decode at a reduced size straight away for JPEGs; an 8 MB phone
+        # photo then never has to be expanded at full resolution.
+        largest = max(max(VARIANTS[v][:2]) for v in variants)
+        original.draft("RGB", (largest * 2, largest * 2))
+        image = _normalize(original)
+    rendered = {}
+    for variant in variants:
+        resized = _resize(image, *VARIANTS[variant])
+        for ext, options in FORMATS.items():
+            buffer = io.BytesIO()
+            resized.save(buffer, **options)
+            rendered[variant, ext] = buffer.getvalue()
+    return rendered
+
+
+def ensure_variants(name, variants, storage=default_storage, force=False):
+    """Write the missing variants of the image stored as ``name``; return how many were written.
+
+    Unreadable or oversized images are logged and skipped: pages keep
+    showing the original until a valid one is uploaded.
+    """
+    if not name:
+        return 0
+    todo = [v for v in variants if force or not all(storage.exists(n) for n in variant_names(name, [v]))]
+    if not todo:
+        return 0
+    try:
+        with storage.open(name, "rb") as fh:
+            rendered = render_variants(fh, todo)
+    except FileNotFoundError:
+        return 0
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        logger.warning("Could not build image variants of %s: %s", name, exc)
+        return 0
+    for (variant, ext), data in rendered.items():
+        target = variant_name(name, variant, ext)
+        storage.delete(target)
+        storage.save(target, ContentFile(data))
+    return len(rendered)
+
+
+def profile_images(profile):
+    """``(storage name, variants)`` for each image set on a student or faculty profile."""
+    images = []
+    for field, variants in FIELD_VARIANTS.items():
+        file = getattr(profile, field, None)
+        if file:
+            images.append((file.name, variants))
+    return images
+
+
+# ---------------- Background Jobs ----------------
+@task(priority=10)
+def build_variants(images):
+    """Job: build variants for ``[name, variants]`` pairs, one image at a time."""
+    for name, variants in images:
+        ensure_variants(name, variants)
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_save, sender=FacultyProfile)
+def queue_variants(sender, instance, raw=False, **kwargs):
+    """Resize newly uploaded photos and signatures in the worker, not in the request."""
+    if raw:
+        return
+    # Most profile saves don't touch the images; only queue the ones not built yet.
+    images = [
+        (name, variants) for name, variants in profile_images(instance)
+        if not all(default_storage.exists(n) for n in variant_names(name, variants))
+    ]
+    if images:
+        build_variants.enqueue(images=images)
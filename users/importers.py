@@ -0,0 +1,194 @@
+import csv
+from datetime import datetime
+
+from django.db import DatabaseError, transaction
+
+from .caching import bump_generation
+from .models import Attendance, AttendanceSummary, Course, Enrollment, StudentProfile
+
+IMPORT_BATCH_SIZE = 5000
+IMPORT_DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y")
+IMPORT_STATUSES = {
+    "present": Attendance.PRESENT,
+    "p": Attendance.PRESENT,
+    "absent": Attendance.ABSENT,
+    "a": Attendance.ABSENT,
+}
+
+
+class ImportReport:
+    """Outcome of an import: row counts plus ``(line number, message)`` errors.
+
+    ``existing`` counts rows skipped because the database already held
+    them with the same status.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.written = 0
+        self.existing = 0
+        self.errors = []
+
+    @property
+    def skipped(self):
+        return self.rows - self.written
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+
+def _parse_date(value):
+    for fmt in IMPORT_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"unrecognised date {value!r}")
+
+
+class AttendanceImporter:
+    """Validate biometric CSV dumps and upsert them into Attendance in batches.
+
+    Columns: ``roll_no``, ``date``, ``status`` and, unless a fixed course
+    is given, ``course`` (the course code). Roll numbers, course codes and
+    enrollments are loaded into dicts once up front, so validating a row
+    never touches the database. Bad rows are reported and skipped; good
+    rows are diffed against the stored ones and the changes written
+    ``batch_size`` at a time with
+    INSERT ... ON CONFLICT (student, course, date) DO UPDATE.
+    """
+
+    def __init__(self, course=None, courses=None, batch_size=IMPORT_BATCH_SIZE, dry_run=False):
+        self.course = course
+        if courses is None:
+            courses = Course.objects.filter(pk=course.pk) if course else Course.objects.all()
+        # Course codes aren't unique: a code shared by several courses can't
+        # say which one a row is for, so those rows are rejected.
+        self.course_ids = {}
+        self.ambiguous_courses = set()
+        course_scope = []
+        for code, course_id in courses.values_list("code", "id").iterator():
+            if code in self.course_ids:
+                self.ambiguous_courses.add(code)
+            self.course_ids[code] = course_id
+            course_scope.append(course_id)
+        self.enrolled = set(
+            Enrollment.objects.filter(course_id__in=course_scope, status=Enrollment.ACTIVE)
+            .values_list("student_id", "course_id")
+            .iterator()
+        )
+        self.students = {}
+        self.ambiguous = set()
+        for roll_no, student_id in StudentProfile.objects.exclude(roll_no=None).values_list("roll_no", "id").iterator():
+            roll_no = roll_no.strip()
+            if roll_no in self.students:
+                self.ambiguous.add(roll_no)
+            self.students[roll_no] = student_id
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+
+    def run(self, lines):
+        """Import an iterable of CSV text lines and return an ``ImportReport``."""
+        report = ImportReport()
+        reader = csv.reader(lines)
+        try:
+            header = [name.strip().lower() for name in next(reader)]
+        except StopIteration:
+            report.error(1, "file is empty")
+            return report
+        required = {"roll_no", "date", "status"} | (set() if self.course else {"course"})
+        missing = required - set(header)
+        if missing:
+            report.error(1, f"missing column(s): {', '.join(sorted(missing))}")
+            return report
+        index = {name: header.index(name) for name in required}
+
+        batch = {}
+        for line, row in enumerate(reader, start=2):
+            if not any(cell.strip() for cell in row):
+                continue
+            report.rows += 1
+            try:
+                key, status = self.parse(row, index)
+            except ValueError as exc:
+                report.error(line, str(exc))
+                continue
+            # The same student/course/date twice in one batch: the later row wins.
+            batch[key] = (status, line)
+            if len(batch) >= self.batch_size:
+                self.flush(batch, report)
+                batch = {}
+        if batch:
+            self.flush(batch, report)
+        return report
+
+    def parse(self, row, index):
+        def cell(name):
+            try:
+                return row[index[name]].strip()
+            except IndexError:
+                raise ValueError(f"missing {name}") from None
+
+        roll_no = cell("roll_no")
+        if roll_no in self.ambiguous:
+            raise ValueError(f"roll number {roll_no!r} belongs to more than one student")
+        student_id = self.students.get(roll_no)
+        if student_id is None:
+            raise ValueError(f"unknown roll number {roll_no!r}")
+
+        if self.course:
+            course_id = self.course.pk
+        else:
+            code = cell("course")
+            if code in self.ambiguous_courses:
+                raise ValueError(f"course code {code!r} belongs to more than one course")
+            course_id = self.course_ids.get(code)
+            if course_id is None:
+                raise ValueError(f"unknown course {code!r}")
+        if (student_id, course_id) not in self.enrolled:
+            raise ValueError(f"{roll_no} is not enrolled in this course")
+
+        day = _parse_date(cell("date"))
+        raw_status = cell("status")
+        status = IMPORT_STATUSES.get(raw_status.lower())
+        if status is None:
+            raise ValueError(f"invalid status {raw_status!r}")
+        return (student_id, course_id, day), status
+
+    def flush(self, batch, report):
+        # Rows that already hold the same status are counted, not rewritten.
+        stored = {
+            (student_id, course_id, day): status
+            for student_id, course_id, day, status in Attendance.objects.filter(
+                student_id__in={key[0] for key in batch},
+                course_id__in={key[1] for key in batch},
+                date__in={key[2] for key in batch},
+            ).values_list("student_id", "course_id", "date", "status").iterator()
+        }
+        changed = {key: value for key, value in batch.items() if stored.get(key) != value[0]}
+        report.existing += len(batch) - len(changed)
+        if self.dry_run or not changed:
+            report.written += len(changed)
+            return
+        rows = [
+            Attendance(student_id=student_id, course_id=course_id, date=day, status=status)
+            for (student_id, course_id, day), (status, _) in changed.items()
+        ]
+        affected = {course_id for _, course_id, _ in changed}
+        try:
+            with transaction.atomic():
+                Attendance.objects.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=["student", "course", "date"],
+                    update_fields=["status"],
+                )
+                for course_id in affected:
+                    AttendanceSummary.objects.refresh(course_id)
+        except DatabaseError as exc:
+            for _, line in changed.values():
+                report.error(line, f"not saved: {exc}")
+            return
+        for course_id in affected:
+            bump_generation(f"attendance:{course_id}")
+        report.written += len(rows)
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from users.models import AttendanceSummary
+
+
+class Command(BaseCommand):
+    help = "Check the attendance summary table for drift, or rebuild it from raw attendance"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="Recompute every summary row from scratch.")
+        parser.add_argument("--limit", type=int, default=20, help="Mismatches to print when checking.")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            with transaction.atomic():
+                AttendanceSummary.objects.rebuild()
+            count = AttendanceSummary.objects.count()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} attendance summary rows."))
+            return
+
+        mismatches = AttendanceSummary.objects.drift()
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("Attendance summaries match raw attendance."))
+            return
+        for student_id, course_id, stored, actual in mismatches[:options["limit"]]:
+            self.stdout.write(
+                f"student={student_id} course={course_id} stored={stored} actual={actual}"
+            )
+        raise CommandError(
+            f"{len(mismatches)} attendance summary rows have drifted; run with --rebuild to fix."
+        )
@@ -0,0 +1,156 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from users.models import Assignment, AssignmentSubmission, Attendance, Course, FacultyProfile, StudentProfile
+from users.profiles import FACULTY, SESSION_KEY, STUDENT
+from users.querybudget import budget_for, count_queries
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Drive the main student and faculty pages through the test client and report latency/query counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--student", help="Username to benchmark student pages as (default: busiest student).")
+        parser.add_argument("--faculty", help="Username to benchmark faculty pages as (default: busiest faculty).")
+        parser.add_argument("--output", help="Write the JSON report to this path instead of stdout.")
+
+    def handle(self, *args, **options):
+        student = self.pick_student(options["student"])
+        faculty = self.pick_faculty(options["faculty"])
+        course = Course.objects.filter(faculty=faculty).annotate(n=Count("enrollments")).order_by("-n").first()
+        assignment = (
+            Assignment.objects.filter(course__faculty=faculty)
+            .annotate(n=Count("submissions")).order_by("-n").first()
+        )
+        student_course = Course.objects.taken_by(student).first()
+        if course is None or assignment is None or student_course is None:
+            raise CommandError("Not enough data to benchmark; run `manage.py seed_data` first.")
+
+        pages = [
+            (STUDENT, student, "student_dashboard", reverse("student_dashboard")),
+            (STUDENT, student, "courses_page", reverse("courses_page")),
+            (STUDENT, student, "view_course_materials", reverse("view_course_materials", args=[student_course.id])),
+            (STUDENT, student, "attendance_page", reverse("attendance_page")),
+            (STUDENT, student, "results_page", reverse("results_page")),
+            (STUDENT, student, "assignments_page", reverse("assignments_page")),
+            (FACULTY, faculty, "faculty_dashboard", reverse("faculty_dashboard")),
+            (FACULTY, faculty, "faculty_courses", reverse("faculty_courses")),
+            (FACULTY, faculty, "faculty_attendance", f"{reverse('faculty_attendance')}?course={course.id}"),
+            (FACULTY, faculty, "faculty_assignments", reverse("faculty_assignments")),
+            (FACULTY, faculty, "view_submissions", reverse("view_submissions", args=[assignment.id])),
+        ]
+
+        results = {}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            clients = {STUDENT: self.client_for(STUDENT, student), FACULTY: self.client_for(FACULTY, faculty)}
+            for role, profile, name, url in pages:
+                results[name] = self.run_page(clients[role], url, options["iterations"], options["warmup"])
+                results[name]["budget"] = budget_for(name)
+                self.stderr.write(
+                    f"{name:<24} p50={results[name]['p50_ms']:>8.2f}ms p95={results[name]['p95_ms']:>8.2f}ms "
+                    f"queries={results[name]['queries']} status={results[name]['status']}"
+                )
+
+        report = {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "iterations": options["iterations"],
+            "dataset": {
+                "students": StudentProfile.objects.count(),
+                "courses": Course.objects.count(),
+                "attendance": Attendance.objects.count(),
+                "submissions": AssignmentSubmission.objects.count(),
+            },
+            "views": results,
+        }
+        payload = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                fh.write(payload + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(payload)
+
+    # ---------------- Helpers ----------------
+    def pick_student(self, username):
+        qs = StudentProfile.objects.select_related("user")
+        if username:
+            try:
+                return qs.get(user__username=username)
+            except StudentProfile.DoesNotExist:
+                raise CommandError(f"No student with username {username!r}.") from None
+        student = qs.annotate(n=Count("enrollments")).order_by("-n").first()
+        if student is None:
+            raise CommandError("No students found; run `manage.py seed_data` first.")
+        return student
+
+    def pick_faculty(self, username):
+        qs = FacultyProfile.objects.select_related("user")
+        if username:
+            try:
+                return qs.get(user__username=username)
+            except FacultyProfile.DoesNotExist:
+                raise CommandError(f"No faculty member with username {username!r}.") from None
+        faculty = qs.annotate(n=Count("courses__enrollments")).order_by("-n").first()
+        if faculty is None:
+            raise CommandError("No faculty found; run `manage.py seed_data` first.")
+        return faculty
+
+    def client_for(self, role, profile):
+        # Same session state the login views leave behind.
+        client = Client(raise_request_exception=False)
+        client.force_login(profile.user)
+        session = client.session
+        session[SESSION_KEY] = [role, profile.pk]
+        session.save()
+        return client
+
+    def run_page(self, client, url, iterations, warmup):
+        for _ in range(warmup):
+            client.get(url)
+        timings, queries, status = [], [], None
+        for _ in range(iterations):
+            with count_queries() as counter:
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(counter.count)
+            status = response.status_code
+        return {
+            "url": url,
+            "status": status,
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "queries": max(queries),
+        }
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from users.images import ensure_variants, profile_images
+from users.models import FacultyProfile, StudentProfile
+
+
+class Command(BaseCommand):
+    help = "Build the resized, EXIF-free variants of profile photos and signatures uploaded before they existed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild variants that already exist.")
+
+    def handle(self, *args, **options):
+        profiles = [
+            StudentProfile.objects.exclude(Q(photo="") | Q(photo=None), Q(signature="") | Q(signature=None))
+            .only("id", "photo", "signature"),
+            FacultyProfile.objects.exclude(Q(photo="") | Q(photo=None)).only("id", "photo"),
+        ]
+        images = written = 0
+        for queryset in profiles:
+            for profile in queryset.iterator():
+                for name, variants in profile_images(profile):
+                    images += 1
+                    written += ensure_variants(name, variants, force=options["force"])
+        self.stdout.write(self.style.SUCCESS(f"Checked {images} images; wrote {written} variant files."))
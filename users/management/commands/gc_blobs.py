@@ -0,0 +1,87 @@
+import os
+import time
+from collections import Counter
+from datetime import timedelta
+from itertools import chain
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import AssignmentSubmission, CourseMaterial, StoredBlob
+from users.storage import BLOB_DIR, BLOB_TMP_DIR, blob_digest, content_addressed_storage
+
+
+class Command(BaseCommand):
+    help = "Recount references to deduplicated upload blobs and delete the ones no row uses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours", type=int, default=24,
+            help="Keep unreferenced blobs used more recently than this (uploads still in flight).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted.")
+
+    def handle(self, *args, **options):
+        storage = content_addressed_storage
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+        dry_run = options["dry_run"]
+
+        # 1. The rows are the source of truth; the counters only avoid scanning them on every delete.
+        references = Counter()
+        names = chain(
+            CourseMaterial.objects.values_list("file", flat=True).iterator(),
+            AssignmentSubmission.objects.values_list("submitted_file", flat=True).iterator(),
+        )
+        for name in names:
+            digest = blob_digest(name)
+            if digest:
+                references[digest] += 1
+
+        # 2. Blobs on disk without a row (a crash between writing and counting) get one.
+        on_disk = {}
+        root = storage.path(BLOB_DIR)
+        for directory, _, files in os.walk(root):
+            if os.path.relpath(directory, root).startswith("tmp"):
+                continue
+            for filename in files:
+                on_disk[filename] = os.path.getsize(os.path.join(directory, filename))
+        known = set(StoredBlob.objects.values_list("digest", flat=True).iterator())
+        adopted = [StoredBlob(digest=d, size=size) for d, size in on_disk.items() if d not in known]
+        if adopted and not dry_run:
+            StoredBlob.objects.bulk_create(adopted, batch_size=500)
+
+        # 3. Correct drifted counters.
+        fixed = []
+        for blob in StoredBlob.objects.only("id", "digest", "refcount").iterator():
+            actual = references.get(blob.digest, 0)
+            if blob.refcount != actual:
+                blob.refcount = actual
+                fixed.append(blob)
+        if fixed and not dry_run:
+            StoredBlob.objects.bulk_update(fixed, ["refcount"], batch_size=500)
+
+        # 4. Sweep unreferenced blobs past the grace period, plus abandoned temp files.
+        freed = deleted = 0
+        for blob in StoredBlob.objects.filter(refcount=0, last_used_at__lt=cutoff).iterator():
+            if references.get(blob.digest):
+                continue  # Only reachable in a dry run, where counters were not fixed.
+            path = storage.path(storage.blob_name(blob.digest))
+            if not dry_run:
+                if os.path.exists(path):
+                    os.remove(path)
+                blob.delete()
+            freed += blob.size
+            deleted += 1
+        tmp_dir = storage.path(BLOB_TMP_DIR)
+        if os.path.isdir(tmp_dir) and not dry_run:
+            for filename in os.listdir(tmp_dir):
+                path = os.path.join(tmp_dir, filename)
+                if os.path.getmtime(path) < time.time() - options["grace_hours"] * 3600:
+                    os.remove(path)
+
+        verb = "Would delete" if dry_run else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {deleted} unreferenced blobs ({freed / 1024 / 1024:.1f} MiB); "
+            f"{len(adopted)} adopted, {len(fixed)} counters corrected, "
+            f"{sum(references.values())} references to {len(references)} blobs."
+        ))
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.importers import IMPORT_BATCH_SIZE, AttendanceImporter
+from users.models import Course
+
+
+class Command(BaseCommand):
+    help = "Import attendance from a CSV dump (roll_no, course, date, status)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import.")
+        parser.add_argument("--course", help="Course code to use for every row; the file then needs no course column.")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing.")
+        parser.add_argument("--show-errors", type=int, default=50, help="How many row errors to print.")
+
+    def handle(self, *args, **options):
+        course = None
+        if options["course"]:
+            matches = list(Course.objects.filter(code=options["course"])[:2])
+            if not matches:
+                raise CommandError(f"Unknown course {options['course']!r}.")
+            if len(matches) > 1:
+                raise CommandError(f"Course code {options['course']!r} belongs to more than one course.")
+            course = matches[0]
+
+        started = time.perf_counter()
+        importer = AttendanceImporter(course=course, batch_size=options["batch_size"], dry_run=options["dry_run"])
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as fh:
+                report = importer.run(fh)
+        except OSError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        for line, message in report.errors[:options["show_errors"]]:
+            self.stderr.write(f"line {line}: {message}")
+        if len(report.errors) > options["show_errors"]:
+            self.stderr.write(f"... and {len(report.errors) - options['show_errors']} more errors")
+
+        verb = "Validated" if options["dry_run"] else "Imported"
+        rate = report.rows / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report.written} of {report.rows} rows in {elapsed:.2f}s ({rate:,.0f} rows/s); "
+            f"{report.existing} already up to date, {len(report.errors)} errors."
+        ))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.onboarding import ONBOARD_BATCH_SIZE, StudentOnboarder
+
+
+class Command(BaseCommand):
+    help = "Create student accounts in bulk from a CSV intake list (username, roll_no, password, ...)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to onboard.")
+        parser.add_argument("--batch-size", type=int, default=ONBOARD_BATCH_SIZE)
+        parser.add_argument("--workers", type=int, help="Password hashing processes (default: one per CPU).")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, write nothing.")
+        parser.add_argument("--show-errors", type=int, default=50, help="How many row errors to print.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        onboarder = StudentOnboarder(
+            batch_size=options["batch_size"], workers=options["workers"], dry_run=options["dry_run"]
+        )
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as fh:
+                report = onboarder.run(fh)
+        except OSError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        for line, message in report.errors[:options["show_errors"]]:
+            self.stderr.write(f"line {line}: {message}")
+        if len(report.errors) > options["show_errors"]:
+            self.stderr.write(f"... and {len(report.errors) - options['show_errors']} more errors")
+
+        verb = "Validated" if options["dry_run"] else "Created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report.written} of {report.rows} students in {elapsed:.2f}s; "
+            f"{report.existing} already existed, {len(report.errors)} errors."
+        ))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import Course
+from users.results import publish_results
+
+
+class Command(BaseCommand):
+    help = "Compute and publish course grades, SGPA, CGPA and ranks for a semester's cohort"
+
+    def add_arguments(self, parser):
+        parser.add_argument("semester", type=int)
+        parser.add_argument("--department", help="Publish only this department's students (ranks are within it).")
+
+    def handle(self, *args, **options):
+        if options["semester"] < 1:
+            raise CommandError("semester must be 1 or more")
+        started = time.perf_counter()
+        report = publish_results(options["semester"], department=options["department"])
+        elapsed = time.perf_counter() - started
+        if report.ungraded:
+            codes = Course.objects.filter(pk__in=report.ungraded).order_by("code").values_list("code", flat=True)
+            self.stderr.write(f"Skipped courses with no assessments: {', '.join(codes)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Published {report.course_results} course results for {report.students} students in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import UploadSession
+from users.uploads import purge_parts
+
+
+class Command(BaseCommand):
+    help = "Delete resumable uploads that were abandoned or finished long ago, with their stored chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=48, help="Idle time after which an upload is abandoned.")
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        stale = UploadSession.objects.filter(updated_at__lt=cutoff).only("id", "completed_at")
+        count = 0
+        for session in stale.iterator():
+            if not options["dry_run"]:
+                purge_parts(session)
+                session.delete()
+            count += 1
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {count} upload sessions idle for over {options['hours']}h."))
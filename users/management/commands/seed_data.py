@@ -0,0 +1,197 @@
+import random
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.signals import post_delete
+
+from users.caching import bump_generation
+from users.models import (
+    Assignment,
+    AssignmentSubmission,
+    Attendance,
+    AttendanceSummary,
+    Course,
+    Enrollment,
+    FacultyProfile,
+    Profile,
+    StudentProfile,
+    release_stored_blob,
+    remove_from_attendance_summary,
+)
+
+DEPARTMENTS = ["CSE", "ECE", "EEE", "MECH", "CIVIL", "IT"]
+# Every post_delete receiver on the bulk tables. While any is connected,
+# Django loads and signals each row instead of deleting them in one statement.
+BULK_DELETE_RECEIVERS = [
+    (remove_from_attendance_summary, Attendance),
+    (release_stored_blob, AssignmentSubmission),
+]
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+@contextmanager
+def without_delete_receivers():
+    """Disconnect ``BULK_DELETE_RECEIVERS`` so attendance and submissions are fast-deleted."""
+    for receiver, sender in BULK_DELETE_RECEIVERS:
+        post_delete.disconnect(receiver, sender=sender)
+    try:
+        yield
+    finally:
+        for receiver, sender in BULK_DELETE_RECEIVERS:
+            post_delete.connect(receiver, sender=sender)
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate synthetic students, courses, attendance and submissions for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=20000)
+        parser.add_argument("--faculty", type=int, default=200)
+        parser.add_argument("--courses", type=int, default=800)
+        parser.add_argument("--courses-per-student", type=int, default=5)
+        parser.add_argument("--days", type=int, default=50, help="Attendance days per enrollment.")
+        parser.add_argument("--assignments-per-course", type=int, default=5)
+        parser.add_argument("--submission-rate", type=float, default=0.8)
+        parser.add_argument("--present-rate", type=float, default=0.8)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--prefix", default="bench", help="Username/course code prefix for generated rows.")
+        parser.add_argument("--password", default="bench-password")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--flush", action="store_true", help="Delete previously generated rows first.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        prefix = options["prefix"]
+
+        existing = User.objects.filter(username__startswith=f"{prefix}_")
+        if existing.exists():
+            if not options["flush"]:
+                raise CommandError(f"Users prefixed '{prefix}_' already exist; pass --flush to regenerate.")
+            self.stdout.write("Deleting previous synthetic data...")
+            # The summary rows cascade away with their students and synthetic
+            # submissions point at no stored blob, so nothing the receivers do
+            # is needed: with them off, attendance and submissions are deleted
+            # with one statement per table rather than loaded and signalled row by row.
+            with without_delete_receivers():
+                existing.delete()
+
+        password = make_password(options["password"])  # Hashed once, shared by every account.
+        with transaction.atomic():
+            faculty_ids = self.create_faculty(prefix, options["faculty"], password)
+            student_ids = self.create_students(prefix, options["students"], password)
+            course_ids = self.create_courses(prefix, options["courses"], faculty_ids)
+            enrollments = self.create_enrollments(student_ids, course_ids, options["courses_per_student"])
+        with transaction.atomic():
+            self.create_attendance(enrollments, options["days"], options["present_rate"])
+        with transaction.atomic():
+            self.create_assignments(course_ids, enrollments, options["assignments_per_course"],
+                                    options["submission_rate"])
+        self.stdout.write(self.style.SUCCESS("Synthetic data generated."))
+
+    # ---------------- Helpers ----------------
+    def bulk_create(self, model, objs):
+        count = 0
+        for batch in batched(objs, self.batch_size):
+            model.objects.bulk_create(batch)
+            count += len(batch)
+        self.stdout.write(f"  {model.__name__}: {count} rows")
+        return count
+
+    def create_users(self, usernames, password):
+        # bulk_create sends no post_save, so Profile rows are written here instead of by the signal.
+        self.bulk_create(User, (User(username=name, email=f"{name}@example.com", password=password)
+                                for name in usernames))
+        ids = dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+        return [ids[name] for name in usernames]
+
+    # ---------------- Generators ----------------
+    def create_faculty(self, prefix, count, password):
+        user_ids = self.create_users([f"{prefix}_fac{i}" for i in range(count)], password)
+        self.bulk_create(Profile, (Profile(user_id=uid, role="faculty") for uid in user_ids))
+        self.bulk_create(FacultyProfile, (
+            FacultyProfile(user_id=uid, employee_id=f"{prefix.upper()}-F{i:05d}",
+                           department=DEPARTMENTS[i % len(DEPARTMENTS)])
+            for i, uid in enumerate(user_ids)
+        ))
+        return list(FacultyProfile.objects.filter(user__username__startswith=f"{prefix}_fac")
+                    .values_list("id", flat=True))
+
+    def create_students(self, prefix, count, password):
+        user_ids = []
+        for chunk in batched(range(count), self.batch_size):
+            user_ids += self.create_users([f"{prefix}_stu{i}" for i in chunk], password)
+        self.bulk_create(Profile, (Profile(user_id=uid, role="student") for uid in user_ids))
+        self.bulk_create(StudentProfile, (
+            StudentProfile(user_id=uid, roll_no=f"{prefix.upper()}{i:06d}", semester=1 + i % 8,
+                           department=DEPARTMENTS[i % len(DEPARTMENTS)])
+            for i, uid in enumerate(user_ids)
+        ))
+        return list(StudentProfile.objects.filter(user__username__startswith=f"{prefix}_stu")
+                    .values_list("id", "semester").iterator())
+
+    def create_courses(self, prefix, count, faculty_ids):
+        self.bulk_create(Course, (
+            Course(code=f"{prefix.upper()}{i:04d}", name=f"Course {i}", faculty_id=faculty_ids[i % len(faculty_ids)])
+            for i in range(count)
+        ))
+        bump_generation("catalog")  # bulk_create skips the invalidation signals.
+        return list(Course.objects.filter(code__startswith=prefix.upper(), faculty_id__in=faculty_ids)
+                    .values_list("id", flat=True))
+
+    def create_enrollments(self, students, course_ids, per_student):
+        per_student = min(per_student, len(course_ids))
+        enrollments = [
+            (student_id, course_id, semester)
+            for student_id, semester in students
+            for course_id in self.rng.sample(course_ids, per_student)
+        ]
+        self.bulk_create(Enrollment, (
+            Enrollment(student_id=sid, course_id=cid, semester=semester) for sid, cid, semester in enrollments
+        ))
+        return enrollments
+
+    def create_attendance(self, enrollments, days, present_rate):
+        start = date.today() - timedelta(days=days)
+        dates = [start + timedelta(days=n) for n in range(days)]
+        rng = self.rng
+        self.bulk_create(Attendance, (
+            Attendance(student_id=sid, course_id=cid, date=day,
+                       status=Attendance.PRESENT if rng.random() < present_rate else Attendance.ABSENT)
+            for sid, cid, _ in enrollments
+            for day in dates
+        ))
+        # Bulk inserts skip the summary signals; recount once at the end instead.
+        AttendanceSummary.objects.rebuild(batch_size=self.batch_size)
+
+    def create_assignments(self, course_ids, enrollments, per_course, submission_rate):
+        today = date.today()
+        self.bulk_create(Assignment, (
+            Assignment(course_id=cid, title=f"Assignment {n + 1}",
+                       due_date=today + timedelta(days=self.rng.randint(-30, 30)))
+            for cid in course_ids
+            for n in range(per_course)
+        ))
+        by_course = {}
+        for assignment_id, course_id in Assignment.objects.filter(course_id__in=course_ids).values_list(
+            "id", "course_id"
+        ).iterator():
+            by_course.setdefault(course_id, []).append(assignment_id)
+        rng = self.rng
+        self.bulk_create(AssignmentSubmission, (
+            AssignmentSubmission(assignment_id=aid, student_id=sid,
+                                 submitted_file=f"assignment_submissions/synthetic/{aid}_{sid}.pdf")
+            for sid, cid, _ in enrollments
+            for aid in by_course.get(cid, ())
+            if rng.random() < submission_rate
+        ))
@@ -0,0 +1,97 @@
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from users.tasks import claim_jobs, purge_finished, requeue_stale, run_job
+
+# How often the worker requeues stale jobs and purges old finished ones.
+HOUSEKEEPING_INTERVAL = 300
+
+
+def _run_in_thread(job):
+    try:
+        return run_job(job)
+    finally:
+        # Each pool thread has its own connection; don't leave it open between jobs.
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (thumbnails, notification emails, ...) until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2, help="Jobs run at the same time, one per thread.")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Run the jobs that are due now, then exit.")
+        parser.add_argument("--keep-days", type=int, default=7, help="Delete finished jobs older than this.")
+
+    def handle(self, *args, **options):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stopping.set())
+            signal.signal(signal.SIGINT, lambda *_: self.stopping.set())
+        self.keep = timedelta(days=options["keep_days"])
+        self.last_housekeeping = 0
+
+        if options["concurrency"] <= 1:
+            done = self.run_inline(options)
+        else:
+            done = self.run_pool(options)
+        self.stdout.write(self.style.SUCCESS(f"Worker {self.worker_id} ran {done} jobs."))
+
+    def housekeeping(self):
+        if time.monotonic() - self.last_housekeeping < HOUSEKEEPING_INTERVAL:
+            return
+        self.last_housekeeping = time.monotonic()
+        requeued = requeue_stale()
+        if requeued:
+            self.stderr.write(f"Requeued {requeued} jobs left running by a stopped worker.")
+        purge_finished(self.keep)
+
+    def run_inline(self, options):
+        """One job at a time in this thread."""
+        done = 0
+        while not self.stopping.is_set():
+            close_old_connections()
+            self.housekeeping()
+            jobs = claim_jobs(self.worker_id, 1)
+            if not jobs:
+                if options["once"]:
+                    break
+                self.stopping.wait(options["poll_interval"])
+                continue
+            run_job(jobs[0])
+            done += 1
+        return done
+
+    def run_pool(self, options):
+        """Keep up to ``--concurrency`` jobs running in a thread pool; claim only for free slots."""
+        done = 0
+        running = set()
+        with ThreadPoolExecutor(max_workers=options["concurrency"], thread_name_prefix="job") as pool:
+            while not self.stopping.is_set():
+                close_old_connections()
+                self.housekeeping()
+                free = options["concurrency"] - len(running)
+                jobs = claim_jobs(self.worker_id, free) if free else []
+                running.update(pool.submit(_run_in_thread, job) for job in jobs)
+                if not running:
+                    if options["once"]:
+                        break
+                    self.stopping.wait(options["poll_interval"])
+                    continue
+                # Wake up when a slot frees, or poll again for newly due jobs.
+                finished, running = wait(running, timeout=options["poll_interval"], return_when=FIRST_COMPLETED)
+                done += len(finished)
+            # Let in-flight jobs finish; anything unclaimed stays queued for the next worker.
+            finished, _ = wait(running)
+            done += len(finished)
+        return done
@@ -0,0 +1,72 @@
+import logging
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+
+from .profiles import get_profile, get_role
+from .querybudget import QueryBudgetExceeded, budget_for, count_queries
+
+logger = logging.getLogger("users.querybudget")
+
+
+# ---------------- Profile ----------------
+class ProfileMiddleware:
+    """Attach lazy ``request.role`` and ``request.profile`` for the logged-in user.
+
+    Nothing is queried unless a view or template reads them, and then only
+    once per request. Must come after AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.role = SimpleLazyObject(lambda: get_role(request))
+        request.profile = SimpleLazyObject(lambda: get_profile(request))
+        return self.get_response(request)
+
+
+# ---------------- Query Budget ----------------
+class QueryBudgetMiddleware:
+    """Count the SQL issued by each request and compare it with the view's budget.
+
+    Place near the top of MIDDLEWARE so session and auth queries are
+    included. Adds ``X-Query-Count``/``X-Query-Time-Ms`` headers when
+    ``QUERY_BUDGET_HEADERS`` is on and logs a warning for requests that go
+    over the budget declared in ``users.querybudget.QUERY_BUDGETS``; with
+    ``QUERY_BUDGET_STRICT`` on (tests, CI) the request raises instead.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.headers = getattr(settings, "QUERY_BUDGET_HEADERS", settings.DEBUG)
+        self.strict = getattr(settings, "QUERY_BUDGET_STRICT", False)
+
+    def __call__(self, request):
+        with count_queries() as counter:
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        url_name = match.url_name if match else None
+        budget = budget_for(url_name)
+        elapsed_ms = round(counter.duration * 1000, 2)
+
+        if self.headers:
+            response["X-Query-Count"] = str(counter.count)
+            response["X-Query-Time-Ms"] = str(elapsed_ms)
+            if budget is not None:
+                response["X-Query-Budget"] = str(budget)
+
+        if budget is not None and counter.count > budget:
+            message = "%s %s (%s) ran %d queries in %.2f ms, over its budget of %d" % (
+                request.method, request.path, url_name, counter.count, elapsed_ms, budget,
+            )
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        else:
+            logger.debug(
+                "%s %s (%s) ran %d queries in %.2f ms",
+                request.method, request.path, url_name, counter.count, elapsed_ms,
+            )
+        return response
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Count, IntegerField, Sum, When
+
+
+def populate_summaries(apps, schema_editor):
+    Attendance = apps.get_model('users', 'Attendance')
+    AttendanceSummary = apps.get_model('users', 'AttendanceSummary')
+    rows = (
+        Attendance.objects.order_by()
+        .values('student', 'course')
+        .annotate(
+            total=Count('id'),
+            present=Sum(Case(When(status='Present', then=1), default=0, output_field=IntegerField())),
+        )
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=2000):
+        batch.append(AttendanceSummary(student_id=row['student'], course_id=row['course'],
+                                       present=row['present'], total=row['total']))
+        if len(batch) >= 2000:
+            AttendanceSummary.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        AttendanceSummary.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0023_enrollment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='users.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_summaries', to='users.studentprofile')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('student', 'course'), name='unique_attendance_summary')],
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
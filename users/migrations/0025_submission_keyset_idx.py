@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0024_attendancesummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignmentsubmission',
+            index=models.Index(fields=['assignment', 'submitted_at', 'id'], name='submission_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:05
+
+from django.db import migrations
+
+
+def sync_roles(apps, schema_editor):
+    # Faculty registered before the role sync kept the default 'student' role.
+    Profile = apps.get_model('users', 'Profile')
+    FacultyProfile = apps.get_model('users', 'FacultyProfile')
+    Profile.objects.filter(
+        user_id__in=FacultyProfile.objects.values('user_id')
+    ).exclude(role='faculty').update(role='faculty')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0025_submission_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(sync_roles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 17:55
+
+import django.utils.timezone
+import users.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0028_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='assignmentsubmission',
+            name='submitted_file',
+            field=models.FileField(blank=True, max_length=255, null=True, storage=users.storage.upload_storage, upload_to='assignment_submissions/'),
+        ),
+        migrations.AlterField(
+            model_name='coursematerial',
+            name='file',
+            field=models.FileField(max_length=255, storage=users.storage.upload_storage, upload_to='course_materials/'),
+        ),
+    ]
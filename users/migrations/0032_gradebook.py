@@ -0,0 +1,99 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0031_notification_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='credits',
+            field=models.PositiveSmallIntegerField(default=3),
+        ),
+        migrations.CreateModel(
+            name='Assessment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('kind', models.CharField(choices=[('quiz', 'Quiz'), ('assignment', 'Assignment'), ('midterm', 'Mid-term'), ('final', 'Final exam'), ('lab', 'Lab'), ('other', 'Other')], default='other', max_length=20)),
+                ('max_marks', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('weight', models.DecimalField(decimal_places=2, help_text='Relative weight in the course total.', max_digits=5)),
+                ('position', models.PositiveSmallIntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assessments', to='users.course')),
+            ],
+            options={
+                'ordering': ['position', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CourseResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.PositiveIntegerField()),
+                ('total', models.DecimalField(decimal_places=2, help_text='Weighted percentage.', max_digits=5)),
+                ('grade', models.CharField(max_length=2)),
+                ('grade_point', models.PositiveSmallIntegerField()),
+                ('rank', models.PositiveIntegerField()),
+                ('published_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='users.course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='course_results', to='users.studentprofile')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Mark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marks', to='users.assessment')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='marks', to='users.studentprofile')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SemesterResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.PositiveIntegerField()),
+                ('credits', models.PositiveIntegerField()),
+                ('sgpa', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('cgpa', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('rank', models.PositiveIntegerField()),
+                ('published_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='semester_results', to='users.studentprofile')),
+            ],
+            options={
+                'ordering': ['semester'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='assessment',
+            constraint=models.CheckConstraint(condition=models.Q(('max_marks__gt', 0)), name='assessment_max_marks_positive'),
+        ),
+        migrations.AddConstraint(
+            model_name='assessment',
+            constraint=models.CheckConstraint(condition=models.Q(('weight__gt', 0)), name='assessment_weight_positive'),
+        ),
+        migrations.AddIndex(
+            model_name='courseresult',
+            index=models.Index(fields=['student', 'semester'], name='course_result_student_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='courseresult',
+            constraint=models.UniqueConstraint(fields=('student', 'course', 'semester'), name='unique_course_result'),
+        ),
+        migrations.AddConstraint(
+            model_name='mark',
+            constraint=models.UniqueConstraint(fields=('assessment', 'student'), name='unique_mark'),
+        ),
+        migrations.AddConstraint(
+            model_name='semesterresult',
+            constraint=models.UniqueConstraint(fields=('student', 'semester'), name='unique_semester_result'),
+        ),
+    ]
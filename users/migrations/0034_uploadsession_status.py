@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:21
+
+from django.db import migrations, models
+
+
+def mark_completed(apps, schema_editor):
+    # Sessions completed before assembly moved to a job were assembled in the request.
+    UploadSession = apps.get_model('users', 'UploadSession')
+    UploadSession.objects.exclude(completed_at=None).update(status='done')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0033_coursematerial_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='uploadsession',
+            name='status',
+            field=models.CharField(choices=[('receiving', 'Receiving chunks'), ('assembling', 'Assembling'), ('done', 'Done'), ('failed', 'Failed')], default='receiving', max_length=12),
+        ),
+        migrations.RunPython(mark_completed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:02
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def lease_running_jobs(apps, schema_editor):
+    # Jobs already running keep the hour they had under the old stale cut-off.
+    Job = apps.get_model('users', 'Job')
+    Job.objects.filter(status='running').exclude(locked_at=None).update(
+        locked_until=F('locked_at') + timedelta(hours=1),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0034_uploadsession_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='locked_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(lease_running_jobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:44
+
+from django.db import migrations, models
+
+
+def acknowledge_finished(apps, schema_editor):
+    # Finished sessions were announced by every poll until now.
+    UploadSession = apps.get_model('users', 'UploadSession')
+    UploadSession.objects.filter(status='done').update(acknowledged=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0035_job_locked_until'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='acknowledged',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(acknowledge_finished, migrations.RunPython.noop),
+    ]
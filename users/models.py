@@ -1,7 +1,14 @@
+import uuid
+from datetime import datetime, time, timedelta
+
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models import Case, Count, Exists, F, IntegerField, OuterRef, Sum, When
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from django.utils import timezone
+
+from .storage import blob_digest, upload_storage
 
 # ---------------- User Profile ----------------
 class Profile(models.Model):
@@ -14,6 +21,19 @@ class Profile(models.Model):
 
 
 # ---------------- Student ----------------
+class StudentProfileQuerySet(models.QuerySet):
+    def enrolled_in(self, course, semester=None):
+        """Active roster of a course, resolved through the enrollment index.
+
+        An ``EXISTS`` rather than a join: every condition applies to the same
+        enrollment row, and a student is listed once however many rows match.
+        """
+        enrollments = Enrollment.objects.filter(student=OuterRef('pk'), course=course, status=Enrollment.ACTIVE)
+        if semester is not None:
+            enrollments = enrollments.filter(semester=semester)
+        return self.filter(Exists(enrollments))
+
+
 class StudentProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='studentprofile')
     roll_no = models.CharField(max_length=50, blank=True, null=True)
@@ -27,6 +47,8 @@ class StudentProfile(models.Model):
     photo = models.ImageField(upload_to='student_photos/', blank=True, null=True)
     signature = models.ImageField(upload_to='student_signatures/', blank=True, null=True)
 
+    objects = StudentProfileQuerySet.as_manager()
+
     def __str__(self):
         return f"StudentProfile: {self.user.username}"
 
@@ -53,43 +75,202 @@ class FacultyProfile(models.Model):
 
 
 # ---------------- Courses ----------------
+class CourseQuerySet(models.QuerySet):
+    def taken_by(self, student, semester=None):
+        """Courses a student is actively enrolled in, each listed once (see ``enrolled_in``)."""
+        enrollments = Enrollment.objects.filter(course=OuterRef('pk'), student=student, status=Enrollment.ACTIVE)
+        if semester is not None:
+            enrollments = enrollments.filter(semester=semester)
+        return self.filter(Exists(enrollments))
+
+
 class Course(models.Model):
     code = models.CharField(max_length=20)
     name = models.CharField(max_length=100)
     faculty = models.ForeignKey(FacultyProfile, on_delete=models.CASCADE, related_name="courses")
+    credits = models.PositiveSmallIntegerField(default=3)
+
+    objects = CourseQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.code} - {self.name}"
 
 
+# ---------------- Enrollment ----------------
+class Enrollment(models.Model):
+    ACTIVE = 'active'
+    DROPPED = 'dropped'
+    COMPLETED = 'completed'
+    STATUS_CHOICES = ((ACTIVE, 'Active'), (DROPPED, 'Dropped'), (COMPLETED, 'Completed'))
+
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="enrollments")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="enrollments")
+    semester = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=ACTIVE)
+    enrolled_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'course', 'semester'], name='unique_enrollment'),
+            # A student sits in a course once at a time, so roster joins never fan out.
+            models.UniqueConstraint(
+                fields=['student', 'course'],
+                condition=models.Q(status='active'),
+                name='unique_active_enrollment',
+            ),
+        ]
+        indexes = [
+            # Roster lookups: WHERE course = ? AND status = ? -> student ids.
+            models.Index(fields=['course', 'status', 'student'], name='enrollment_roster_idx'),
+            # Student course lists: WHERE student = ? AND status = ? -> course ids.
+            models.Index(fields=['student', 'status', 'course'], name='enrollment_courses_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.user.username} - {self.course.code} (sem {self.semester}, {self.status})"
+
+
 # ---------------- Course Materials ----------------
 class CourseMaterial(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="materials")
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
-    file = models.FileField(upload_to="course_materials/")
+    file = models.FileField(upload_to="course_materials/", storage=upload_storage, max_length=255)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.title} ({self.course.code})"
 
 
 # ---------------- Attendance ----------------
+class AttendanceQuerySet(models.QuerySet):
+    def tally(self, *group_fields):
+        """Group rows by ``group_fields`` with ``total`` and ``present`` counts per group."""
+        return self.order_by().values(*group_fields).annotate(
+            total=Count('id'),
+            present=Sum(Case(When(status=Attendance.PRESENT, then=1), default=0, output_field=IntegerField())),
+        )
+
+
 class Attendance(models.Model):
+    PRESENT = 'Present'
+    ABSENT = 'Absent'
+    STATUS_CHOICES = ((PRESENT, 'Present'), (ABSENT, 'Absent'))
+
     student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="attendances")
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="attendances")
     date = models.DateField()
-    status = models.CharField(max_length=10, choices=(('Present', 'Present'), ('Absent', 'Absent')))
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+
+    objects = AttendanceQuerySet.as_manager()
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['student', 'course', 'date'], name='unique_attendance')
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so the summary signal can compute deltas.
+        instance._loaded = (instance.__dict__.get('student_id'), instance.__dict__.get('course_id'),
+                            instance.__dict__.get('status'))
+        return instance
+
     def __str__(self):
         return f"{self.student.user.username} - {self.course.code} - {self.date} - {self.status}"
 
 
+# ---------------- Attendance Summary ----------------
+class AttendanceSummaryQuerySet(models.QuerySet):
+    def apply_delta(self, student_id, course_id, present=0, total=0):
+        """Shift one student-course counter by the given amounts."""
+        updated = self.filter(student_id=student_id, course_id=course_id).update(
+            present=F('present') + present, total=F('total') + total,
+        )
+        if not updated:
+            self.refresh(course_id, [student_id])
+
+    def refresh(self, course_id, student_ids=None):
+        """Recompute a course's counters from raw rows: one tally, one upsert, one cleanup.
+
+        Without ``student_ids`` the whole course is recounted, so bulk writes
+        cost the same queries however many students they touched; pass ids
+        only for the odd student, as the signal handlers do.
+        """
+        records = Attendance.objects.filter(course_id=course_id)
+        counters = self.filter(course_id=course_id)
+        if student_ids is not None:
+            records = records.filter(student_id__in=student_ids)
+            counters = counters.filter(student_id__in=student_ids)
+        rows = [
+            AttendanceSummary(student_id=row['student'], course_id=course_id,
+                              present=row['present'], total=row['total'])
+            for row in records.tally('student')
+        ]
+        if rows:
+            self.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['student', 'course'],
+                update_fields=['present', 'total'],
+            )
+        # Counters for students who no longer have any rows in the course.
+        counters.exclude(student_id__in=records.values('student_id')).delete()
+
+    def rebuild(self, batch_size=2000):
+        """Throw every counter away and recompute them from Attendance."""
+        self.all().delete()
+        batch = []
+        for row in Attendance.objects.tally('student', 'course').iterator(chunk_size=batch_size):
+            batch.append(AttendanceSummary(student_id=row['student'], course_id=row['course'],
+                                           present=row['present'], total=row['total']))
+            if len(batch) >= batch_size:
+                self.bulk_create(batch)
+                batch = []
+        if batch:
+            self.bulk_create(batch)
+
+    def drift(self):
+        """List ``(student_id, course_id, stored, actual)`` for every counter that is wrong."""
+        actual = {
+            (row['student'], row['course']): (row['present'], row['total'])
+            for row in Attendance.objects.tally('student', 'course').iterator()
+        }
+        mismatches = []
+        for student_id, course_id, present, total in self.values_list(
+            'student_id', 'course_id', 'present', 'total'
+        ).iterator():
+            expected = actual.pop((student_id, course_id), (0, 0))
+            if expected != (present, total):
+                mismatches.append((student_id, course_id, (present, total), expected))
+        for (student_id, course_id), expected in actual.items():
+            mismatches.append((student_id, course_id, None, expected))
+        return mismatches
+
+
+class AttendanceSummary(models.Model):
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="attendance_summaries")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="attendance_summaries")
+    present = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+
+    objects = AttendanceSummaryQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'course'], name='unique_attendance_summary')
+        ]
+
+    @property
+    def percentage(self):
+        return round((self.present / self.total) * 100, 2) if self.total else 0
+
+    def __str__(self):
+        return f"{self.student_id} - {self.course_id}: {self.present}/{self.total}"
+
+
 # ---------------- Assignment ----------------
 class Assignment(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="assignments")
@@ -97,6 +278,15 @@ class Assignment(models.Model):
     description = models.TextField(blank=True, null=True)
     due_date = models.DateField()
     file = models.FileField(upload_to='assignments/', blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def deadline(self):
+        """First moment after the due date, in the current time zone."""
+        return timezone.make_aware(datetime.combine(self.due_date + timedelta(days=1), time.min))
+
+    def is_late(self, submitted_at):
+        return submitted_at >= self.deadline
 
     def __str__(self):
         return f"{self.title} ({self.course.name})"
@@ -106,27 +296,291 @@ class Assignment(models.Model):
 class AssignmentSubmission(models.Model):
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE, related_name="submissions")
     student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name="assignment_submissions")
-    submitted_file = models.FileField(upload_to='assignment_submissions/', blank=True, null=True)
+    submitted_file = models.FileField(
+        upload_to='assignment_submissions/', storage=upload_storage, max_length=255, blank=True, null=True
+    )
     submitted_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['assignment', 'student'], name='unique_submission')
         ]
+        indexes = [
+            # Keyset pagination of an assignment's submissions by submission time.
+            models.Index(fields=['assignment', 'submitted_at', 'id'], name='submission_keyset_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.user.username} - {self.assignment.title}"
 
 
+# ---------------- Gradebook ----------------
+class Assessment(models.Model):
+    """A graded component of a course; its weight is its share of the course total."""
+    QUIZ = 'quiz'
+    ASSIGNMENT = 'assignment'
+    MIDTERM = 'midterm'
+    FINAL = 'final'
+    LAB = 'lab'
+    OTHER = 'other'
+    KIND_CHOICES = (
+        (QUIZ, 'Quiz'), (ASSIGNMENT, 'Assignment'), (MIDTERM, 'Mid-term'),
+        (FINAL, 'Final exam'), (LAB, 'Lab'), (OTHER, 'Other'),
+    )
+
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='assessments')
+    title = models.CharField(max_length=200)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=OTHER)
+    max_marks = models.DecimalField(max_digits=6, decimal_places=2)
+    weight = models.DecimalField(max_digits=5, decimal_places=2, help_text="Relative weight in the course total.")
+    position = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        ordering = ['position', 'id']
+        constraints = [
+            models.CheckConstraint(condition=models.Q(max_marks__gt=0), name='assessment_max_marks_positive'),
+            models.CheckConstraint(condition=models.Q(weight__gt=0), name='assessment_weight_positive'),
+        ]
+
+    def __str__(self):
+        return f"{self.course.code} - {self.title}"
+
+
+class Mark(models.Model):
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name='marks')
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='marks')
+    score = models.DecimalField(max_digits=6, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['assessment', 'student'], name='unique_mark'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.user.username} - {self.assessment.title}: {self.score}"
+
+
+class CourseResult(models.Model):
+    """A student's published outcome in one course; written by users/results.py."""
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='course_results')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='results')
+    semester = models.PositiveIntegerField()
+    total = models.DecimalField(max_digits=5, decimal_places=2, help_text="Weighted percentage.")
+    grade = models.CharField(max_length=2)
+    grade_point = models.PositiveSmallIntegerField()
+    rank = models.PositiveIntegerField()
+    published_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'course', 'semester'], name='unique_course_result'),
+        ]
+        indexes = [
+            # CGPA: every earlier result of a cohort, by student.
+            models.Index(fields=['student', 'semester'], name='course_result_student_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.user.username} - {self.course.code}: {self.grade}"
+
+
+class SemesterResult(models.Model):
+    student = models.ForeignKey(StudentProfile, on_delete=models.CASCADE, related_name='semester_results')
+    semester = models.PositiveIntegerField()
+    credits = models.PositiveIntegerField()
+    sgpa = models.DecimalField(max_digits=4, decimal_places=2)
+    cgpa = models.DecimalField(max_digits=4, decimal_places=2)
+    # Rank by SGPA within the cohort the results were published for.
+    rank = models.PositiveIntegerField()
+    published_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['semester']
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'semester'], name='unique_semester_result'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.user.username} sem {self.semester}: {self.sgpa}"
+
+
+# ---------------- Stored Blobs ----------------
+class StoredBlobQuerySet(models.QuerySet):
+    def retain(self, digest, size):
+        """Count one more reference to a blob, creating its row on first use."""
+        blob, created = self.get_or_create(
+            digest=digest, defaults={'size': size, 'refcount': 1, 'last_used_at': timezone.now()}
+        )
+        if not created:
+            self.filter(pk=blob.pk).update(refcount=F('refcount') + 1, last_used_at=timezone.now())
+
+    def release(self, digest):
+        self.filter(digest=digest, refcount__gt=0).update(refcount=F('refcount') - 1)
+
+
+class StoredBlob(models.Model):
+    """One deduplicated file under blobs/ and how many rows point at it (see users/storage.py)."""
+    digest = models.CharField(max_length=64, unique=True)
+    size = models.BigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    # Guards freshly written blobs whose row has not been committed yet from gc_blobs.
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    objects = StoredBlobQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.refcount} refs)"
+
+
+# ---------------- Resumable Uploads ----------------
+class UploadSession(models.Model):
+    """A file arriving in chunks; see users/uploads.py for the protocol."""
+    MATERIAL = 'material'
+    SUBMISSION = 'submission'
+    PURPOSE_CHOICES = ((MATERIAL, 'Course material'), (SUBMISSION, 'Assignment submission'))
+    RECEIVING = 'receiving'
+    ASSEMBLING = 'assembling'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (RECEIVING, 'Receiving chunks'), (ASSEMBLING, 'Assembling'), (DONE, 'Done'), (FAILED, 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    target_id = models.PositiveIntegerField(help_text="Course id for materials, assignment id for submissions.")
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True)
+    metadata = models.JSONField(default=dict, blank=True)
+    received = models.BigIntegerField(default=0)
+    # Accepted chunks in order, as [offset, storage name, length].
+    parts = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=RECEIVING)
+    error = models.TextField(blank=True)
+    # Set by the first status poll that sees ``done``, so only it flashes the success message.
+    acknowledged = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # purge_uploads sweeps abandoned sessions by age.
+            models.Index(fields=['completed_at', 'updated_at'], name='upload_session_purge_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+
+# ---------------- Notifications ----------------
+class NotificationLog(models.Model):
+    """One email sent to one user about one object; keeps fan-outs from repeating (see users/notifications.py)."""
+    ASSIGNMENT_CREATED = 'assignment_created'
+    KIND_CHOICES = ((ASSIGNMENT_CREATED, 'New assignment'),)
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=50, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'kind', 'object_id'], name='notification_once'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'object_id'], name='notification_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id} -> {self.user}"
+
+
+# ---------------- Background Jobs ----------------
+class Job(models.Model):
+    """A unit of background work, run by ``manage.py worker``; see users/tasks.py."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = ((QUEUED, 'Queued'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed'))
+
+    task = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    # Higher runs sooner; among equals, the job due first runs first.
+    priority = models.SmallIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    # The running worker's lease; renewed while the job runs, requeued once it lapses.
+    locked_until = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # The worker's claim query: due queued jobs by priority.
+            models.Index(fields=['status', 'run_at', 'priority'], name='job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+
+
 # ---------------- Signals ----------------
 @receiver(post_save, sender=User)
-def create_or_update_profile(sender, instance, created, **kwargs):
-    if created:
+def create_profile(sender, instance, created, raw=False, **kwargs):
+    # Nothing on the profiles is derived from User columns, so later saves
+    # (last_login on every login, email edits) leave them alone.
+    if created and not raw:
         Profile.objects.create(user=instance)
-    else:
-        if hasattr(instance, 'profile'):
-            instance.profile.save()
-        if hasattr(instance, 'studentprofile'):
-            instance.studentprofile.save()
-        if hasattr(instance, 'facultyprofile'):
-            instance.facultyprofile.save()
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_save, sender=FacultyProfile)
+def sync_profile_role(sender, instance, created, raw=False, **kwargs):
+    """Point ``Profile.role`` at the kind of profile the user was just given."""
+    if created and not raw:
+        role = 'faculty' if sender is FacultyProfile else 'student'
+        Profile.objects.filter(user_id=instance.user_id).exclude(role=role).update(role=role)
+
+
+@receiver(post_save, sender=Attendance)
+def update_attendance_summary(sender, instance, created, **kwargs):
+    present = 1 if instance.status == Attendance.PRESENT else 0
+    loaded = getattr(instance, '_loaded', None)
+    if created:
+        AttendanceSummary.objects.apply_delta(instance.student_id, instance.course_id, present, 1)
+    elif loaded is None or loaded[:2] != (instance.student_id, instance.course_id):
+        # Unknown previous state or the row moved: recount the pairs involved.
+        if loaded is not None:
+            AttendanceSummary.objects.refresh(loaded[1], [loaded[0]])
+        AttendanceSummary.objects.refresh(instance.course_id, [instance.student_id])
+    elif loaded[2] != instance.status:
+        was_present = 1 if loaded[2] == Attendance.PRESENT else 0
+        AttendanceSummary.objects.apply_delta(instance.student_id, instance.course_id, present - was_present)
+    instance._loaded = (instance.student_id, instance.course_id, instance.status)
+
+
+@receiver(post_delete, sender=Attendance)
+def remove_from_attendance_summary(sender, instance, **kwargs):
+    present = 1 if instance.status == Attendance.PRESENT else 0
+    AttendanceSummary.objects.filter(student_id=instance.student_id, course_id=instance.course_id).update(
+        present=F('present') - present, total=F('total') - 1,
+    )
+
+
+@receiver(post_delete, sender=CourseMaterial)
+@receiver(post_delete, sender=AssignmentSubmission)
+def release_stored_blob(sender, instance, **kwargs):
+    field = 'file' if sender is CourseMaterial else 'submitted_file'
+    digest = blob_digest(getattr(instance, field).name)
+    if digest:
+        StoredBlob.objects.release(digest)
@@ -0,0 +1,95 @@
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+
+from .models import Assignment, NotificationLog, StudentProfile
+from .tasks import task
+
+logger = logging.getLogger("users.notifications")
+
+# Messages handed to the backend's ``send_messages`` at a time; the log rows
+# for a batch are written once it has gone out. The send rate is capped by
+# settings.NOTIFICATION_RATE_PER_MINUTE.
+NOTIFICATION_BATCH_SIZE = 100
+
+
+class DeliveryError(Exception):
+    """The mail backend sent only part of a batch; the job retries the rest."""
+
+
+# ---------------- Recipients ----------------
+def pending_recipients(kind, object_id, users):
+    """``(user id, email)`` for ``users`` with an address who have not been sent ``kind`` yet.
+
+    Loaded as a list up front: the log is written to while sending, and the
+    query that reads it must not still be open then.
+    """
+    already = NotificationLog.objects.filter(kind=kind, object_id=object_id).values("user_id")
+    return list(users.exclude(email="").exclude(pk__in=already).order_by("pk").values_list("pk", "email"))
+
+
+# ---------------- Sending ----------------
+def fan_out(kind, object_id, subject, body, recipients, batch_size=NOTIFICATION_BATCH_SIZE):
+    """Send one message to each ``(user id, email)`` over a single backend connection.
+
+    ``subject`` and ``body`` are rendered by the caller once for everyone.
+    Each batch goes out in one ``send_messages`` call and is then recorded in
+    NotificationLog, so a retried job skips whoever already has the message:
+    a crash can repeat at most the batch that was in flight. Returns the
+    number of messages sent; raises DeliveryError if the backend sent only
+    part of a batch.
+    """
+    rate = settings.NOTIFICATION_RATE_PER_MINUTE
+    min_batch_time = 60.0 * batch_size / rate if rate else 0
+    sent = 0
+    # Not failing silently, a backend stops at the first message it cannot
+    # send: the count it returns covers the front of the batch.
+    with get_connection(fail_silently=False) as connection:
+        batch = []
+        for recipient in recipients:
+            batch.append(recipient)
+            if len(batch) >= batch_size:
+                sent += _send_batch(connection, kind, object_id, subject, body, batch, min_batch_time)
+                batch = []
+        if batch:
+            sent += _send_batch(connection, kind, object_id, subject, body, batch, 0)
+    return sent
+
+
+def _send_batch(connection, kind, object_id, subject, body, batch, min_batch_time):
+    started = time.monotonic()
+    messages = [EmailMessage(subject, body, to=[email], connection=connection) for _, email in batch]
+    sent = connection.send_messages(messages) or 0
+    NotificationLog.objects.bulk_create(
+        [NotificationLog(user_id=user_id, kind=kind, object_id=object_id) for user_id, _ in batch[:sent]],
+        ignore_conflicts=True,
+    )
+    if sent < len(batch):
+        raise DeliveryError(f"Mail backend sent {sent} of {len(batch)} messages")
+    # Throttle: a batch may not take less than its share of the rate.
+    remaining = min_batch_time - (time.monotonic() - started)
+    if remaining > 0:
+        time.sleep(remaining)
+    return sent
+
+
+# ---------------- Assignments ----------------
+@task(priority=-5, max_attempts=5)
+def notify_assignment_created(assignment_id):
+    """Job: email every actively enrolled student about a new assignment."""
+    assignment = Assignment.objects.select_related("course__faculty__user").filter(pk=assignment_id).first()
+    if assignment is None:
+        return
+    context = {"assignment": assignment, "course": assignment.course}
+    subject = " ".join(render_to_string("users/email/assignment_created_subject.txt", context).split())
+    body = render_to_string("users/email/assignment_created_body.txt", context)
+    students = StudentProfile.objects.enrolled_in(assignment.course).values("user_id")
+    recipients = pending_recipients(
+        NotificationLog.ASSIGNMENT_CREATED, assignment.pk, User.objects.filter(pk__in=students)
+    )
+    sent = fan_out(NotificationLog.ASSIGNMENT_CREATED, assignment.pk, subject, body, recipients)
+    logger.info("Sent %s notifications for assignment %s", sent, assignment.pk)
@@ -0,0 +1,236 @@
+import csv
+import io
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage
+from django.core.validators import validate_email
+from django.db import DatabaseError, transaction
+
+from .importers import ImportReport
+from .models import Profile, StudentProfile
+from .tasks import task
+
+logger = logging.getLogger("users.onboarding")
+
+ONBOARD_BATCH_SIZE = 1000
+# Intake lists waiting for the onboarding job, under PRIVATE_FILES_ROOT;
+# deleted once it has run.
+ONBOARD_INTAKE_DIR = "onboarding"
+ONBOARD_REQUIRED = {"username", "roll_no"}
+ONBOARD_OPTIONAL = {"password", "email", "first_name", "last_name", "semester", "department"}
+
+
+# ---------------- Password Hashing ----------------
+def _init_worker():
+    # Spawned workers start without settings; forked ones already have them.
+    django.setup()
+
+
+def hash_passwords(passwords, workers=None):
+    """``make_password`` for each entry, fanned out over a process pool.
+
+    PBKDF2 is deliberately slow and holds the GIL, so a pool of processes is
+    the only way to use more than one core. Blank entries get an unusable
+    password. ``workers=1`` hashes inline.
+    """
+    passwords = list(passwords)
+    todo = [p for p in passwords if p]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(todo) < 2:
+        hashed = iter([make_password(p) for p in todo])
+    else:
+        chunksize = max(1, len(todo) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            hashed = iter(list(pool.map(make_password, todo, chunksize=chunksize)))
+    return [next(hashed) if p else make_password(None) for p in passwords]
+
+
+# ---------------- Onboarding ----------------
+class StudentOnboarder:
+    """Create student accounts from a CSV intake list in bulk.
+
+    Columns: ``username`` and ``roll_no`` plus any of ``password``, ``email``,
+    ``first_name``, ``last_name``, ``semester`` and ``department``. Each batch
+    hashes its passwords in a process pool and then writes User, Profile and
+    StudentProfile rows with three ``bulk_create`` calls; ``bulk_create``
+    sends no ``post_save``, so the per-user profile signal never fires.
+
+    Re-running the same file is safe: a row whose username and roll number
+    already belong to the same student is counted as ``existing`` and
+    skipped, while a username or roll number taken by someone else is an error.
+    """
+
+    def __init__(self, batch_size=ONBOARD_BATCH_SIZE, workers=None, dry_run=False):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.dry_run = dry_run
+        self.usernames = set()
+        self.roll_nos = set()
+
+    def run(self, lines):
+        """Onboard an iterable of CSV text lines and return an ``ImportReport``."""
+        report = ImportReport()
+        reader = csv.reader(lines)
+        try:
+            header = [name.strip().lower() for name in next(reader)]
+        except StopIteration:
+            report.error(1, "file is empty")
+            return report
+        missing = ONBOARD_REQUIRED - set(header)
+        if missing:
+            report.error(1, f"missing column(s): {', '.join(sorted(missing))}")
+            return report
+        index = {name: header.index(name) for name in ONBOARD_REQUIRED | ONBOARD_OPTIONAL if name in header}
+
+        batch = []
+        for line, row in enumerate(reader, start=2):
+            if not any(cell.strip() for cell in row):
+                continue
+            report.rows += 1
+            try:
+                batch.append((self.parse(row, index), line))
+            except ValueError as exc:
+                report.error(line, str(exc))
+                continue
+            if len(batch) >= self.batch_size:
+                self.flush(batch, report)
+                batch = []
+        if batch:
+            self.flush(batch, report)
+        return report
+
+    def parse(self, row, index):
+        values = {}
+        for name, position in index.items():
+            # Passwords are taken verbatim; everything else is trimmed.
+            value = row[position] if position < len(row) else ""
+            values[name] = value if name == "password" else value.strip()
+
+        username, roll_no = values["username"], values["roll_no"]
+        if not username:
+            raise ValueError("missing username")
+        if not roll_no:
+            raise ValueError("missing roll_no")
+        if username in self.usernames:
+            raise ValueError(f"username {username!r} appears more than once in the file")
+        if roll_no in self.roll_nos:
+            raise ValueError(f"roll number {roll_no!r} appears more than once in the file")
+        if values.get("email"):
+            try:
+                validate_email(values["email"])
+            except ValidationError:
+                raise ValueError(f"invalid email {values['email']!r}") from None
+        if values.get("semester"):
+            try:
+                values["semester"] = int(values["semester"])
+            except ValueError:
+                raise ValueError(f"invalid semester {values['semester']!r}") from None
+            if values["semester"] < 1:
+                raise ValueError(f"invalid semester {values['semester']!r}")
+        self.usernames.add(username)
+        self.roll_nos.add(roll_no)
+        return values
+
+    def flush(self, batch, report):
+        usernames = [values["username"] for values, _ in batch]
+        taken_usernames = set(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+        taken_rolls = dict(
+            StudentProfile.objects.filter(roll_no__in=[values["roll_no"] for values, _ in batch])
+            .values_list("roll_no", "user__username")
+        )
+
+        fresh = []
+        for values, line in batch:
+            owner = taken_rolls.get(values["roll_no"])
+            if owner == values["username"]:
+                report.existing += 1
+            elif values["username"] in taken_usernames:
+                report.error(line, f"username {values['username']!r} is already taken")
+            elif owner is not None:
+                report.error(line, f"roll number {values['roll_no']!r} already belongs to {owner}")
+            else:
+                fresh.append((values, line))
+        if not fresh or self.dry_run:
+            report.written += len(fresh)
+            return
+
+        passwords = hash_passwords([values.get("password", "") for values, _ in fresh], self.workers)
+        users = [
+            User(
+                username=values["username"],
+                email=values.get("email", ""),
+                first_name=values.get("first_name", ""),
+                last_name=values.get("last_name", ""),
+                password=password,
+            )
+            for (values, _), password in zip(fresh, passwords)
+        ]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                user_ids = dict(
+                    User.objects.filter(username__in=[user.username for user in users]).values_list("username", "id")
+                )
+                Profile.objects.bulk_create(
+                    Profile(user_id=user_ids[values["username"]], role="student") for values, _ in fresh
+                )
+                StudentProfile.objects.bulk_create(
+                    StudentProfile(
+                        user_id=user_ids[values["username"]],
+                        roll_no=values["roll_no"],
+                        semester=values.get("semester") or None,
+                        department=values.get("department") or None,
+                    )
+                    for values, _ in fresh
+                )
+        except DatabaseError as exc:
+            for _, line in fresh:
+                report.error(line, f"not saved: {exc}")
+            return
+        report.written += len(fresh)
+
+
+# ---------------- Background Jobs ----------------
+def intake_storage():
+    """Where intake lists wait: outside MEDIA_ROOT, as they hold plaintext passwords."""
+    return FileSystemStorage(location=os.path.join(settings.PRIVATE_FILES_ROOT, ONBOARD_INTAKE_DIR))
+
+
+def queue_onboarding(fh):
+    """Store an uploaded intake list and queue the job that onboards it; return the Job.
+
+    Password hashing uses every core for minutes on a large intake, which
+    belongs in the worker, not in a web request.
+    """
+    name = intake_storage().save(f"{uuid.uuid4().hex}.csv", fh)
+    return onboard_students.enqueue(name=name)
+
+
+@task(priority=-10, max_attempts=1)
+def onboard_students(name):
+    """Job: onboard the intake list stored as ``name``, then delete it.
+
+    Runs once: the file is deleted whether or not the job succeeds, so no
+    passwords are left behind. Uploading the list again is safe, since
+    students created by an earlier run count as existing.
+    """
+    storage = intake_storage()
+    try:
+        with storage.open(name, "rb") as fh:
+            report = StudentOnboarder().run(io.TextIOWrapper(fh, encoding="utf-8-sig", newline=""))
+    finally:
+        storage.delete(name)
+    for line, message in report.errors:
+        logger.warning("Onboarding %s, line %s: %s", name, line, message)
+    logger.info(
+        "Onboarded %s: %s of %s students created, %s already existed, %s errors",
+        name, report.written, report.rows, report.existing, len(report.errors),
+    )
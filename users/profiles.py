@@ -0,0 +1,84 @@
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from .models import FacultyProfile, StudentProfile
+
+STUDENT = "student"
+FACULTY = "faculty"
+ROLE_MODELS = {STUDENT: StudentProfile, FACULTY: FacultyProfile}
+
+# Session entry holding (role, profile pk) so later requests skip the role probe.
+SESSION_KEY = "_smartclass_profile"
+
+
+# ---------------- Resolution ----------------
+def find_profile(user, role):
+    """Return ``user``'s profile for ``role``, or None."""
+    profile = ROLE_MODELS[role].objects.filter(user=user).first()
+    if profile is not None:
+        profile.user = user
+    return profile
+
+
+def _lookup(request):
+    user = request.user
+    if not user.is_authenticated:
+        return None, None
+
+    session = getattr(request, "session", None)
+    cached = session.get(SESSION_KEY) if session is not None else None
+    if cached and cached[0] in ROLE_MODELS:
+        role, pk = cached
+        profile = ROLE_MODELS[role].objects.filter(pk=pk, user=user).first()
+        if profile is not None:
+            profile.user = user
+            return role, profile
+
+    for role in ROLE_MODELS:
+        profile = find_profile(user, role)
+        if profile is not None:
+            remember_profile(request, role, profile)
+            return role, profile
+    return None, None
+
+
+def get_profile(request):
+    """The current user's StudentProfile/FacultyProfile, resolved once per request."""
+    if not hasattr(request, "_cached_profile"):
+        request._cached_role, request._cached_profile = _lookup(request)
+    return request._cached_profile
+
+
+def get_role(request):
+    """``"student"``, ``"faculty"`` or None; free when the session already knows it."""
+    if not hasattr(request, "_cached_role"):
+        session = getattr(request, "session", None)
+        cached = session.get(SESSION_KEY) if session is not None else None
+        if request.user.is_authenticated and cached and cached[0] in ROLE_MODELS:
+            request._cached_role = cached[0]
+        else:
+            get_profile(request)
+    return request._cached_role
+
+
+def remember_profile(request, role, profile):
+    """Pin ``profile`` as the request's profile and record it in the session."""
+    request._cached_role, request._cached_profile = role, profile
+    session = getattr(request, "session", None)
+    if session is not None and session.get(SESSION_KEY) != [role, profile.pk]:
+        session[SESSION_KEY] = [role, profile.pk]
+
+
+# ---------------- View Helpers ----------------
+def require_profile(request, role):
+    """Like ``get_object_or_404(<Role>Profile, user=request.user)`` but request-cached."""
+    if get_role(request) == role:
+        profile = get_profile(request)
+        if profile is not None:
+            return profile
+    if not request.user.is_authenticated:
+        raise Http404("No profile for an anonymous user.")
+    # Stale session entry, or a user holding both profiles.
+    profile = get_object_or_404(ROLE_MODELS[role], user=request.user)
+    profile.user = request.user
+    return profile
@@ -0,0 +1,81 @@
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+# Maximum SQL queries per request, keyed by URL name from users/urls.py.
+# Counts include the session, user and profile lookups done by middleware;
+# users/tests.py measures every one of them and fails if a view exceeds its
+# budget or grows with the roster.
+QUERY_BUDGETS = {
+    "landing": 0,
+    # GETs run no queries; the numbers are for the form posts.
+    "student_register": 5,
+    "faculty_register": 5,
+    "student_login": 10,  # POST: new session row, then last_login and the profile pin
+    "faculty_login": 10,
+    # Cold fragment cache; a warm dashboard only adds the course-id lookup.
+    "student_dashboard": 8,
+    "faculty_dashboard": 8,
+    "student_profile": 3,
+    "edit_student_profile": 5,
+    "faculty_profile": 3,
+    "edit_faculty_profile": 5,
+    "courses_page": 4,
+    "view_course_materials": 5,
+    "attendance_page": 4,
+    "results_page": 6,
+    "assignments_page": 7,
+    "submit_assignment": 10,  # POST: blob dedup lookup + insert in a savepoint
+    "faculty_courses": 4,
+    "create_course": 4,
+    "upload_course_material": 11,
+    "faculty_attendance": 12,  # POST: bulk upsert + course summary tally, upsert and cleanup in one transaction
+    "export_attendance": 5,  # sheet rows stream after the response is returned
+    "import_attendance": 15,  # POST: lookups once, then diff read, upsert + course summary refresh per batch
+    "faculty_results": 4,
+    "course_gradebook": 13,  # POST adding an assessment: model check constraints are validated in SQL
+    "faculty_assignments": 5,
+    "create_assignment": 7,  # POST: includes queueing the notification job
+    "view_submissions": 6,
+    "download_submissions": 4,  # archive members stream after the response is returned
+    "missing_submissions": 6,  # CSV export streams after the response is returned
+    "upload_start": 6,  # submissions also check enrollment and an earlier submission
+    "upload_status": 4,  # the first poll after assembly also marks the session acknowledged
+    "upload_chunk": 7,
+    "upload_complete": 5,  # assembly runs in a job
+    "download_file": 4,
+    "user_logout": 4,
+}
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised instead of logged when ``QUERY_BUDGET_STRICT`` is on."""
+
+
+def budget_for(url_name):
+    return QUERY_BUDGETS.get(url_name)
+
+
+class QueryCounter:
+    """``execute_wrapper`` hook that counts queries and their wall time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+@contextmanager
+def count_queries():
+    """Count queries on the default connection; works with DEBUG off."""
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield counter
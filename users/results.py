@@ -0,0 +1,267 @@
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Assessment, CourseResult, Enrollment, Mark, SemesterResult
+
+# (minimum percentage, letter, grade point), highest first.
+GRADE_SCALE = (
+    (90, "O", 10),
+    (80, "A+", 9),
+    (70, "A", 8),
+    (60, "B+", 7),
+    (50, "B", 6),
+    (45, "C", 5),
+    (40, "P", 4),
+    (0, "F", 0),
+)
+RESULT_BATCH_SIZE = 2000
+
+_THRESHOLDS = np.array([row[0] for row in reversed(GRADE_SCALE)], dtype=float)
+_LETTERS = np.array([row[1] for row in reversed(GRADE_SCALE)])
+_POINTS = np.array([row[2] for row in reversed(GRADE_SCALE)])
+
+# Everything below works on whole cohorts at once: one query per table
+# loads (student, course) pairs, assessments and marks as flat arrays, and
+# totals, grades, ranks and GPAs come out of a handful of NumPy operations
+# instead of a Python loop per student and course.
+
+
+# ---------------- Vector Helpers ----------------
+def _decimal(value):
+    return Decimal(f"{value:.2f}")
+
+
+def grade(totals):
+    """Letters and grade points for an array of percentages."""
+    index = np.searchsorted(_THRESHOLDS, totals, side="right") - 1
+    return _LETTERS[index], _POINTS[index]
+
+
+def competition_ranks(values, groups=None):
+    """1-based "1224" ranks, highest value first, restarting for each group.
+
+    Ties share the rank of the first of them and the next value skips
+    ahead, as on a printed merit list.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.size == 0:
+        return np.zeros(0, dtype=int)
+    groups = np.zeros(values.size, dtype=int) if groups is None else np.asarray(groups)
+    order = np.lexsort((-values, groups))
+    sorted_values, sorted_groups = values[order], groups[order]
+    positions = np.arange(values.size)
+    new_group = np.ones(values.size, dtype=bool)
+    new_group[1:] = sorted_groups[1:] != sorted_groups[:-1]
+    new_value = new_group.copy()
+    new_value[1:] |= sorted_values[1:] != sorted_values[:-1]
+    group_start = np.maximum.accumulate(np.where(new_group, positions, 0))
+    first_equal = np.maximum.accumulate(np.where(new_value, positions, 0))
+    ranks = np.empty(values.size, dtype=int)
+    ranks[order] = first_equal - group_start + 1
+    return ranks
+
+
+def weighted_totals(pair_students, pair_courses, assessments, marks):
+    """Weighted percentage for each (student, course) pair.
+
+    ``assessments`` are ``(id, course id, max marks, weight)`` rows and
+    ``marks`` are ``(assessment id, student id, score)`` rows. A component
+    contributes ``score / max * weight``, scaled so each course's weights
+    add up to 100; a missing mark counts as zero and a score over the
+    maximum is capped. Returns ``(totals, graded)`` where ``graded`` is
+    False for pairs whose course has no assessments yet.
+    """
+    pair_students = np.asarray(pair_students, dtype=np.int64)
+    pair_courses = np.asarray(pair_courses, dtype=np.int64)
+    n_pairs = pair_students.size
+    if n_pairs == 0 or not assessments:
+        return np.zeros(n_pairs), np.zeros(n_pairs, dtype=bool)
+
+    a_ids, a_courses, a_max, a_weight = (np.array(column) for column in zip(*assessments))
+    a_ids, a_courses = a_ids.astype(np.int64), a_courses.astype(np.int64)
+    a_max, a_weight = a_max.astype(float), a_weight.astype(float)
+
+    # Per-course weight sums, looked up by position in the sorted course ids.
+    courses, a_course_pos = np.unique(a_courses, return_inverse=True)
+    weight_sums = np.bincount(a_course_pos, weights=a_weight)
+    factors = 100.0 * a_weight / (a_max * weight_sums[a_course_pos])
+    graded = np.isin(pair_courses, courses)
+    if not marks:
+        return np.zeros(n_pairs), graded
+
+    m_assessments, m_students, m_scores = (np.array(column) for column in zip(*marks))
+    a_order = np.argsort(a_ids)
+    a_pos = a_order[np.searchsorted(a_ids, m_assessments.astype(np.int64), sorter=a_order)]
+
+    # Match each mark to its pair through a combined (student, course) key.
+    span = int(max(pair_courses.max(), a_courses.max())) + 1
+    pair_keys = pair_students * span + pair_courses
+    mark_keys = m_students.astype(np.int64) * span + a_courses[a_pos]
+    key_order = np.argsort(pair_keys)
+    found = np.searchsorted(pair_keys, mark_keys, sorter=key_order)
+    found = np.minimum(found, n_pairs - 1)
+    pair_pos = key_order[found]
+    enrolled = pair_keys[pair_pos] == mark_keys  # Marks of students outside the cohort drop out.
+
+    contributions = np.minimum(m_scores.astype(float), a_max[a_pos]) * factors[a_pos]
+    totals = np.bincount(pair_pos[enrolled], weights=contributions[enrolled], minlength=n_pairs)
+    return np.round(totals, 2), graded
+
+
+# ---------------- Gradebook ----------------
+def course_totals(course, students, assessments, scores):
+    """Live ``{student id: (total, letter, grade point)}`` for a course's gradebook page.
+
+    ``scores`` maps ``(assessment id, student id)`` to the marks the page
+    has already loaded; an empty dict means the course has no assessments.
+    """
+    student_ids = [student.pk for student in students]
+    rows = [(a.pk, course.pk, a.max_marks, a.weight) for a in assessments]
+    marks = [(assessment_id, student_id, score) for (assessment_id, student_id), score in scores.items()]
+    totals, graded = weighted_totals(student_ids, [course.pk] * len(student_ids), rows, marks)
+    if not graded.any():
+        return {}
+    letters, points = grade(totals)
+    return {
+        student_id: (_decimal(total), str(letter), int(point))
+        for student_id, total, letter, point in zip(student_ids, totals, letters, points)
+    }
+
+
+def save_marks(assessment, students, entries):
+    """Upsert one assessment's column of the gradebook; blank cells clear their mark.
+
+    ``entries`` maps student id to the submitted text. The grid is saved a
+    column at a time so a form carries one field per student, however many
+    assessments the course has, and stays under DATA_UPLOAD_MAX_NUMBER_FIELDS.
+    Raises ValueError, saving nothing, if any cell is not a number between 0
+    and the assessment's maximum.
+    """
+    rows, cleared = [], []
+    for student in students:
+        raw = (entries.get(student.pk) or "").strip()
+        if not raw:
+            cleared.append(student.pk)
+            continue
+        try:
+            score = Decimal(raw)
+        except InvalidOperation:
+            score = None
+        # "NaN", "sNaN" and "Infinity" parse, but can't be compared or stored.
+        if score is None or not score.is_finite():
+            raise ValueError(f"{raw!r} is not a number ({assessment.title}).")
+        if not 0 <= score <= assessment.max_marks:
+            raise ValueError(f"{assessment.title} marks must be between 0 and {assessment.max_marks}.")
+        rows.append(Mark(assessment=assessment, student=student, score=score.quantize(Decimal("0.01"))))
+    with transaction.atomic():
+        Mark.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=["assessment", "student"], update_fields=["score", "updated_at"],
+        )
+        if cleared:
+            Mark.objects.filter(assessment=assessment, student_id__in=cleared).delete()
+    return len(rows)
+
+
+# ---------------- Publishing ----------------
+class PublishReport:
+    """What ``publish_results`` wrote; ``ungraded`` holds courses left out for lack of assessments."""
+
+    def __init__(self):
+        self.students = 0
+        self.course_results = 0
+        self.ungraded = set()
+
+
+def publish_results(semester, department=None):
+    """Compute and store course results, SGPA, CGPA and ranks for a semester's cohort.
+
+    The cohort is every student with an active or completed enrollment in
+    ``semester`` (optionally only from ``department``); course and
+    semester ranks are within that cohort. Earlier published semesters
+    feed the CGPA. Re-publishing replaces the cohort's results for the
+    semester.
+    """
+    report = PublishReport()
+    enrollments = Enrollment.objects.filter(
+        semester=semester, status__in=[Enrollment.ACTIVE, Enrollment.COMPLETED]
+    )
+    if department:
+        enrollments = enrollments.filter(student__department=department)
+    pairs = list(enrollments.values_list("student_id", "course_id", "course__credits").distinct())
+    if not pairs:
+        return report
+    pair_students, pair_courses, pair_credits = (np.array(column, dtype=np.int64) for column in zip(*pairs))
+    course_ids = np.unique(pair_courses).tolist()
+    cohort = enrollments.values("student_id")
+
+    assessments = list(
+        Assessment.objects.filter(course_id__in=course_ids).values_list("id", "course_id", "max_marks", "weight")
+    )
+    marks = list(
+        Mark.objects.filter(assessment__course_id__in=course_ids, student_id__in=cohort)
+        .values_list("assessment_id", "student_id", "score")
+    )
+    totals, graded = weighted_totals(pair_students, pair_courses, assessments, marks)
+    report.ungraded = set(np.unique(pair_courses[~graded]).tolist())
+    pair_students, pair_courses, pair_credits, totals = (
+        pair_students[graded], pair_courses[graded], pair_credits[graded], totals[graded]
+    )
+    letters, points = grade(totals)
+    course_ranks = competition_ranks(totals, pair_courses)
+
+    # SGPA: credit-weighted grade points per student; failed courses count their credits.
+    students, student_pos = np.unique(pair_students, return_inverse=True)
+    credits = np.bincount(student_pos, weights=pair_credits).astype(int)
+    earned = np.bincount(student_pos, weights=pair_credits * points)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sgpa = np.round(np.where(credits > 0, earned / credits, 0.0), 2)
+
+    # CGPA: the same over this semester and every earlier published one.
+    prior_points = np.zeros(students.size)
+    prior_credits = np.zeros(students.size)
+    earlier = (
+        CourseResult.objects.filter(student_id__in=students.tolist(), semester__lt=semester)
+        .values("student_id")
+        .annotate(points=Sum(F("grade_point") * F("course__credits")), credits=Sum("course__credits"))
+        .values_list("student_id", "points", "credits")
+    )
+    earlier = list(earlier)
+    if earlier:
+        prior_students, earlier_points, earlier_credits = zip(*earlier)
+        pos = np.searchsorted(students, prior_students)
+        prior_points[pos] = np.array(earlier_points, dtype=float)
+        prior_credits[pos] = np.array(earlier_credits, dtype=float)
+    all_credits = credits + prior_credits
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cgpa = np.round(np.where(all_credits > 0, (earned + prior_points) / all_credits, 0.0), 2)
+    semester_ranks = competition_ranks(sgpa)
+
+    now = timezone.now()
+    course_results = (
+        CourseResult(
+            student_id=int(student_id), course_id=int(course_id), semester=semester, total=_decimal(total),
+            grade=str(letter), grade_point=int(point), rank=int(rank), published_at=now,
+        )
+        for student_id, course_id, total, letter, point, rank in zip(
+            pair_students, pair_courses, totals, letters, points, course_ranks
+        )
+    )
+    semester_results = (
+        SemesterResult(
+            student_id=int(student_id), semester=semester, credits=int(credit), sgpa=_decimal(s),
+            cgpa=_decimal(c), rank=int(rank), published_at=now,
+        )
+        for student_id, credit, s, c, rank in zip(students, credits, sgpa, cgpa, semester_ranks)
+    )
+    with transaction.atomic():
+        CourseResult.objects.filter(semester=semester, student_id__in=cohort).delete()
+        SemesterResult.objects.filter(semester=semester, student_id__in=cohort).delete()
+        CourseResult.objects.bulk_create(course_results, batch_size=RESULT_BATCH_SIZE)
+        SemesterResult.objects.bulk_create(semester_results, batch_size=RESULT_BATCH_SIZE)
+    report.students = int(students.size)
+    report.course_results = int(pair_students.size)
+    return report
@@ -0,0 +1,112 @@
+/*
+ * Client for the resumable upload endpoints (users/uploads.py).
+ *
+ *   resumableUpload(file, {purpose: "material", target: courseId, title: "Week 1"}, {
+ *       csrfToken, onProgress: (sent, total) => ...,
+ *   }).then(result => { window.location = result.redirect; });
+ *
+ * Each chunk is its own short request. A failed chunk is retried after asking
+ * the server how much it already holds, so a dropped connection only costs
+ * the chunk in flight. Once every byte is in, the server assembles the file
+ * in a background job; the promise resolves when it reports "done" and
+ * rejects with the server's reason if it reports "failed".
+ */
+(function (global) {
+    "use strict";
+
+    const MAX_RETRIES = 5;
+    const POLL_MIN_MS = 500;
+    const POLL_MAX_MS = 5000;
+
+    function sleep(ms) {
+        return new Promise(resolve => setTimeout(resolve, ms));
+    }
+
+    async function request(url, options, csrfToken) {
+        const headers = Object.assign({"X-CSRFToken": csrfToken}, options.headers || {});
+        const response = await fetch(url, Object.assign({credentials: "same-origin"}, options, {headers}));
+        const body = await response.json().catch(() => ({}));
+        return {status: response.status, ok: response.ok, body};
+    }
+
+    async function sha256Hex(blob) {
+        if (!(global.crypto && global.crypto.subtle)) return "";
+        const digest = await global.crypto.subtle.digest("SHA-256", await blob.arrayBuffer());
+        return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, "0")).join("");
+    }
+
+    async function resumableUpload(file, fields, options) {
+        const {csrfToken, onProgress = () => {}, startUrl = "/uploads/"} = options;
+        const form = new FormData();
+        Object.entries(fields).forEach(([key, value]) => form.append(key, value));
+        form.append("filename", file.name);
+        form.append("size", String(file.size));
+
+        const started = await request(startUrl, {method: "POST", body: form}, csrfToken);
+        if (!started.ok) throw new Error(started.body.error || "Could not start upload");
+        const {
+            chunk_url: chunkUrl, complete_url: completeUrl, status_url: statusUrl, chunk_size: chunkSize,
+        } = started.body;
+
+        let offset = started.body.offset;
+        let retries = 0;
+        while (offset < file.size) {
+            const chunk = file.slice(offset, offset + chunkSize);
+            let result;
+            try {
+                result = await request(chunkUrl, {
+                    method: "PUT",
+                    body: chunk,
+                    headers: {
+                        "Content-Type": "application/octet-stream",
+                        "Upload-Offset": String(offset),
+                        "Upload-Checksum": await sha256Hex(chunk),
+                    },
+                }, csrfToken);
+            } catch (networkError) {
+                result = {ok: false, status: 0, body: {}};
+            }
+            if (result.ok) {
+                offset = result.body.offset;
+                retries = 0;
+                onProgress(offset, file.size);
+                continue;
+            }
+            if (result.status === 409 && typeof result.body.offset === "number") {
+                offset = result.body.offset;  // Server is ahead or behind; resync.
+                continue;
+            }
+            if (result.status && result.status < 500 && result.status !== 422) {
+                throw new Error(result.body.error || "Upload rejected");
+            }
+            if (++retries > MAX_RETRIES) throw new Error("Upload failed after several retries");
+            await sleep(1000 * 2 ** retries);
+            const status = await request(statusUrl, {method: "GET"}, csrfToken).catch(() => null);
+            if (status && status.ok) offset = status.body.offset;
+        }
+
+        const queued = await request(completeUrl, {method: "POST"}, csrfToken);
+        if (!queued.ok) throw new Error(queued.body.error || "Could not finish upload");
+        return waitForAssembly(statusUrl, csrfToken);
+    }
+
+    async function waitForAssembly(statusUrl, csrfToken) {
+        let delay = POLL_MIN_MS;
+        let failures = 0;
+        for (;;) {
+            await sleep(delay);
+            delay = Math.min(delay * 2, POLL_MAX_MS);
+            const state = await request(statusUrl, {method: "GET"}, csrfToken).catch(() => null);
+            if (!state || !state.ok) {
+                if (state && state.status < 500) throw new Error(state.body.error || "Upload was lost");
+                if (++failures > MAX_RETRIES) throw new Error("Could not check on the upload");
+                continue;
+            }
+            failures = 0;
+            if (state.body.status === "done") return state.body;
+            if (state.body.status === "failed") throw new Error(state.body.error || "Upload failed");
+        }
+    }
+
+    global.resumableUpload = resumableUpload;
+})(window);
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.utils.deconstruct import deconstructible
+
+BLOB_DIR = "blobs"
+BLOB_TMP_DIR = f"{BLOB_DIR}/tmp"
+# ``<upload_to>/<sha256>/<original file name>``
+BLOB_NAME_RE = re.compile(r"^(?:.+/)?(?P<digest>[0-9a-f]{64})/[^/]+$")
+MAX_FILENAME_LENGTH = 100
+
+
+def blob_digest(name):
+    """The SHA-256 a content-addressed file name points at, or None for ordinary names."""
+    match = BLOB_NAME_RE.match(name or "")
+    return match["digest"] if match else None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that keeps each distinct upload once, under its SHA-256.
+
+    ``save()`` hashes the content while streaming it to a temporary file, then
+    moves it to ``blobs/ab/cd/<digest>`` unless that blob already exists. The
+    name handed back to the FileField is ``<upload_to>/<digest>/<file name>``,
+    so the row keeps its original file name while every copy of the same bytes
+    shares one blob. StoredBlob counts the references; deleting a file only
+    drops the count, and ``manage.py gc_blobs`` removes blobs nobody uses.
+    Names without a digest (files saved before this storage) behave as on a
+    plain FileSystemStorage.
+    """
+
+    def blob_name(self, digest):
+        return f"{BLOB_DIR}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+    def real_name(self, name):
+        """Where ``name`` actually lives, relative to MEDIA_ROOT."""
+        digest = blob_digest(name)
+        return self.blob_name(digest) if digest else name
+
+    def path(self, name):
+        return super().path(self.real_name(name))
+
+    def url(self, name):
+        return super().url(self.real_name(name))
+
+    def get_available_name(self, name, max_length=None):
+        # The stored name is derived from the content in _save, so two uploads
+        # can only share a name when they share their bytes as well.
+        return name
+
+    def _save(self, name, content):
+        from .models import StoredBlob
+
+        tmp_dir = super().path(BLOB_TMP_DIR)
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        sha256, size = hashlib.sha256(), 0
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    sha256.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+            digest = sha256.hexdigest()
+            final_path = super().path(self.blob_name(digest))
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            if os.path.exists(final_path):
+                os.remove(tmp_path)
+            else:
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp_path, self.file_permissions_mode)
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        StoredBlob.objects.retain(digest, size)
+
+        directory, filename = os.path.split(name)
+        root, ext = os.path.splitext(filename)
+        filename = root[:MAX_FILENAME_LENGTH - len(ext)] + ext
+        return "/".join(part for part in (directory, digest, filename) if part)
+
+    def delete(self, name):
+        from .models import StoredBlob
+
+        digest = blob_digest(name)
+        if digest is None:
+            super().delete(name)
+        else:
+            # Other rows may share the blob; gc_blobs reclaims it once unreferenced.
+            StoredBlob.objects.release(digest)
+
+
+content_addressed_storage = ContentAddressedStorage()
+
+
+def upload_storage():
+    """Storage for course materials and submissions (set DEDUPLICATE_UPLOADS=False to opt out)."""
+    if getattr(settings, "DEDUPLICATE_UPLOADS", True):
+        return content_addressed_storage
+    return default_storage
@@ -0,0 +1,180 @@
+import base64
+import json
+import os
+
+from django.db.models import Count, Exists, OuterRef, Prefetch, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .models import Assignment, AssignmentSubmission, Course, StudentProfile
+
+SUBMISSION_PAGE_SIZE = 50
+
+# sort parameter -> (keyset column, descending)
+SUBMISSION_SORTS = {
+    "submitted_at": ("submitted_at", False),
+    "-submitted_at": ("submitted_at", True),
+    "roll_no": ("roll_key", False),
+    "-roll_no": ("roll_key", True),
+}
+SUBMISSION_FILTERS = ("all", "on_time", "late", "missing")
+
+
+# ---------------- Student Submission Status ----------------
+class AssignmentStatus:
+    """One assignment as a student sees it: their submission, state and file details."""
+
+    PENDING = "pending"
+    OVERDUE = "overdue"
+    SUBMITTED = "submitted"
+    LATE = "late"
+
+    def __init__(self, assignment, submission, today):
+        self.assignment = assignment
+        self.submission = submission
+        if submission is None:
+            self.is_late = False
+            self.status = self.OVERDUE if today > assignment.due_date else self.PENDING
+        else:
+            self.is_late = assignment.is_late(submission.submitted_at)
+            self.status = self.LATE if self.is_late else self.SUBMITTED
+
+    @property
+    def file_name(self):
+        if self.submission and self.submission.submitted_file:
+            return os.path.basename(self.submission.submitted_file.name)
+        return ""
+
+    @property
+    def file_extension(self):
+        return os.path.splitext(self.file_name)[1].lstrip(".").lower()
+
+    @cached_property
+    def file_size(self):
+        # Asks the storage backend, not the database, and only when displayed.
+        if not self.file_name:
+            return None
+        try:
+            return self.submission.submitted_file.size
+        except OSError:
+            return None
+
+
+def student_assignments(student):
+    """Assignments in a student's courses, each carrying that student's submission.
+
+    Resolves in two queries however many assignments there are: one for the
+    assignments (joined to their course) and one ``IN`` query for the
+    student's submissions, attached as ``assignment.student_submissions``.
+    """
+    return (
+        Assignment.objects.filter(course__in=Course.objects.taken_by(student))
+        .select_related("course")
+        .prefetch_related(
+            Prefetch(
+                "submissions",
+                queryset=AssignmentSubmission.objects.filter(student=student),
+                to_attr="student_submissions",
+            )
+        )
+        .order_by("due_date", "id")
+    )
+
+
+def assignment_statuses(assignments):
+    """Wrap assignments from ``student_assignments`` in ``AssignmentStatus`` rows."""
+    today = timezone.localdate()
+    return [
+        AssignmentStatus(a, a.student_submissions[0] if a.student_submissions else None, today)
+        for a in assignments
+    ]
+
+
+# ---------------- Faculty Submission Listing ----------------
+def encode_cursor(value, pk):
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([value, pk]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, column):
+    """Inverse of ``encode_cursor``; raises ValueError on anything malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(pk, int) or not isinstance(value, str):
+        raise ValueError("Invalid cursor")
+    if column == "submitted_at":
+        value = parse_datetime(value)
+        if value is None:
+            raise ValueError("Invalid cursor")
+    return value, pk
+
+
+def keyset_page(queryset, column, descending, after=None, size=SUBMISSION_PAGE_SIZE):
+    """One page of ``queryset`` ordered by (column, pk), starting after the ``after`` cursor.
+
+    Seeks with a WHERE on the last seen key instead of OFFSET, so page 200
+    costs the same as page 1. Returns ``(rows, next_cursor)``.
+    """
+    op = "lt" if descending else "gt"
+    if after:
+        value, pk = decode_cursor(after, column)
+        queryset = queryset.filter(Q(**{f"{column}__{op}": value}) | Q(**{column: value, f"pk__{op}": pk}))
+    prefix = "-" if descending else ""
+    rows = list(queryset.order_by(f"{prefix}{column}", f"{prefix}pk")[:size + 1])
+    next_cursor = None
+    if len(rows) > size:
+        rows = rows[:size]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, column), last.pk)
+    return rows, next_cursor
+
+
+def missing_students(assignment):
+    """Active students of the assignment's course with no submission (NOT EXISTS anti-join)."""
+    submitted = AssignmentSubmission.objects.filter(assignment=assignment, student=OuterRef("pk"))
+    return StudentProfile.objects.enrolled_in(assignment.course_id).filter(~Exists(submitted))
+
+
+def submission_page(assignment, sort="submitted_at", status="all", after=None, size=SUBMISSION_PAGE_SIZE):
+    """A keyset page of an assignment's submissions (or missing students for ``status="missing"``)."""
+    if status == "missing":
+        queryset = (
+            missing_students(assignment)
+            .select_related("user")
+            .only("id", "roll_no", "user__id", "user__username", "user__first_name", "user__last_name")
+            .annotate(roll_key=Coalesce("roll_no", Value("")))
+        )
+        return keyset_page(queryset, "roll_key", sort.startswith("-"), after, size)
+
+    column, descending = SUBMISSION_SORTS[sort]
+    queryset = (
+        AssignmentSubmission.objects.filter(assignment=assignment)
+        .select_related("student__user")
+        .only(
+            "id", "submitted_at", "submitted_file",
+            "student__id", "student__roll_no",
+            "student__user__id", "student__user__username",
+            "student__user__first_name", "student__user__last_name",
+        )
+    )
+    if status == "late":
+        queryset = queryset.filter(submitted_at__gte=assignment.deadline)
+    elif status == "on_time":
+        queryset = queryset.filter(submitted_at__lt=assignment.deadline)
+    if column == "roll_key":
+        queryset = queryset.annotate(roll_key=Coalesce("student__roll_no", Value("")))
+    return keyset_page(queryset, column, descending, after, size)
+
+
+def submission_counts(assignment):
+    """Total and late submission counts for an assignment, in one query."""
+    return AssignmentSubmission.objects.filter(assignment=assignment).aggregate(
+        total=Count("id"),
+        late=Count("id", filter=Q(submitted_at__gte=assignment.deadline)),
+    )
@@ -0,0 +1,194 @@
+import logging
+import threading
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger("users.tasks")
+
+# Retry n waits RETRY_BASE_DELAY * 4**(n-1) seconds, capped at RETRY_MAX_DELAY.
+RETRY_BASE_DELAY = 30
+RETRY_MAX_DELAY = 6 * 60 * 60
+# A claimed job is leased to its worker for LEASE; the worker renews the
+# lease every HEARTBEAT_INTERVAL while the job runs. A lease that lapses
+# means the worker died, and the job is queued again.
+LEASE = timedelta(minutes=5)
+HEARTBEAT_INTERVAL = LEASE / 5
+
+TASKS = {}
+
+# Protocol
+# --------
+# ``enqueue`` inserts a Job row in the caller's transaction, so a job exists
+# exactly when the change that asked for it was committed. ``manage.py
+# worker`` claims due jobs, highest priority first, by flipping them to
+# ``running``:
+#
+# * PostgreSQL: ``SELECT ... FOR UPDATE SKIP LOCKED`` hands each worker a
+#   disjoint set of rows without them waiting on one another.
+# * SQLite has no row locks, but it also allows only one writer at a time,
+#   so a conditional ``UPDATE ... WHERE status = 'queued'`` per candidate
+#   is enough: whichever worker's update changes the row owns the job.
+#
+# A claim leases the job until ``locked_until``, and a heartbeat thread
+# pushes that forward for as long as the job runs, so a slow job is never
+# mistaken for an abandoned one. Housekeeping queues again jobs whose lease
+# lapsed. Claiming counts an attempt, and only jobs with attempts left are
+# claimed.
+#
+# A failing job is queued again with exponential backoff until it has used
+# ``max_attempts``, then left as ``failed`` with its traceback; so is a job
+# whose lease lapses on its last attempt.
+
+
+# ---------------- Registry ----------------
+def task(func=None, *, name=None, priority=0, max_attempts=3):
+    """Register a function as a background task; adds ``func.enqueue(**kwargs)``.
+
+    Task arguments are stored as JSON, so pass ids and names rather than
+    model instances.
+    """
+    def register(func):
+        task_name = name or f"{func.__module__}.{func.__name__}"
+        TASKS[task_name] = func
+
+        def enqueue(run_at=None, delay=None, **kwargs):
+            return enqueue_task(
+                task_name, kwargs, priority=priority, max_attempts=max_attempts, run_at=run_at, delay=delay,
+            )
+
+        func.task_name = task_name
+        func.enqueue = enqueue
+        return func
+
+    return register(func) if func else register
+
+
+def enqueue_task(task_name, kwargs=None, priority=0, max_attempts=3, run_at=None, delay=None):
+    if task_name not in TASKS:
+        raise KeyError(f"Unknown task {task_name!r}")
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta())
+    return Job.objects.create(
+        task=task_name, kwargs=kwargs or {}, priority=priority, max_attempts=max_attempts, run_at=run_at,
+    )
+
+
+# ---------------- Claiming ----------------
+def _due():
+    return Job.objects.filter(
+        status=Job.QUEUED, run_at__lte=timezone.now(), attempts__lt=F("max_attempts")
+    ).order_by("-priority", "run_at", "id")
+
+
+def claim_jobs(worker, limit):
+    """Mark up to ``limit`` due jobs as running for ``worker`` and return them."""
+    now = timezone.now()
+    claim = {
+        "status": Job.RUNNING, "locked_by": worker, "locked_at": now, "locked_until": now + LEASE,
+        "attempts": F("attempts") + 1,
+    }
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(_due().select_for_update(skip_locked=True).values_list("id", flat=True)[:limit])
+            Job.objects.filter(id__in=ids).update(**claim)
+    else:
+        ids = []
+        for job_id in list(_due().values_list("id", flat=True)[:limit]):
+            if Job.objects.filter(id=job_id, status=Job.QUEUED).update(**claim):
+                ids.append(job_id)
+    return list(Job.objects.filter(id__in=ids).order_by("-priority", "run_at", "id"))
+
+
+def requeue_stale():
+    """Queue again jobs whose lease lapsed; those on their last attempt fail instead.
+
+    Returns the number queued again.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, locked_until__lt=now)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED, finished_at=now, locked_by="", locked_at=None, locked_until=None,
+        last_error="Worker stopped without finishing the job.",
+    )
+    if failed:
+        logger.error("%s jobs failed for good: their worker stopped on the last attempt", failed)
+    return stale.update(status=Job.QUEUED, locked_by="", locked_at=None, locked_until=None)
+
+
+def renew_lease(job):
+    """Extend a running job's lease; False if the worker no longer holds it."""
+    return bool(
+        Job.objects.filter(pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by).update(
+            locked_until=timezone.now() + LEASE,
+        )
+    )
+
+
+@contextmanager
+def heartbeat(job):
+    """Renew ``job``'s lease from a background thread until the block exits."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(HEARTBEAT_INTERVAL.total_seconds()):
+                if not renew_lease(job):
+                    logger.warning("Job %s lost its lease while running", job)
+                    return
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{job.pk}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+# ---------------- Running ----------------
+def retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_DELAY * 4 ** (attempts - 1), RETRY_MAX_DELAY))
+
+
+def run_job(job):
+    """Run a claimed job and record how it went; never raises."""
+    try:
+        func = TASKS[job.task]
+        with heartbeat(job):
+            func(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            logger.warning("Job %s failed (attempt %s of %s); retrying", job, job.attempts, job.max_attempts)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED, run_at=timezone.now() + retry_delay(job.attempts),
+                locked_by="", locked_at=None, locked_until=None, last_error=error,
+            )
+        else:
+            logger.error("Job %s failed for good after %s attempts", job, job.attempts)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED, finished_at=timezone.now(), locked_by="", locked_at=None, locked_until=None,
+                last_error=error,
+            )
+        return False
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.DONE, finished_at=timezone.now(), locked_by="", locked_at=None, locked_until=None,
+    )
+    return True
+
+
+def purge_finished(older_than):
+    """Delete jobs that finished, successfully or for good, before ``older_than`` ago."""
+    deleted, _ = Job.objects.filter(
+        status__in=[Job.DONE, Job.FAILED], finished_at__lt=timezone.now() - older_than
+    ).delete()
+    return deleted
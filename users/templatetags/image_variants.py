@@ -0,0 +1,36 @@
+from django import template
+
+from ..images import VARIANTS, variant_name
+
+register = template.Library()
+
+
+def _variant_url(file, variant, ext):
+    """URL of a built variant, or of the original while the variant is still being made."""
+    if not file:
+        return ""
+    name = variant_name(file.name, variant, ext)
+    if file.storage.exists(name):
+        return file.storage.url(name)
+    return file.url
+
+
+@register.simple_tag
+def variant_url(file, variant, ext="jpg"):
+    """``{% variant_url student.photo "avatar" %}``: URL of a resized, metadata-free copy."""
+    return _variant_url(file, variant, ext)
+
+
+@register.inclusion_tag("users/picture.html")
+def picture(file, variant, alt="", css_class=""):
+    """``<picture>`` offering the WebP variant with a JPEG fallback, sized to the variant's box."""
+    width, height, _ = VARIANTS[variant]
+    return {
+        "file": file,
+        "webp": _variant_url(file, variant, "webp"),
+        "jpg": _variant_url(file, variant, "jpg"),
+        "width": width,
+        "height": height,
+        "alt": alt,
+        "css_class": css_class,
+    }
@@ -1,3 +1,1916 @@
-from django.test import TestCase
+import hashlib
+from decimal import Decimal
+import io
+import json
+import math
+import os
+import pickle
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.messages import get_messages
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends import locmem
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count
+from django.db.models.deletion import Collector
+from django.template import Context, Template
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import urls
+from .admin import AttendanceAdmin
+from .models import (
+    Assessment,
+    Assignment,
+    AssignmentSubmission,
+    Attendance,
+    AttendanceSummary,
+    Course,
+    CourseMaterial,
+    CourseResult,
+    Enrollment,
+    FacultyProfile,
+    Job,
+    Mark,
+    NotificationLog,
+    Profile,
+    SemesterResult,
+    StoredBlob,
+    StudentProfile,
+    UploadSession,
+)
+from .attendance import faculty_course_overview, save_course_attendance, summary_course_stats
+from .caching import FRAGMENT_KINDS, bump_generation, catalog_course, course_catalog, course_materials
+from .images import VARIANT_DIR, variant_name
+from .management.commands.seed_data import without_delete_receivers
+from .importers import AttendanceImporter
+from .notifications import fan_out, notify_assignment_created
+from .onboarding import StudentOnboarder, hash_passwords, intake_storage, queue_onboarding
+from .storage import content_addressed_storage
+from .profiles import FACULTY, SESSION_KEY, STUDENT, get_profile, get_role, require_profile
+from .querybudget import QUERY_BUDGETS, QueryBudgetExceeded
+from .results import competition_ranks, publish_results
+from .submissions import (
+    SUBMISSION_SORTS, AssignmentStatus, assignment_statuses, student_assignments, submission_page,
+)
+from . import tasks
+from .tasks import claim_jobs, enqueue_task, heartbeat, renew_lease, requeue_stale, task
+
+# The real templates live outside the app; these stand-ins read the same
+# relations the pages display so template-driven N+1s still show up.
+STUB_TEMPLATES = {
+    "users/landing.html": "landing",
+    "users/student_register.html": "register",
+    "users/faculty_register.html": "register",
+    "users/student_login.html": "login",
+    "users/faculty_login.html": "login",
+    "users/student_dashboard.html": (
+        "{{ student.user.username }} {{ role }}"
+        "{% include 'users/dashboard/upcoming_assignments.html' %}"
+        "{% include 'users/dashboard/attendance_summary.html' %}"
+        "{% include 'users/dashboard/recent_materials.html' %}"
+    ),
+    "users/faculty_dashboard.html": (
+        "{{ faculty.user.username }}"
+        "{% include 'users/dashboard/course_attendance.html' %}"
+        "{% include 'users/dashboard/upcoming_deadlines.html' %}"
+        "{% include 'users/dashboard/recent_materials.html' %}"
+    ),
+    "users/student_profile.html": "{{ student.roll_no }} {{ student.user.email }}",
+    "users/edit_student_profile.html": "{{ form.as_p }}",
+    "users/faculty_profile.html": "{{ faculty.employee_id }} {{ faculty.user.email }}",
+    "users/edit_faculty_profile.html": "{{ form.as_p }}",
+    "users/courses.html": "{% for c in courses %}{{ c.code }} {{ c.name }}{% endfor %}",
+    "users/view_course_materials.html": (
+        "{{ course.code }}{% for m in materials %}{{ m.title }} {{ m.file.name }}{% endfor %}"
+    ),
+    "users/attendance.html": (
+        "{% for c, s in course_stats.items %}{{ c.code }} {{ s.present }}/{{ s.total }}{% endfor %}"
+    ),
+    "users/results.html": (
+        "{% for c in courses %}{{ c.code }}{% endfor %}"
+        "{% for r in course_results %}{{ r.course.code }} {{ r.grade }}{% endfor %}"
+        "{% for r in semester_results %}{{ r.sgpa }}{% endfor %}"
+    ),
+    "users/assignments_page.html": (
+        "{% for row in assignment_statuses %}"
+        "{{ row.assignment.title }} {{ row.assignment.course.code }} {{ row.status }} {{ row.file_name }}"
+        "{% endfor %}"
+    ),
+    "users/submit_assignment.html": "{{ assignment.title }} {{ submitted }}",
+    "users/faculty_courses.html": "{% for c in courses %}{{ c.code }}{% endfor %}",
+    "users/create_course.html": "{{ form.as_p }}",
+    "users/upload_course_material.html": "{{ course.code }} {{ form.as_p }}",
+    "users/faculty_attendance.html": (
+        "{% for c in courses %}{{ c.code }}{% endfor %}"
+        "{% for s in students %}{{ s.roll_no }} {{ s.user.username }}{% endfor %}"
+    ),
+    "users/faculty_results.html": "{% for c in courses %}{{ c.code }} {{ c.assessment_count }}{% endfor %}",
+    "users/course_gradebook.html": (
+        "{{ course.code }}{% for a in assessments %}{{ a.title }}{% endfor %}"
+        "{% for student, scores, total in rows %}{{ student.roll_no }} {{ student.user.username }}"
+        "{% for score in scores %}{{ score }}{% endfor %}{{ total }}{% endfor %}{{ form.as_p }}"
+    ),
+    "users/faculty_assignments.html": "{% for a in assignments %}{{ a.title }}{% endfor %}",
+    "users/create_assignment.html": "{{ form.as_p }}",
+    "users/view_submissions.html": (
+        "{{ assignment.title }} {{ counts.total }}/{{ counts.late }}"
+        "{% for s in submissions %}{{ s.submitted_at }} {{ s.student.roll_no }} {{ s.student.user.username }}"
+        "{% endfor %}{{ next_cursor }}"
+    ),
+    "users/import_attendance.html": "{{ form.as_p }} {{ report.written }}",
+    "users/missing_submissions.html": (
+        "{{ assignment.title }} {{ missing_count }}"
+        "{% for s in students %}{{ s.roll_no }} {{ s.user.username }}{% endfor %}{{ next_cursor }}"
+    ),
+}
+
+STUB_TEMPLATE_SETTINGS = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "OPTIONS": {
+            "loaders": [
+                ("django.template.loaders.locmem.Loader", STUB_TEMPLATES),
+                "django.template.loaders.app_directories.Loader",  # The partials the app ships.
+            ],
+            "context_processors": [
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+                "users.context_processors.profile",
+            ],
+        },
+    }
+]
+
+
+@override_settings(
+    TEMPLATES=STUB_TEMPLATE_SETTINGS,
+    QUERY_BUDGET_HEADERS=True,
+    QUERY_BUDGET_STRICT=True,
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class QueryBudgetTests(TestCase):
+    """Every page stays within its query budget, whatever the roster size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty_user = User.objects.create_user("prof", password="pw")
+        cls.faculty = FacultyProfile.objects.create(user=cls.faculty_user)
+        cls.course = Course.objects.create(code="CS101", name="Programming", faculty=cls.faculty)
+        cls.other_course = Course.objects.create(code="CS102", name="Data Structures", faculty=cls.faculty)
+        cls.assignment = Assignment.objects.create(
+            course=cls.course, title="Homework 1", due_date=date.today() + timedelta(days=7)
+        )
+        Assignment.objects.create(course=cls.other_course, title="Homework 2", due_date=date.today())
+        CourseMaterial.objects.create(course=cls.course, title="Slides", file="course_materials/slides.pdf")
+        cls.assessment = Assessment.objects.create(course=cls.course, title="Quiz", max_marks=10, weight=1)
+        cls.student = cls.add_students(1)[0]
+        cls.student_user = cls.student.user
+
+    @classmethod
+    def add_students(cls, count):
+        start = StudentProfile.objects.count()
+        students = []
+        for i in range(start, start + count):
+            user = User.objects.create_user(f"student{i}", password="pw")
+            student = StudentProfile.objects.create(user=user, roll_no=f"R{i:04d}", semester=1)
+            for course in (cls.course, cls.other_course):
+                Enrollment.objects.create(student=student, course=course, semester=1)
+                for day in range(3):
+                    Attendance.objects.create(
+                        student=student, course=course, date=date(2025, 1, 1) + timedelta(days=day),
+                        status=Attendance.PRESENT if day % 2 else Attendance.ABSENT,
+                    )
+            AssignmentSubmission.objects.create(
+                assignment=cls.assignment, student=student, submitted_file=f"assignment_submissions/{i}.pdf"
+            )
+            Mark.objects.create(assessment=cls.assessment, student=student, score=i % 10)
+            CourseResult.objects.create(
+                student=student, course=cls.course, semester=1, total=50, grade="B", grade_point=6, rank=1
+            )
+            students.append(student)
+        return students
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.material = CourseMaterial.objects.get(course=self.course)
+        self.material.file.save("slides.pdf", ContentFile(b"%PDF-1.4 slides"))
+
+    def pages(self, day):
+        """(url name, url, user, method, data) for every page and form post to measure."""
+        course_url = f"{reverse('faculty_attendance')}?course={self.course.id}&date={day}"
+        gradebook_url = reverse("course_gradebook", args=[self.course.id])
+        roster = list(StudentProfile.objects.enrolled_in(self.course))
+        assessments = list(Assessment.objects.filter(course=self.course))
+        # A fresh assignment per run, so the student's form post creates a submission each time.
+        homework = Assignment.objects.create(course=self.course, title=f"Homework {day}", due_date=day)
+        tag = f"{day:%m%d}"
+        csv_lines = ["roll_no,date,status"] + [f"{s.roll_no},{day},P" for s in roster]
+        return [
+            ("landing", reverse("landing"), None, "get", None),
+            ("student_register", reverse("student_register"), None, "get", None),
+            ("student_register", reverse("student_register"), None, "post",
+             {"username": f"new-student-{tag}", "password": "pw"}),
+            ("faculty_register", reverse("faculty_register"), None, "get", None),
+            ("faculty_register", reverse("faculty_register"), None, "post",
+             {"username": f"new-faculty-{tag}", "password": "pw"}),
+            ("student_login", reverse("student_login"), None, "get", None),
+            ("student_login", reverse("student_login"), None, "post", {"username": "student0", "password": "pw"}),
+            ("faculty_login", reverse("faculty_login"), None, "get", None),
+            ("faculty_login", reverse("faculty_login"), None, "post", {"username": "prof", "password": "pw"}),
+            ("student_dashboard", reverse("student_dashboard"), self.student_user, "get", None),
+            ("student_profile", reverse("student_profile"), self.student_user, "get", None),
+            ("edit_student_profile", reverse("edit_student_profile"), self.student_user, "get", None),
+            ("edit_student_profile", reverse("edit_student_profile"), self.student_user, "post",
+             {"email": "student0@example.com", "roll_no": self.student.roll_no, "semester": 1}),
+            ("courses_page", reverse("courses_page"), self.student_user, "get", None),
+            ("view_course_materials", reverse("view_course_materials", args=[self.course.id]),
+             self.student_user, "get", None),
+            ("attendance_page", reverse("attendance_page"), self.student_user, "get", None),
+            ("results_page", reverse("results_page"), self.student_user, "get", None),
+            ("assignments_page", reverse("assignments_page"), self.student_user, "get", None),
+            ("submit_assignment", reverse("submit_assignment", args=[self.assignment.id]),
+             self.student_user, "get", None),
+            ("submit_assignment", reverse("submit_assignment", args=[homework.id]), self.student_user, "post",
+             {"submitted_file": SimpleUploadedFile("answer.pdf", f"answer {day}".encode())}),
+            ("download_file", reverse("download_file", args=["material", self.material.id]),
+             self.student_user, "get", None),
+            ("download_file", reverse("download_file", args=["submission", self.submission.id]),
+             self.faculty_user, "get", None),
+            ("faculty_dashboard", reverse("faculty_dashboard"), self.faculty_user, "get", None),
+            ("faculty_profile", reverse("faculty_profile"), self.faculty_user, "get", None),
+            ("edit_faculty_profile", reverse("edit_faculty_profile"), self.faculty_user, "get", None),
+            ("edit_faculty_profile", reverse("edit_faculty_profile"), self.faculty_user, "post",
+             {"email": "prof@example.com", "full_name": "Ada Lovelace"}),
+            ("faculty_courses", reverse("faculty_courses"), self.faculty_user, "get", None),
+            ("create_course", reverse("create_course"), self.faculty_user, "get", None),
+            ("create_course", reverse("create_course"), self.faculty_user, "post",
+             {"code": f"CS{tag}", "name": "Seminar", "credits": 2}),
+            ("upload_course_material", reverse("upload_course_material", args=[self.course.id]),
+             self.faculty_user, "get", None),
+            ("upload_course_material", reverse("upload_course_material", args=[self.course.id]),
+             self.faculty_user, "post",
+             {"course": self.course.id, "title": f"Notes {tag}", "file": SimpleUploadedFile("notes.pdf", f"notes {day}".encode())}),
+            ("faculty_attendance", course_url, self.faculty_user, "get", None),
+            ("faculty_attendance", course_url, self.faculty_user, "post",
+             {f"status_{s.id}": Attendance.PRESENT for s in roster}),
+            ("export_attendance", reverse("export_attendance"), self.faculty_user, "get",
+             {"course": self.course.id}),
+            ("export_attendance", reverse("export_attendance"), self.faculty_user, "get",
+             {"course": self.course.id, "format": "xlsx"}),
+            ("import_attendance", reverse("import_attendance"), self.faculty_user, "get", None),
+            ("import_attendance", reverse("import_attendance"), self.faculty_user, "post",
+             {"course": self.other_course.id,
+              "file": SimpleUploadedFile("dump.csv", "\n".join(csv_lines).encode())}),
+            ("faculty_results", reverse("faculty_results"), self.faculty_user, "get", None),
+            ("course_gradebook", gradebook_url, self.faculty_user, "get", None),
+            ("course_gradebook", gradebook_url, self.faculty_user, "post",
+             {"assessment": assessments[0].id, **{f"mark_{s.id}": "7" for s in roster}}),
+            ("course_gradebook", gradebook_url, self.faculty_user, "post",
+             {"add_assessment": "1", "title": f"Test {tag}", "kind": Assessment.QUIZ,
+              "max_marks": 20, "weight": 1}),
+            ("faculty_assignments", reverse("faculty_assignments"), self.faculty_user, "get", None),
+            ("create_assignment", reverse("create_assignment"), self.faculty_user, "get", None),
+            ("create_assignment", reverse("create_assignment"), self.faculty_user, "post",
+             {"course": self.course.id, "title": f"Essay {tag}", "due_date": day}),
+            ("view_submissions", reverse("view_submissions", args=[self.assignment.id]),
+             self.faculty_user, "get", None),
+            ("view_submissions", reverse("view_submissions", args=[self.assignment.id]),
+             self.faculty_user, "get", {"status": "missing"}),
+            ("missing_submissions", reverse("missing_submissions", args=[self.assignment.id]),
+             self.faculty_user, "get", None),
+            ("download_submissions", reverse("download_submissions", args=[self.assignment.id]),
+             self.faculty_user, "get", None),
+            ("user_logout", reverse("user_logout"), self.student_user, "get", None),
+        ]
+
+    @property
+    def submission(self):
+        submission = AssignmentSubmission.objects.get(assignment=self.assignment, student=self.student)
+        if not submission.submitted_file.storage.exists(submission.submitted_file.name):
+            submission.submitted_file.save("report.pdf", ContentFile(b"%PDF-1.4 report"))
+        return submission
+
+    def login(self, user):
+        """Log in the way the login views do, with the role already in the session."""
+        self.client.force_login(user)
+        session = self.client.session
+        if user == self.faculty_user:
+            session[SESSION_KEY] = [FACULTY, self.faculty.pk]
+        else:
+            session[SESSION_KEY] = [STUDENT, user.studentprofile.pk]
+        session.save()
+
+    def fetch(self, name, url, user, method, data, **extra):
+        """Request ``url`` as ``user`` and record its query count under ``name``."""
+        if user is not None:
+            self.login(user)
+        cache.clear()  # Budgets cover the cold-cache path.
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data or {}, **extra)
+        self.assertIn(response.status_code, (200, 201, 202, 302), f"{name} returned {response.status_code}")
+        self.counts[(name, method, len(self.counts))] = len(queries)
+        self.client.logout()
+        return response
+
+    def measure(self, day):
+        self.counts = {}
+        for page in self.pages(day):
+            self.fetch(*page)
+        self.measure_uploads(day)
+        return self.counts
+
+    def measure_uploads(self, day):
+        """The resumable upload endpoints, walked through for a material and a submission."""
+        homework = Assignment.objects.create(course=self.course, title=f"Upload {day}", due_date=day)
+        uploads = [
+            (self.faculty_user, {"purpose": "material", "target": self.course.id, "title": f"Lecture {day}"}),
+            (self.student_user, {"purpose": "submission", "target": homework.id}),
+        ]
+        states = []
+        for user, fields in uploads:
+            data = f"{fields['purpose']} {day}".encode() * 100
+            state = self.fetch("upload_start", reverse("upload_start"), user, "post", {
+                **fields, "filename": "upload.bin", "size": len(data), "sha256": hashlib.sha256(data).hexdigest(),
+            }).json()
+            self.fetch("upload_status", state["status_url"], user, "get", None)
+            self.fetch("upload_chunk", state["chunk_url"], user, "put", data,
+                       content_type="application/octet-stream", headers={"upload-offset": "0"})
+            self.fetch("upload_complete", state["complete_url"], user, "post", None)
+            states.append((user, state))
+        call_command("worker", once=True, concurrency=1, stdout=io.StringIO())
+        for user, state in states:
+            self.assertTrue(self.fetch("upload_status", state["status_url"], user, "get", None).json()["complete"])
+
+    def test_every_url_has_a_budget(self):
+        names = {pattern.name for pattern in urls.urlpatterns if pattern.name}
+        self.assertEqual(names - set(QUERY_BUDGETS), set())
+
+    def test_every_budget_is_measured(self):
+        measured = {name for name, _, _ in self.measure(date(2025, 2, 1))}
+        self.assertEqual(set(QUERY_BUDGETS) - measured, set())
+
+    def test_views_stay_within_budget_as_roster_grows(self):
+        small = self.measure(date(2025, 2, 1))
+        self.add_students(15)
+        large = self.measure(date(2025, 2, 2))
+        for key, count in large.items():
+            name = key[0]
+            with self.subTest(view=name, method=key[1], request=key[2]):
+                self.assertLessEqual(count, QUERY_BUDGETS[name])
+                self.assertEqual(count, small[key], "query count grows with roster size")
+
+    def test_form_posts_take_effect(self):
+        self.measure(date(2025, 2, 1))
+        self.assertEqual(User.objects.filter(username__startswith="new-").count(), 2)
+        self.assertTrue(Course.objects.filter(code="CS0201").exists())
+        self.assertEqual(self.student.assignment_submissions.count(), 3)
+        self.assertEqual(CourseMaterial.objects.filter(course=self.course).count(), 3)
+        self.assertTrue(Assignment.objects.filter(title="Essay 0201").exists())
+        self.assertEqual(Assessment.objects.filter(course=self.course).count(), 2)
+        self.assertEqual(Mark.objects.get(student=self.student).score, 7)
+        self.assertTrue(Attendance.objects.filter(course=self.other_course, date=date(2025, 2, 1)).exists())
+        self.assertEqual(User.objects.get(username="prof").first_name, "Ada")
+
+    def test_going_over_budget_fails(self):
+        self.login(self.student_user)
+        with mock.patch.dict(QUERY_BUDGETS, {"attendance_page": 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(reverse("attendance_page"))
+
+    def test_headers_report_query_count(self):
+        self.login(self.student_user)
+        response = self.client.get(reverse("attendance_page"))
+        self.assertEqual(response["X-Query-Budget"], str(QUERY_BUDGETS["attendance_page"]))
+        self.assertLessEqual(int(response["X-Query-Count"]), QUERY_BUDGETS["attendance_page"])
+        self.assertIn("X-Query-Time-Ms", response)
+
+
+@override_settings(TEMPLATES=STUB_TEMPLATE_SETTINGS)
+class LoadTestCommandTests(TestCase):
+    """``seed_data`` builds a consistent synthetic dataset that ``benchmark_views`` can drive."""
+
+    def seed(self, **options):
+        options = {
+            "students": 12, "faculty": 2, "courses": 4, "courses_per_student": 2, "days": 3,
+            "assignments_per_course": 2, "batch_size": 5, "stdout": io.StringIO(), **options,
+        }
+        call_command("seed_data", **options)
+
+    def test_seed_data(self):
+        self.seed()
+        self.assertEqual(StudentProfile.objects.count(), 12)
+        self.assertEqual(FacultyProfile.objects.count(), 2)
+        self.assertEqual(Course.objects.count(), 4)
+        self.assertEqual(Enrollment.objects.count(), 24)
+        self.assertEqual(Attendance.objects.count(), 72)
+        self.assertEqual(Assignment.objects.count(), 8)
+        # Every account gets the Profile the post_save signal would have written.
+        self.assertEqual(
+            dict(Profile.objects.values_list("role").annotate(n=Count("id"))), {"student": 12, "faculty": 2}
+        )
+        self.assertEqual(AttendanceSummary.objects.count(), 24)
+        self.assertEqual(AttendanceSummary.objects.drift(), [])
+        self.assertTrue(self.client.login(username="bench_stu0", password="bench-password"))
+
+    def test_seed_data_refuses_to_duplicate_unless_flushed(self):
+        self.seed()
+        with self.assertRaises(CommandError):
+            self.seed()
+        self.seed(students=5, flush=True)
+        self.assertEqual(StudentProfile.objects.count(), 5)
+        self.assertEqual(Attendance.objects.count(), 30)
+        self.assertEqual(AttendanceSummary.objects.drift(), [])
+
+    def test_flush_fast_deletes_the_bulk_tables(self):
+        with without_delete_receivers():
+            for model in (Attendance, AssignmentSubmission):
+                self.assertTrue(Collector(using="default").can_fast_delete(model.objects.all()), model)
+        # Reconnected afterwards.
+        self.assertFalse(Collector(using="default").can_fast_delete(Attendance.objects.all()))
+
+    def test_benchmark_views_rejects_unknown_users(self):
+        self.seed()
+        for option, message in [("student", "No student with username 'nobody'."),
+                                ("faculty", "No faculty member with username 'nobody'.")]:
+            with self.subTest(option=option), self.assertRaisesMessage(CommandError, message):
+                call_command("benchmark_views", iterations=1, warmup=0, stdout=io.StringIO(),
+                             stderr=io.StringIO(), **{option: "nobody"})
+
+    def test_benchmark_views_report(self):
+        self.seed()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "report.json")
+            call_command("benchmark_views", iterations=2, warmup=1, output=path,
+                         stdout=io.StringIO(), stderr=io.StringIO())
+            with open(path) as fh:
+                report = json.load(fh)
+        self.assertEqual(report["dataset"]["students"], 12)
+        self.assertEqual(report["iterations"], 2)
+        self.assertIn("view_submissions", report["views"])
+        for name, result in report["views"].items():
+            with self.subTest(view=name):
+                self.assertEqual(result["status"], 200)
+                self.assertLessEqual(result["queries"], result["budget"])
+                self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+
+    def test_benchmark_views_needs_data(self):
+        with self.assertRaises(CommandError):
+            call_command("benchmark_views", iterations=1, stdout=io.StringIO(), stderr=io.StringIO())
+
+
+class RosterQueryTests(TestCase):
+    """``enrolled_in`` and ``taken_by`` apply every condition to one enrollment row."""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        cls.course = Course.objects.create(code="CS301", name="Networks", faculty=faculty)
+        cls.other = Course.objects.create(code="CS302", name="Databases", faculty=faculty)
+        cls.repeater = StudentProfile.objects.create(user=User.objects.create(username="rep"), roll_no="R1")
+        cls.current = StudentProfile.objects.create(user=User.objects.create(username="cur"), roll_no="R2")
+        cls.elsewhere = StudentProfile.objects.create(user=User.objects.create(username="else"), roll_no="R3")
+        # Took the course in semester 1, dropped it, and is taking it again in semester 2.
+        Enrollment.objects.create(student=cls.repeater, course=cls.course, semester=1, status=Enrollment.DROPPED)
+        Enrollment.objects.create(student=cls.repeater, course=cls.course, semester=2)
+        Enrollment.objects.create(student=cls.repeater, course=cls.other, semester=2)
+        Enrollment.objects.create(student=cls.current, course=cls.course, semester=1)
+        # Active in the course for semester 1 and in another course for semester 2.
+        Enrollment.objects.create(student=cls.elsewhere, course=cls.course, semester=1)
+        Enrollment.objects.create(student=cls.elsewhere, course=cls.other, semester=2)
+
+    def test_roster_lists_each_student_once(self):
+        roster = list(StudentProfile.objects.enrolled_in(self.course).order_by("roll_no"))
+        self.assertEqual(roster, [self.repeater, self.current, self.elsewhere])
+
+    def test_semester_applies_to_the_same_enrollment(self):
+        self.assertEqual(list(StudentProfile.objects.enrolled_in(self.course, semester=2)), [self.repeater])
+        self.assertEqual(
+            list(StudentProfile.objects.enrolled_in(self.course, semester=1).order_by("roll_no")),
+            [self.current, self.elsewhere],
+        )
+
+    def test_taken_by(self):
+        self.assertEqual(list(Course.objects.taken_by(self.repeater).order_by("code")), [self.course, self.other])
+        self.assertEqual(list(Course.objects.taken_by(self.elsewhere, semester=1)), [self.course])
+        self.assertEqual(list(Course.objects.taken_by(self.elsewhere, semester=2)), [self.other])
+
+
+class ProfileResolverTests(TestCase):
+    """``request.profile``/``request.role`` come from the session after the first probe."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = StudentProfile.objects.create(user=User.objects.create(username="stu"), roll_no="R1")
+        cls.faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        # Signed up as faculty but never given a FacultyProfile, and an account with no role at all.
+        cls.orphan = User.objects.create(username="orphan")
+        Profile.objects.filter(user=cls.orphan).update(role="faculty")
+        cls.admin = User.objects.create(username="admin", is_staff=True)
+
+    def request(self, user, session=None):
+        request = RequestFactory().get("/")
+        request.user = user
+        request.session = session if session is not None else SessionStore()
+        return request
+
+    def test_first_request_probes_and_remembers(self):
+        request = self.request(self.faculty.user)
+        with self.assertNumQueries(2):  # No StudentProfile, then the FacultyProfile.
+            self.assertEqual(get_profile(request), self.faculty)
+        self.assertEqual(get_role(request), FACULTY)
+        self.assertEqual(request.session[SESSION_KEY], [FACULTY, self.faculty.pk])
+        with self.assertNumQueries(0):
+            self.assertIs(require_profile(request, FACULTY).user, self.faculty.user)
+
+    def test_later_requests_use_the_session(self):
+        session = SessionStore()
+        get_profile(self.request(self.student.user, session))
+        request = self.request(self.student.user, session)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_role(request), STUDENT)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_profile(request), self.student)
+
+    def test_stale_session_entry_is_replaced(self):
+        session = SessionStore()
+        session[SESSION_KEY] = [STUDENT, self.faculty.pk + 1000]
+        request = self.request(self.faculty.user, session)
+        self.assertEqual(get_profile(request), self.faculty)
+        self.assertEqual(session[SESSION_KEY], [FACULTY, self.faculty.pk])
+
+    def test_users_without_a_profile(self):
+        for user in (self.orphan, self.admin, AnonymousUser()):
+            with self.subTest(user=str(user)):
+                request = self.request(user)
+                self.assertIsNone(get_profile(request))
+                self.assertIsNone(get_role(request))
+                self.assertNotIn(SESSION_KEY, request.session)
+                with self.assertRaises(Http404):
+                    require_profile(request, FACULTY)
+
+    def test_wrong_role_is_not_found(self):
+        request = self.request(self.student.user)
+        with self.assertRaises(Http404):
+            require_profile(request, FACULTY)
+
+    def test_pages_for_users_without_a_profile(self):
+        self.client.force_login(self.orphan)
+        self.assertEqual(self.client.get(reverse("faculty_dashboard")).status_code, 404)
+        self.assertEqual(self.client.get(reverse("student_dashboard")).status_code, 404)
+        # The login page is shown again rather than bouncing to a dashboard that 404s.
+        with override_settings(TEMPLATES=STUB_TEMPLATE_SETTINGS):
+            self.assertEqual(self.client.get(reverse("faculty_login")).status_code, 200)
+
+
+class SubmissionPageTests(TestCase):
+    """Keyset pages of view_submissions cover every row exactly once."""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        course = Course.objects.create(code="CS201", name="Algorithms", faculty=faculty)
+        cls.assignment = Assignment.objects.create(course=course, title="Sorting", due_date=date(2025, 1, 1))
+        for i in range(12):
+            student = StudentProfile.objects.create(
+                user=User.objects.create(username=f"s{i}"), roll_no=None if i == 5 else f"R{i % 7:02d}"
+            )
+            Enrollment.objects.create(student=student, course=course, semester=1)
+            if i % 4:
+                AssignmentSubmission.objects.create(assignment=cls.assignment, student=student)
+        # Everyone submitted "now", i.e. after the 2025 due date; put R01 and R02 on time.
+        AssignmentSubmission.objects.filter(student__roll_no__in=["R01", "R02"]).update(
+            submitted_at=datetime(2024, 12, 31, tzinfo=dt_timezone.utc)
+        )
+
+    def walk(self, **kwargs):
+        seen, cursor = [], None
+        while True:
+            rows, cursor = submission_page(self.assignment, after=cursor, size=4, **kwargs)
+            seen += rows
+            if cursor is None:
+                return seen
+
+    def test_pages_cover_every_submission_in_order(self):
+        for sort in SUBMISSION_SORTS:
+            with self.subTest(sort=sort):
+                rows = self.walk(sort=sort)
+                self.assertEqual(len(rows), 9)
+                self.assertEqual(len({row.pk for row in rows}), 9)
+                column, descending = SUBMISSION_SORTS[sort]
+                keys = [(getattr(row, column), row.pk) for row in rows]
+                self.assertEqual(keys, sorted(keys, reverse=descending))
+
+    def test_filters(self):
+        self.assertEqual(len(self.walk(status="on_time")), 3)
+        self.assertEqual(len(self.walk(status="late")), 6)
+        missing = self.walk(status="missing")
+        self.assertEqual(len(missing), 3)
+        self.assertFalse(
+            AssignmentSubmission.objects.filter(assignment=self.assignment, student__in=missing).exists()
+        )
+
+    def test_missing_csv_export(self):
+        self.client.force_login(self.assignment.course.faculty.user)
+        response = self.client.get(
+            reverse("missing_submissions", args=[self.assignment.id]), {"format": "csv"}
+        )
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "roll_no,username,first_name,last_name,email")
+        self.assertEqual(sorted(line.split(",")[1] for line in lines[1:]), ["s0", "s4", "s8"])
+
+    def test_malformed_cursor(self):
+        with self.assertRaises(ValueError):
+            submission_page(self.assignment, after="not-a-cursor")
+
+
+class StudentAssignmentTests(TestCase):
+    """The assignments page loads a student's submissions in one prefetch and labels each assignment."""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        cls.course = Course.objects.create(code="CS401", name="Compilers", faculty=faculty)
+        cls.student = StudentProfile.objects.create(user=User.objects.create(username="stu"), roll_no="R1")
+        cls.classmate = StudentProfile.objects.create(user=User.objects.create(username="mate"), roll_no="R2")
+        for student in (cls.student, cls.classmate):
+            Enrollment.objects.create(student=student, course=cls.course, semester=1)
+        today = timezone.localdate()
+        cls.pending = Assignment.objects.create(course=cls.course, title="Lexer", due_date=today + timedelta(days=7))
+        cls.overdue = Assignment.objects.create(course=cls.course, title="Parser", due_date=today - timedelta(days=7))
+        cls.on_time = Assignment.objects.create(course=cls.course, title="Types", due_date=today)
+        cls.late = Assignment.objects.create(course=cls.course, title="Codegen", due_date=today - timedelta(days=3))
+        for assignment in (cls.on_time, cls.late):
+            AssignmentSubmission.objects.create(
+                assignment=assignment, student=cls.student, submitted_file="assignment_submissions/Report.PDF"
+            )
+        # A classmate's submission must not count as the student's.
+        AssignmentSubmission.objects.create(assignment=cls.pending, student=cls.classmate)
+
+    def statuses(self):
+        return {row.assignment: row for row in assignment_statuses(student_assignments(self.student))}
+
+    def test_statuses(self):
+        rows = self.statuses()
+        self.assertEqual(rows[self.pending].status, AssignmentStatus.PENDING)
+        self.assertIsNone(rows[self.pending].submission)
+        self.assertEqual(rows[self.overdue].status, AssignmentStatus.OVERDUE)
+        self.assertEqual(rows[self.on_time].status, AssignmentStatus.SUBMITTED)
+        self.assertFalse(rows[self.on_time].is_late)
+        self.assertEqual(rows[self.late].status, AssignmentStatus.LATE)
+        self.assertTrue(rows[self.late].is_late)
+        self.assertEqual(rows[self.on_time].file_name, "Report.PDF")
+        self.assertEqual(rows[self.on_time].file_extension, "pdf")
+        self.assertEqual(rows[self.pending].file_name, "")
+
+    def test_lateness_is_judged_at_the_deadline(self):
+        deadline = self.on_time.deadline
+        self.assertFalse(self.on_time.is_late(deadline - timedelta(microseconds=1)))
+        self.assertTrue(self.on_time.is_late(deadline))
+
+    def test_query_count_does_not_grow_with_assignments(self):
+        with self.assertNumQueries(2):
+            self.statuses()
+        for i in range(20):
+            assignment = Assignment.objects.create(course=self.course, title=f"Extra {i}", due_date=date(2025, 1, 1))
+            AssignmentSubmission.objects.create(assignment=assignment, student=self.student)
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.statuses()), 24)
+
+
+class AttendanceSaveTests(TestCase):
+    """``save_course_attendance`` writes a whole day with a fixed number of queries."""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        cls.course = Course.objects.create(code="CS310", name="Compilers", faculty=faculty)
+        # Past 500, where the old fixed batch and chunk sizes started adding queries.
+        users = User.objects.bulk_create(User(username=f"s{i}") for i in range(600))
+        cls.students = StudentProfile.objects.bulk_create(
+            StudentProfile(user=user, roll_no=f"R{i:03d}") for i, user in enumerate(users)
+        )
+
+    def save(self, day, statuses):
+        with CaptureQueriesContext(connection) as queries:
+            result = save_course_attendance(self.course, day, statuses)
+        return result, len(queries)
+
+    def test_query_count_does_not_grow_with_roster(self):
+        def save(day, students):
+            with CaptureQueriesContext(connection) as queries:
+                save_course_attendance(self.course, day, {s.id: Attendance.PRESENT for s in students})
+            inserts = sum(query["sql"].startswith("INSERT") for query in queries)
+            return len(queries) - inserts, inserts
+
+        def batches(model, count):
+            # INSERTs Django needs for ``count`` rows under the backend's bound-parameter limit.
+            fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+            return math.ceil(count / connection.ops.bulk_batch_size(fields, [None] * count))
+
+        small = save(date(2025, 3, 1), self.students[:3])
+        large = save(date(2025, 3, 2), self.students)
+        self.assertEqual(small, (small[0], 2))
+        self.assertEqual(large, (small[0], batches(Attendance, 600) + batches(AttendanceSummary, 600)))
+        self.assertEqual(AttendanceSummary.objects.filter(course=self.course, present=1).count(), 597)
+
+    def test_counts_and_skips_unchanged_rows(self):
+        day = date(2025, 3, 3)
+        statuses = {s.id: Attendance.PRESENT for s in self.students[:4]}
+        self.assertEqual(self.save(day, statuses)[0], (4, 0))
+
+        statuses[self.students[0].id] = Attendance.ABSENT
+        statuses[self.students[4].id] = Attendance.ABSENT
+        self.assertEqual(self.save(day, statuses)[0], (1, 1))
+        self.assertEqual(Attendance.objects.filter(course=self.course, date=day).count(), 5)
+        self.assertEqual(
+            Attendance.objects.get(student=self.students[0], course=self.course, date=day).status,
+            Attendance.ABSENT,
+        )
+
+        # Nothing changed: only the lookup of the day's existing rows runs.
+        result, count = self.save(day, statuses)
+        self.assertEqual((result, count), ((0, 0), 1))
+        self.assertEqual(AttendanceSummary.objects.get(student=self.students[0], course=self.course).present, 0)
+
+    def test_rejects_unknown_status(self):
+        with self.assertRaises(ValueError):
+            save_course_attendance(self.course, date(2025, 3, 4), {self.students[0].id: "Late"})
+        self.assertFalse(Attendance.objects.exists())
+
+
+class AttendanceAggregateTests(TestCase):
+    """Attendance counts are aggregated in the database, not by looping over rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        cls.courses = [
+            Course.objects.create(code=code, name=code, faculty=cls.faculty) for code in ("CS322", "CS321")
+        ]
+        cls.student = StudentProfile.objects.create(user=User.objects.create(username="amy"), roll_no="R1")
+        other = StudentProfile.objects.create(user=User.objects.create(username="ben"), roll_no="R2")
+        for day in range(4):
+            for course in cls.courses:
+                Attendance.objects.create(
+                    student=cls.student, course=course, date=date(2025, 4, 1) + timedelta(days=day),
+                    status=Attendance.PRESENT if day < (3 if course.code == "CS321" else 1) else Attendance.ABSENT,
+                )
+        Attendance.objects.create(student=other, course=cls.courses[0], date=date(2025, 4, 1), status=Attendance.PRESENT)
+
+    def test_tally_groups_in_one_query(self):
+        with self.assertNumQueries(1):
+            rows = list(Attendance.objects.filter(student=self.student).tally("course").order_by("course"))
+        self.assertEqual(
+            [(row["course"], row["present"], row["total"]) for row in rows],
+            [(self.courses[0].id, 1, 4), (self.courses[1].id, 3, 4)],
+        )
+
+    def test_student_stats_read_the_summary_table(self):
+        with self.assertNumQueries(1):
+            stats = summary_course_stats(self.student)
+        self.assertEqual(
+            [(course.code, row["present"], row["total"], row["percentage"]) for course, row in stats.items()],
+            [("CS321", 3, 4, 75.0), ("CS322", 1, 4, 25.0)],
+        )
+
+    def test_faculty_overview_is_two_queries(self):
+        with self.assertNumQueries(2):
+            overview = faculty_course_overview(self.faculty)
+        self.assertEqual(
+            [(row["course"].code, row["students"], row["present"], row["total"]) for row in overview],
+            [("CS321", 1, 3, 4), ("CS322", 2, 2, 5)],
+        )
+
+
+class AttendanceSummaryTests(TestCase):
+    """AttendanceSummary follows every kind of write, and the command finds and fixes drift."""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        cls.course = Course.objects.create(code="CS330", name="Graphics", faculty=faculty)
+        cls.other_course = Course.objects.create(code="CS331", name="Vision", faculty=faculty)
+        cls.student = StudentProfile.objects.create(user=User.objects.create(username="amy"), roll_no="R1")
+
+    def counters(self, course=None):
+        summary = AttendanceSummary.objects.filter(student=self.student, course=course or self.course).first()
+        return (summary.present, summary.total) if summary else None
+
+    def test_single_row_saves_and_deletes(self):
+        record = Attendance.objects.create(
+            student=self.student, course=self.course, date=date(2025, 5, 1), status=Attendance.PRESENT
+        )
+        Attendance.objects.create(student=self.student, course=self.course, date=date(2025, 5, 2), status=Attendance.ABSENT)
+        self.assertEqual(self.counters(), (1, 2))
+
+        record = Attendance.objects.get(pk=record.pk)
+        record.status = Attendance.ABSENT
+        record.save()
+        self.assertEqual(self.counters(), (0, 2))
+
+        record.course = self.other_course  # Moving a row recounts both sides.
+        record.save()
+        self.assertEqual((self.counters(), self.counters(self.other_course)), ((0, 1), (0, 1)))
+
+        Attendance.objects.get(pk=record.pk).delete()
+        self.assertEqual(self.counters(self.other_course), (0, 0))
+
+    def test_bulk_paths_refresh_the_summary(self):
+        save_course_attendance(self.course, date(2025, 5, 3), {self.student.id: Attendance.PRESENT})
+        save_course_attendance(self.course, date(2025, 5, 4), {self.student.id: Attendance.ABSENT})
+        self.assertEqual(self.counters(), (1, 2))
+        save_course_attendance(self.course, date(2025, 5, 4), {self.student.id: Attendance.PRESENT})
+        self.assertEqual(self.counters(), (2, 2))
+
+    def test_command_reports_and_rebuilds_drift(self):
+        save_course_attendance(self.course, date(2025, 5, 5), {self.student.id: Attendance.PRESENT})
+        call_command("attendance_summary", stdout=io.StringIO())  # Clean: no error.
+
+        AttendanceSummary.objects.update(present=5)
+        Attendance.objects.bulk_create([  # Bypasses the signals entirely.
+            Attendance(student=self.student, course=self.other_course, date=date(2025, 5, 5), status=Attendance.ABSENT)
+        ])
+        out = io.StringIO()
+        with self.assertRaisesMessage(CommandError, "2 attendance summary rows have drifted"):
+            call_command("attendance_summary", stdout=out)
+        self.assertIn(f"course={self.other_course.id} stored=None actual=(0, 1)", out.getvalue())
+
+        call_command("attendance_summary", rebuild=True, stdout=io.StringIO())
+        self.assertEqual((self.counters(), self.counters(self.other_course)), ((1, 1), (0, 1)))
+        self.assertEqual(AttendanceSummary.objects.drift(), [])
+
+
+class AttendanceExportTests(TestCase):
+    """The streamed attendance sheet pivots students against dates."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty_user = User.objects.create(username="prof")
+        faculty = FacultyProfile.objects.create(user=cls.faculty_user)
+        cls.course = Course.objects.create(code="CS301", name="Networks", faculty=faculty)
+        for i, marks in enumerate(["PA", "P-", "AA"]):
+            student = StudentProfile.objects.create(user=User.objects.create(username=f"s{i}"), roll_no=f"R{i}")
+            Enrollment.objects.create(student=student, course=cls.course, semester=1)
+            for day, mark in enumerate(marks):
+                if mark != "-":
+                    Attendance.objects.create(
+                        student=student, course=cls.course, date=date(2025, 3, day + 1),
+                        status=Attendance.PRESENT if mark == "P" else Attendance.ABSENT,
+                    )
+
+    def export(self, **params):
+        self.client.force_login(self.faculty_user)
+        response = self.client.get(reverse("export_attendance"), {"course": self.course.id, **params})
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_csv_pivot(self):
+        lines = self.export().decode().splitlines()
+        self.assertEqual(lines, [
+            "roll_no,username,2025-03-01,2025-03-02,present,total,percentage",
+            "R0,s0,P,A,1,2,50.0",
+            "R1,s1,P,,1,1,100.0",
+            "R2,s2,A,A,0,2,0.0",
+        ])
+
+    def test_xlsx_is_a_valid_workbook(self):
+        archive = zipfile.ZipFile(io.BytesIO(self.export(format="xlsx")))
+        self.assertIsNone(archive.testzip())
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+        ns = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+        self.assertEqual(len(sheet.findall("s:sheetData/s:row", ns)), 4)
+        ElementTree.fromstring(archive.read("xl/workbook.xml"))
+
+    def test_filename_is_quoted_safely(self):
+        Course.objects.filter(pk=self.course.pk).update(code='CS"301é')
+        self.client.force_login(self.faculty_user)
+        response = self.client.get(reverse("export_attendance"), {"course": self.course.id, "format": "xlsx"})
+        self.assertEqual(
+            response["Content-Disposition"], "attachment; filename*=utf-8''attendance-CS%22301%C3%A9.xlsx"
+        )
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content)))
+        workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+        ns = {"s": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+        self.assertEqual(workbook.find("s:sheets/s:sheet", ns).get("name"), 'CS"301é')
+
+    def test_bad_course_parameter(self):
+        self.client.force_login(self.faculty_user)
+        url = reverse("export_attendance")
+        self.assertEqual(self.client.get(url, {"course": "abc"}).status_code, 400)
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.assertEqual(self.client.get(url, {"course": self.course.id + 100}).status_code, 404)
+
+
+class AttendanceImportTests(TestCase):
+    """CSV imports upsert good rows in batches and report bad ones by line."""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        cls.course = Course.objects.create(code="CS401", name="Compilers", faculty=faculty)
+        for i in range(3):
+            student = StudentProfile.objects.create(user=User.objects.create(username=f"s{i}"), roll_no=f"R{i}")
+            if i < 2:
+                Enrollment.objects.create(student=student, course=cls.course, semester=1)
+
+    def test_import_validates_and_upserts(self):
+        lines = [
+            "roll_no,course,date,status",
+            "R0,CS401,2025-03-01,P",
+            "R1,CS401,01/03/2025,absent",
+            "R0,CS401,2025-03-01,A",
+            "R2,CS401,2025-03-01,P",
+            "R9,CS401,2025-03-01,P",
+            "R1,CS999,2025-03-01,P",
+            "R1,CS401,someday,P",
+            "R1,CS401,2025-03-02,late",
+        ]
+        report = AttendanceImporter(batch_size=2).run(lines)
+        self.assertEqual(report.rows, 8)
+        self.assertEqual(report.written, 3)
+        self.assertEqual([line for line, _ in report.errors], [5, 6, 7, 8, 9])
+        self.assertEqual(
+            set(Attendance.objects.values_list("student__roll_no", "status")),
+            {("R0", Attendance.ABSENT), ("R1", Attendance.ABSENT)},
+        )
+        self.assertEqual(AttendanceSummary.objects.drift(), [])
+        self.assertEqual(AttendanceSummary.objects.count(), 2)
+
+    def test_dry_run_writes_nothing(self):
+        report = AttendanceImporter(course=self.course, dry_run=True).run(["roll_no,date,status", "R0,2025-03-01,P"])
+        self.assertEqual((report.written, report.errors), (1, []))
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_missing_columns(self):
+        report = AttendanceImporter().run(["roll_no,status"])
+        self.assertEqual(report.errors, [(1, "missing column(s): course, date")])
+
+    def test_unchanged_rows_count_as_existing(self):
+        lines = ["roll_no,date,status", "R0,2025-03-01,P", "R1,2025-03-01,A"]
+        AttendanceImporter(course=self.course).run(lines)
+        report = AttendanceImporter(course=self.course).run(lines)
+        self.assertEqual((report.rows, report.written, report.existing, report.skipped), (2, 0, 2, 2))
+
+        lines[2] = "R1,2025-03-01,P"
+        report = AttendanceImporter(course=self.course, dry_run=True).run(lines)
+        self.assertEqual((report.written, report.existing), (1, 1))
+        self.assertEqual(Attendance.objects.get(student__roll_no="R1").status, Attendance.ABSENT)
+        report = AttendanceImporter(course=self.course).run(lines)
+        self.assertEqual((report.written, report.existing), (1, 1))
+        self.assertEqual(Attendance.objects.get(student__roll_no="R1").status, Attendance.PRESENT)
+        self.assertEqual(AttendanceSummary.objects.drift(), [])
+
+    def test_repeated_course_code_is_ambiguous(self):
+        twin = Course.objects.create(code="CS401", name="Compilers II", faculty=self.course.faculty)
+        Enrollment.objects.create(student=StudentProfile.objects.get(roll_no="R0"), course=twin, semester=1)
+        report = AttendanceImporter().run(["roll_no,course,date,status", "R0,CS401,2025-03-01,P"])
+        self.assertEqual(report.errors, [(2, "course code 'CS401' belongs to more than one course")])
+        self.assertFalse(Attendance.objects.exists())
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as fh:
+            fh.write("roll_no,date,status\nR0,2025-03-01,P\n")
+        self.addCleanup(os.remove, fh.name)
+        with self.assertRaisesMessage(CommandError, "belongs to more than one course"):
+            call_command("import_attendance", fh.name, course="CS401", stdout=io.StringIO())
+        self.assertFalse(Attendance.objects.exists())
+
+    @override_settings(TEMPLATES=STUB_TEMPLATE_SETTINGS)
+    def test_view_rejects_an_unknown_course(self):
+        self.client.force_login(self.course.faculty.user)
+        response = self.client.post(reverse("import_attendance"), {
+            "course": "abc", "file": SimpleUploadedFile("dump.csv", b"roll_no,date,status\nR0,2025-03-01,P\n"),
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Attendance.objects.exists())
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class StudentOnboardingTests(TestCase):
+    """Bulk onboarding creates every account once and can be re-run safely."""
+
+    INTAKE = [
+        "username,roll_no,password,email,semester",
+        "amy,R1,pw-amy,amy@example.com,1",
+        "ben,R2,pw-ben,,2",
+        "cat,R3,,,",
+        "amy,R4,pw,,1",
+        "dan,R5,pw,not-an-email,1",
+        "eve,R6,pw,,first",
+    ]
+
+    def test_onboard_then_rerun(self):
+        User.objects.create(username="taken")
+        report = StudentOnboarder(workers=1).run(self.INTAKE + ["taken,R7,pw,,1"])
+        self.assertEqual((report.rows, report.written, report.existing), (7, 3, 0))
+        self.assertEqual([line for line, _ in report.errors], [5, 6, 7, 8])
+
+        amy = User.objects.get(username="amy")
+        self.assertTrue(amy.check_password("pw-amy"))
+        self.assertFalse(User.objects.get(username="cat").has_usable_password())
+        self.assertEqual(amy.profile.role, "student")
+        self.assertEqual((amy.studentprofile.roll_no, amy.studentprofile.semester), ("R1", 1))
+        self.assertEqual(Profile.objects.exclude(user__username="taken").count(), 3)
+
+        again = StudentOnboarder(workers=1).run(self.INTAKE[:4])
+        self.assertEqual((again.written, again.existing, again.errors), (0, 3, []))
+        clash = StudentOnboarder(workers=1).run(["username,roll_no", "zed,R2"])
+        self.assertEqual(clash.errors, [(2, "roll number 'R2' already belongs to ben")])
+        self.assertEqual(StudentProfile.objects.count(), 3)
+
+    def test_admin_upload_is_onboarded_by_the_worker(self):
+        media, private = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.addCleanup(shutil.rmtree, private)
+        self.enterContext(override_settings(MEDIA_ROOT=media, PRIVATE_FILES_ROOT=private))
+        admin = User.objects.create_superuser("admin", password="pw")
+        self.client.force_login(admin)
+        url = reverse("admin:users_studentprofile_onboard")
+        intake = "\n".join(self.INTAKE).encode()
+        with mock.patch("users.onboarding.ProcessPoolExecutor") as pool:
+            response = self.client.post(url, {"file": SimpleUploadedFile("intake.csv", intake), "dry_run": "on"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([line for line, _ in response.context["report"].errors], [5, 6, 7])
+            self.assertFalse(Job.objects.exists())
+
+            response = self.client.post(url, {"file": SimpleUploadedFile("intake.csv", intake)})
+            self.assertEqual(response.status_code, 200)
+            pool.assert_not_called()  # No password hashing inside the request.
+        self.assertFalse(StudentProfile.objects.exists())
+        job = Job.objects.get(task="users.onboarding.onboard_students")
+        # The list, passwords and all, waits outside MEDIA_ROOT.
+        self.assertTrue(intake_storage().exists(job.kwargs["name"]))
+        self.assertEqual(os.listdir(media), [])
+
+        with mock.patch("users.onboarding.os.cpu_count", return_value=1), self.assertLogs("users.onboarding") as logs:
+            call_command("worker", once=True, concurrency=1, stdout=io.StringIO())
+        self.assertIn("3 of 6 students created", logs.output[-1])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(StudentProfile.objects.count(), 3)
+        self.assertTrue(User.objects.get(username="amy").check_password("pw-amy"))
+        self.assertFalse(intake_storage().exists(job.kwargs["name"]))
+
+    def test_failed_onboarding_job_deletes_the_intake_list(self):
+        private = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, private)
+        self.enterContext(override_settings(PRIVATE_FILES_ROOT=private))
+        job = queue_onboarding(io.BytesIO("\n".join(self.INTAKE).encode()))
+        with mock.patch.object(StudentOnboarder, "run", side_effect=RuntimeError("boom")), \
+                self.assertLogs("users.tasks", "ERROR"):
+            call_command("worker", once=True, concurrency=1, stdout=io.StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertFalse(intake_storage().exists(job.kwargs["name"]))
+
+    def test_hash_passwords_in_process_pool(self):
+        hashed = hash_passwords(["a", "", "b", "c"], workers=2)
+        self.assertEqual(len(hashed), 4)
+        self.assertTrue(hashed[0].startswith("md5$"))
+        self.assertTrue(hashed[1].startswith("!"))
+        self.assertEqual(len(set(hashed)), 4)
+
+
+class ProfileSignalTests(TestCase):
+    """User saves after creation no longer cascade into the profile tables."""
+
+    def test_role_follows_profile_type(self):
+        user = User.objects.create_user(username="prof", password="pw")
+        self.assertEqual(user.profile.role, "student")
+        FacultyProfile.objects.create(user=user)
+        user.profile.refresh_from_db()
+        self.assertEqual(user.profile.role, "faculty")
+
+    def test_last_login_update_is_one_write(self):
+        user = User.objects.create_user(username="amy", password="pw")
+        StudentProfile.objects.create(user=user)
+        user = User.objects.select_related("profile", "studentprofile").get(pk=user.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            user.last_login = datetime.now(dt_timezone.utc)
+            user.save(update_fields=["last_login"])
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+
+class CatalogCacheTests(TestCase):
+    """Catalog and material listings come from the cache until a save or delete."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        cls.course = Course.objects.create(code="CS501", name="Databases", faculty=cls.faculty)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_catalog_is_cached_and_invalidated(self):
+        self.assertEqual([c.code for c in course_catalog()], ["CS501"])
+        with self.assertNumQueries(0):
+            self.assertEqual(catalog_course(self.course.id).faculty.user.username, "prof")
+            self.assertIsNone(catalog_course(0))
+        Course.objects.create(code="CS502", name="Networks", faculty=self.faculty)
+        self.assertEqual([c.code for c in course_catalog()], ["CS501", "CS502"])
+        self.course.delete()
+        self.assertEqual([c.code for c in course_catalog()], ["CS502"])
+
+    def test_catalog_caches_no_credentials_and_follows_name_edits(self):
+        user = self.faculty.user
+        user.set_password("secret")
+        user.save()
+        course = catalog_course(self.course.id)
+        self.assertNotIn("password", course.faculty.user.__dict__)
+        self.assertNotIn(user.password, str(pickle.dumps(course_catalog())))
+
+        # A login leaves the catalog alone; a name change refreshes it.
+        user.last_login = timezone.now()
+        user.save(update_fields=["last_login"])
+        with self.assertNumQueries(0):
+            course_catalog()
+        user.first_name = "Ada"
+        user.save()
+        self.assertEqual(catalog_course(self.course.id).faculty.user.first_name, "Ada")
+
+    def test_materials_are_cached_per_course(self):
+        self.assertEqual(course_materials(self.course.id), [])
+        material = CourseMaterial.objects.create(course=self.course, title="Notes", file="course_materials/n.pdf")
+        with self.assertNumQueries(1):
+            self.assertEqual(course_materials(self.course.id), [material])
+            self.assertEqual(course_materials(self.course.id), [material])
+        material.delete()
+        self.assertEqual(course_materials(self.course.id), [])
+
+
+@override_settings(TEMPLATES=STUB_TEMPLATE_SETTINGS)
+class DashboardFragmentTests(TestCase):
+    """Dashboard widgets are served from the fragment cache until their rows change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        cls.course = Course.objects.create(code="CS601", name="Security", faculty=faculty)
+        cls.student = StudentProfile.objects.create(user=User.objects.create(username="amy"), roll_no="R1")
+        Enrollment.objects.create(student=cls.student, course=cls.course, semester=1)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student.user)
+        session = self.client.session
+        session[SESSION_KEY] = [STUDENT, self.student.pk]
+        session.save()
+
+    def dashboard(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("student_dashboard"))
+        return response.content.decode(), len(queries)
+
+    def test_warm_fragments_skip_queries_and_refresh_on_change(self):
+        cold, cold_queries = self.dashboard()
+        warm, warm_queries = self.dashboard()
+        self.assertEqual(cold, warm)
+        self.assertLess(warm_queries, cold_queries)
+
+        save_course_attendance(self.course, date(2025, 3, 1), {self.student.id: Attendance.PRESENT})
+        self.assertIn("1/1", self.dashboard()[0])
+
+        Assignment.objects.create(course=self.course, title="Lab 1", due_date=date.today())
+        material = CourseMaterial.objects.create(course=self.course, title="Handout", file="course_materials/h.pdf")
+        page = self.dashboard()[0]
+        self.assertIn("Lab 1", page)
+        self.assertIn("Handout", page)
+        # Linked through the access-checked download view, never the raw media URL.
+        self.assertIn(f'href="{reverse("download_file", args=["material", material.id])}"', page)
+        self.assertNotIn("/media/", page)
+
+    def test_deletes_bump_once_per_course(self):
+        for day in range(1, 6):
+            save_course_attendance(self.course, date(2025, 3, day), {self.student.id: Attendance.PRESENT})
+        self.assertIn("5/5", self.dashboard()[0])
+
+        # Deleting rows in the admin bumps the course once, not once per row.
+        site_admin = AttendanceAdmin(Attendance, admin.site)
+        with mock.patch("users.caching.bump_generation", wraps=bump_generation) as bump:
+            site_admin.delete_queryset(None, Attendance.objects.filter(date__gt=date(2025, 3, 3)))
+        self.assertEqual(bump.call_args_list, [mock.call(f"attendance:{self.course.pk}")])
+        self.assertIn("3/3", self.dashboard()[0])
+
+        # A course cascade bumps each of its generations once, whatever it deletes.
+        with mock.patch("users.caching.bump_generation", wraps=bump_generation) as bump:
+            Course.objects.filter(pk=self.course.pk).delete()
+        self.assertCountEqual(
+            [call.args[0] for call in bump.call_args_list],
+            ["catalog", *(f"{kind}:{self.course.pk}" for kind in FRAGMENT_KINDS)],
+        )
+
+
+@override_settings(TEMPLATES=STUB_TEMPLATE_SETTINGS)
+class ConditionalGetTests(TestCase):
+    """Unchanged student pages answer revalidation with 304 Not Modified."""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        cls.course = Course.objects.create(code="CS701", name="Graphics", faculty=faculty)
+        cls.student = StudentProfile.objects.create(user=User.objects.create(username="amy"), roll_no="R1")
+        Enrollment.objects.create(student=cls.student, course=cls.course, semester=1)
+        cls.assignment = Assignment.objects.create(course=cls.course, title="Lab 1", due_date=date.today())
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student.user)
+
+    def revalidate(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        return self.client.get(url, headers={"if-none-match": first["ETag"]})
+
+    def test_materials_page(self):
+        url = reverse("view_course_materials", args=[self.course.id])
+        self.assertEqual(self.revalidate(url).status_code, 304)
+        CourseMaterial.objects.create(course=self.course, title="Notes", file="course_materials/n.pdf")
+        first = self.client.get(url)
+        self.assertIn("Last-Modified", first)
+        self.assertEqual(self.revalidate(url).status_code, 304)
+        etag = first["ETag"]
+        more = CourseMaterial.objects.create(course=self.course, title="More", file="course_materials/m.pdf")
+        self.assertEqual(self.client.get(url, headers={"if-none-match": etag}).status_code, 200)
+
+        # Editing an older material changes neither the count nor the newest upload time.
+        etag = self.client.get(url)["ETag"]
+        notes = CourseMaterial.objects.get(title="Notes")
+        notes.title = "Notes (revised)"
+        notes.save()
+        self.assertEqual(self.client.get(url, headers={"if-none-match": etag}).status_code, 200)
+        etag = self.client.get(url)["ETag"]
+        more.delete()
+        self.assertEqual(self.client.get(url, headers={"if-none-match": etag}).status_code, 200)
+
+        # A material added by another process (signals bypassed here) is not in this
+        # process's cached list yet: the validators follow the body that is served.
+        etag = self.client.get(url)["ETag"]
+        CourseMaterial.objects.bulk_create([
+            CourseMaterial(course=self.course, title="Elsewhere", file="course_materials/e.pdf")
+        ])
+        self.assertEqual(self.client.get(url, headers={"if-none-match": etag}).status_code, 304)
+        # Once the cached list expires, the old ETag stops matching and the new list is served.
+        cache.clear()
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Elsewhere")
+
+    def test_assignments_page(self):
+        url = reverse("assignments_page")
+        self.assertEqual(self.revalidate(url).status_code, 304)
+        etag = self.client.get(url)["ETag"]
+        AssignmentSubmission.objects.create(assignment=self.assignment, student=self.student)
+        self.assertEqual(self.client.get(url, headers={"if-none-match": etag}).status_code, 200)
+        etag = self.client.get(url)["ETag"]
+        self.assignment.due_date += timedelta(days=3)
+        self.assignment.save()
+        self.assertEqual(self.client.get(url, headers={"if-none-match": etag}).status_code, 200)
+
+
+class ResumableUploadTests(TestCase):
+    """Files sent in chunks are reassembled byte-for-byte and checked against their hash."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty_user = User.objects.create(username="prof")
+        faculty = FacultyProfile.objects.create(user=cls.faculty_user)
+        cls.course = Course.objects.create(code="CS801", name="Media", faculty=faculty)
+        cls.student = StudentProfile.objects.create(user=User.objects.create(username="amy"), roll_no="R1")
+        Enrollment.objects.create(student=cls.student, course=cls.course, semester=1)
+        cls.assignment = Assignment.objects.create(course=cls.course, title="Essay", due_date=date.today())
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.data = bytes(range(256)) * 40
+
+    def start(self, **fields):
+        response = self.client.post(reverse("upload_start"), {
+            "filename": "lecture.mp4", "size": len(self.data),
+            "sha256": hashlib.sha256(self.data).hexdigest(), **fields,
+        })
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def send(self, state, offset, data):
+        return self.client.put(
+            state["chunk_url"], data, content_type="application/octet-stream",
+            headers={"upload-offset": str(offset)},
+        )
+
+    def assemble(self):
+        call_command("worker", once=True, concurrency=1, stdout=io.StringIO())
+
+    def test_material_upload_resumes_and_assembles(self):
+        self.client.force_login(self.faculty_user)
+        state = self.start(purpose="material", target=self.course.id, title="Lecture 1")
+        self.assertEqual(self.send(state, 0, self.data[:4000]).json()["offset"], 4000)
+        # A chunk sent at the wrong offset is refused and the client told where to resume.
+        stale = self.send(state, 0, self.data[:4000])
+        self.assertEqual((stale.status_code, stale.json()["offset"]), (409, 4000))
+        status = self.client.get(state["status_url"]).json()
+        self.assertEqual((status["offset"], status["status"]), (4000, UploadSession.RECEIVING))
+        self.assertEqual(self.client.post(state["complete_url"]).status_code, 409)
+        self.assertEqual(self.send(state, 4000, self.data[4000:8000]).status_code, 200)
+        self.assertEqual(self.send(state, 8000, self.data[8000:]).json()["offset"], len(self.data))
+
+        # Completing only queues the assembly; nothing is copied in the request.
+        response = self.client.post(state["complete_url"])
+        self.assertEqual((response.status_code, response.json()["status"]), (202, UploadSession.ASSEMBLING))
+        self.assertFalse(CourseMaterial.objects.exists())
+        self.assertEqual(self.client.post(state["complete_url"]).status_code, 409)
+        self.assertEqual(self.send(state, len(self.data), b"more").status_code, 409)
+
+        self.assemble()
+        status = self.client.get(state["status_url"]).json()
+        self.assertEqual((status["status"], status["complete"]), (UploadSession.DONE, True))
+        self.assertEqual(status["redirect"], reverse("faculty_courses"))
+        # Only the first poll that sees the upload finished flashes the message.
+        response = self.client.get(state["status_url"])
+        self.assertEqual([str(m) for m in get_messages(response.wsgi_request)], ["Material uploaded successfully."])
+        material = CourseMaterial.objects.get(course=self.course)
+        self.assertEqual(material.title, "Lecture 1")
+        with material.file.open("rb") as fh:
+            self.assertEqual(fh.read(), self.data)
+        self.assertEqual(UploadSession.objects.get().parts, [])
+        self.assertEqual(self.client.post(state["complete_url"]).status_code, 409)
+
+    def test_checksum_mismatch_fails_the_upload(self):
+        self.client.force_login(self.student.user)
+        state = self.start(purpose="submission", target=self.assignment.id)
+        self.send(state, 0, b"x" * len(self.data))
+        self.assertEqual(self.client.post(state["complete_url"]).status_code, 202)
+        self.assemble()
+        status = self.client.get(state["status_url"]).json()
+        self.assertEqual(status["status"], UploadSession.FAILED)
+        self.assertIn("checksum", status["error"])
+        self.assertNotIn("redirect", status)
+        self.assertFalse(AssignmentSubmission.objects.exists())
+        self.assertEqual(UploadSession.objects.get().parts, [])
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, "uploads", "partial")), [])
+
+    def test_submission_and_access_rules(self):
+        self.client.force_login(self.student.user)
+        self.assertEqual(self.client.post(reverse("upload_start"), {
+            "purpose": "material", "target": self.course.id, "filename": "x", "size": 1, "title": "x",
+        }).status_code, 404)
+        state = self.start(purpose="submission", target=self.assignment.id)
+        self.send(state, 0, self.data)
+        self.client.post(state["complete_url"])
+        self.assemble()
+        self.assertEqual(self.client.get(state["status_url"]).json()["redirect"], reverse("assignments_page"))
+        self.assertEqual(AssignmentSubmission.objects.get().student, self.student)
+        self.assertEqual(self.client.post(reverse("upload_start"), {
+            "purpose": "submission", "target": self.assignment.id, "filename": "again.pdf", "size": 1,
+        }).status_code, 409)
+        self.client.force_login(self.faculty_user)
+        self.assertEqual(self.client.get(reverse("upload_status", args=[state["upload"]])).status_code, 404)
+
+    def test_assembly_failure_is_reported_to_the_client(self):
+        self.client.force_login(self.student.user)
+        first = self.start(purpose="submission", target=self.assignment.id)
+        second = self.start(purpose="submission", target=self.assignment.id)
+        for state in (first, second):
+            self.send(state, 0, self.data)
+            self.assertEqual(self.client.post(state["complete_url"]).status_code, 202)
+        self.assemble()
+        statuses = [self.client.get(state["status_url"]).json() for state in (first, second)]
+        self.assertEqual([s["status"] for s in statuses], [UploadSession.DONE, UploadSession.FAILED])
+        self.assertEqual(statuses[1]["error"], "You have already submitted this assignment.")
+        self.assertEqual(AssignmentSubmission.objects.count(), 1)
+
+
+class ProtectedDownloadTests(TestCase):
+    """Uploaded files are served only to the users allowed to see them, with Range support."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty_user = User.objects.create(username="prof")
+        faculty = FacultyProfile.objects.create(user=cls.faculty_user)
+        cls.course = Course.objects.create(code="CS901", name="Storage", faculty=faculty)
+        cls.student = StudentProfile.objects.create(user=User.objects.create(username="amy"), roll_no="R1")
+        cls.other = StudentProfile.objects.create(user=User.objects.create(username="ben"), roll_no="R2")
+        Enrollment.objects.create(student=cls.student, course=cls.course, semester=1)
+        cls.assignment = Assignment.objects.create(course=cls.course, title="Report", due_date=date.today())
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.data = bytes(range(256)) * 8
+        self.submission = AssignmentSubmission.objects.create(assignment=self.assignment, student=self.student)
+        self.submission.submitted_file.save("report.pdf", ContentFile(self.data))
+
+    def download(self, user, kind="submission", pk=None, **headers):
+        self.client.force_login(user)
+        return self.client.get(reverse("download_file", args=[kind, pk or self.submission.pk]), headers=headers)
+
+    def test_access_rules(self):
+        self.assertEqual(self.download(self.student.user).status_code, 200)
+        self.assertEqual(self.download(self.faculty_user).status_code, 200)
+        self.assertEqual(self.download(self.other.user).status_code, 404)
+        self.assertEqual(self.download(self.student.user, kind="assignment", pk=self.assignment.pk).status_code, 404)
+
+    def test_full_and_ranged_downloads(self):
+        response = self.download(self.student.user)
+        self.assertEqual(b"".join(response.streaming_content), self.data)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+        response = self.download(self.student.user, range="bytes=100-199")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.data)}")
+        self.assertEqual(b"".join(response.streaming_content), self.data[100:200])
+
+        response = self.download(self.student.user, range="bytes=-10")
+        self.assertEqual(b"".join(response.streaming_content), self.data[-10:])
+        response = self.download(self.student.user, range=f"bytes={len(self.data)}-")
+        self.assertEqual(response.status_code, 416)
+
+    def test_submission_archive(self):
+        other = AssignmentSubmission.objects.create(assignment=self.assignment, student=self.other)
+        other.submitted_file.save("Essay Final.DOCX", ContentFile(b"second file"))
+        gone = StudentProfile.objects.create(user=User.objects.create(username="cy"), roll_no="R3")
+        lost = AssignmentSubmission.objects.create(assignment=self.assignment, student=gone)
+        lost.submitted_file.save("lost.pdf", ContentFile(b"lost"))
+        os.remove(lost.submitted_file.path)
+        url = reverse("download_submissions", args=[self.assignment.id])
+
+        self.client.force_login(self.student.user)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_login(self.faculty_user)
+        response = self.client.get(url)
+        self.assertEqual(response["Content-Type"], "application/zip")
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 1)
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+            self.assertEqual(archive.namelist(), ["R1_amy.pdf", "R2_ben.docx", "MISSING.txt"])
+            self.assertEqual(archive.read("R1_amy.pdf"), self.data)
+            self.assertEqual(archive.read("R2_ben.docx"), b"second file")
+            self.assertIn(b"R3_cy.pdf", archive.read("MISSING.txt"))
+            self.assertTrue(all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist()))
+
+    @override_settings(PROTECTED_MEDIA_SERVER="x-accel", PROTECTED_MEDIA_ACCEL_PREFIX="/protected/")
+    def test_web_server_offload(self):
+        response = self.download(self.faculty_user)
+        digest = hashlib.sha256(self.data).hexdigest()
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected/blobs/{digest[:2]}/{digest[2:4]}/{digest}")
+        self.assertEqual(response.content, b"")
+
+
+class DeduplicatedStorageTests(TestCase):
+    """Identical uploads share one blob, which gc_blobs removes once nothing points at it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = FacultyProfile.objects.create(user=User.objects.create(username="prof"))
+        cls.courses = [
+            Course.objects.create(code=f"CS95{i}", name=f"Course {i}", faculty=faculty) for i in range(2)
+        ]
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+
+    def upload(self, course, name, data):
+        material = CourseMaterial(course=course, title=name)
+        material.file.save(name, ContentFile(data))
+        return material
+
+    def test_identical_content_is_stored_once(self):
+        first = self.upload(self.courses[0], "syllabus.pdf", b"same bytes")
+        second = self.upload(self.courses[1], "copy of syllabus.pdf", b"same bytes")
+        other = self.upload(self.courses[1], "notes.pdf", b"different bytes")
+
+        self.assertTrue(first.file.name.endswith("/syllabus.pdf"))
+        self.assertEqual(first.file.path, second.file.path)
+        self.assertNotEqual(first.file.path, other.file.path)
+        with second.file.open("rb") as fh:
+            self.assertEqual(fh.read(), b"same bytes")
+        blob = StoredBlob.objects.get(size=len(b"same bytes"))
+        self.assertEqual(blob.refcount, 2)
+
+        first.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.refcount, 1)
+        second.delete()
+        path = content_addressed_storage.path(content_addressed_storage.blob_name(blob.digest))
+        call_command("gc_blobs", grace_hours=0, stdout=io.StringIO())
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(list(StoredBlob.objects.values_list("refcount", flat=True)), [1])
+        self.assertTrue(os.path.exists(other.file.path))
+
+    def test_gc_corrects_drifted_counters(self):
+        material = self.upload(self.courses[0], "a.pdf", b"abc")
+        StoredBlob.objects.update(refcount=0)
+        call_command("gc_blobs", grace_hours=0, stdout=io.StringIO())
+        self.assertEqual(StoredBlob.objects.get().refcount, 1)
+        self.assertTrue(os.path.exists(material.file.path))
+
+
+@override_settings(TEMPLATES=STUB_TEMPLATE_SETTINGS)
+class ImageVariantTests(TestCase):
+    """Profile images get small, EXIF-free WebP/JPEG copies, built by the background worker."""
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.student = StudentProfile.objects.create(user=User.objects.create(username="amy"), roll_no="R1")
+
+    def jpeg_with_exif(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90 degrees clockwise to display.
+        exif[0x010F] = "PhoneMaker"
+        buffer = io.BytesIO()
+        Image.new("RGB", (1200, 600), "red").save(buffer, "JPEG", exif=exif)
+        return buffer.getvalue()
+
+    def png_signature(self):
+        buffer = io.BytesIO()
+        Image.new("RGBA", (1000, 200), (0, 0, 0, 0)).save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def upload(self):
+        self.student.photo.save("me.jpg", ContentFile(self.jpeg_with_exif()), save=False)
+        self.student.signature.save("sig.png", ContentFile(self.png_signature()), save=False)
+        self.student.save()
+        self.assertFalse(self.student.photo.storage.exists(variant_name(self.student.photo.name, "thumb", "jpg")))
+        call_command("worker", once=True, concurrency=1, stdout=io.StringIO())
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+    def open_variant(self, field, variant, ext):
+        return Image.open(field.storage.path(variant_name(field.name, variant, ext)))
+
+    def test_variants_are_resized_and_stripped(self):
+        self.upload()
+        for variant, size in [("thumb", (64, 64)), ("avatar", (240, 240))]:
+            for ext, fmt in [("webp", "WEBP"), ("jpg", "JPEG")]:
+                with self.open_variant(self.student.photo, variant, ext) as image:
+                    self.assertEqual((image.format, image.size), (fmt, size))
+                    self.assertEqual(dict(image.getexif()), {})
+        with self.open_variant(self.student.signature, "signature", "jpg") as image:
+            self.assertEqual(image.size, (480, 96))
+            self.assertEqual(image.mode, "RGB")
+
+    def test_template_tags_fall_back_to_the_original(self):
+        template = Template(
+            '{% load image_variants %}{% variant_url student.photo "avatar" %}|{% picture student.photo "thumb" alt="Amy" %}'
+        )
+        self.student.photo.save("me.jpg", ContentFile(self.jpeg_with_exif()))
+        before = template.render(Context({"student": self.student}))
+        self.assertTrue(before.startswith(self.student.photo.url + "|"))
+        self.assertNotIn("image/webp", before)
+
+        call_command("build_image_variants", stdout=io.StringIO())
+        after = template.render(Context({"student": self.student}))
+        self.assertTrue(after.startswith(f"/media/{VARIANT_DIR}/student_photos/me.avatar.jpg|"))
+        self.assertIn('srcset="/media/variants/student_photos/me.thumb.webp" type="image/webp"', after)
+        self.assertIn('width="64" height="64"', after)
+
+    def test_unreadable_upload_is_skipped(self):
+        self.student.photo.save("broken.jpg", ContentFile(b"not an image"))
+        with self.assertLogs("users.images", "WARNING"):
+            call_command("build_image_variants", stdout=io.StringIO())
+        self.assertFalse(self.student.photo.storage.exists(variant_name(self.student.photo.name, "thumb", "jpg")))
+
+
+RAN = []
+
+
+@task(name="tests.record")
+def record(value):
+    RAN.append(value)
+
+
+@task(name="tests.explode", max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+class JobQueueTests(TestCase):
+    """Jobs run by priority once due, are claimed once, and retry with backoff."""
+
+    def setUp(self):
+        RAN.clear()
+
+    def work(self, **options):
+        call_command("worker", once=True, stdout=io.StringIO(), stderr=io.StringIO(), **options)
+
+    def test_priority_and_schedule(self):
+        enqueue_task("tests.record", {"value": "low"})
+        enqueue_task("tests.record", {"value": "high"}, priority=5)
+        record.enqueue(value="later", delay=timedelta(hours=1))
+        self.work(concurrency=1)
+        self.assertEqual(RAN, ["high", "low"])
+        self.assertEqual(Job.objects.filter(status=Job.QUEUED).count(), 1)
+
+        Job.objects.filter(status=Job.QUEUED).update(run_at=timezone.now())
+        self.work(concurrency=1)
+        self.assertEqual(RAN, ["high", "low", "later"])
+
+    def test_claimed_jobs_are_not_handed_out_twice(self):
+        for value in range(3):
+            record.enqueue(value=value)
+        first = claim_jobs("a", 2)
+        second = claim_jobs("b", 2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({job.pk for job in first} & {job.pk for job in second})
+        self.assertEqual(claim_jobs("c", 2), [])
+
+        Job.objects.filter(pk=second[0].pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual([job.pk for job in claim_jobs("c", 2)], [second[0].pk])
+
+    def test_leases_are_renewed_while_running(self):
+        record.enqueue(value="slow")
+        job = claim_jobs("a", 1)[0]
+        self.assertGreater(job.locked_until, timezone.now())
+
+        # A long job keeps pushing its lease forward, so housekeeping leaves it alone.
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(renew_lease(job))
+        self.assertEqual(requeue_stale(), 0)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, Job.RUNNING)
+
+        with mock.patch.object(tasks, "HEARTBEAT_INTERVAL", timedelta(milliseconds=5)), \
+                mock.patch.object(tasks, "renew_lease", return_value=True) as renew:
+            with heartbeat(job):
+                time.sleep(0.1)
+            beats = renew.call_count
+            time.sleep(0.05)
+        self.assertGreaterEqual(beats, 2)
+        self.assertEqual(renew.call_count, beats)
+
+        # Once another worker has it, the old one can no longer renew.
+        Job.objects.filter(pk=job.pk).update(locked_by="b")
+        self.assertFalse(renew_lease(job))
+
+    def test_lapsed_last_attempt_fails(self):
+        job = record.enqueue(value="x")
+        Job.objects.filter(pk=job.pk).update(max_attempts=1)
+        claim_jobs("a", 1)
+        Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        with self.assertLogs("users.tasks", "ERROR"):
+            self.assertEqual(requeue_stale(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_until), (Job.FAILED, None))
+
+        # A queued job with no attempts left is never claimed again.
+        Job.objects.filter(pk=job.pk).update(status=Job.QUEUED)
+        self.assertEqual(claim_jobs("a", 1), [])
+
+    def test_failures_retry_then_stop(self):
+        job = explode.enqueue()
+        with self.assertLogs("users.tasks", "WARNING"):
+            self.work(concurrency=1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn("RuntimeError: boom", job.last_error)
+        self.assertGreater(job.run_at, timezone.now())
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs("users.tasks", "ERROR"):
+            self.work(concurrency=1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+
+class RecordingEmailBackend(locmem.EmailBackend):
+    """locmem backend that also counts connections opened and ``send_messages`` calls.
+
+    With ``limit`` set, each call sends only that many messages, like a relay
+    that starts refusing part way through a batch.
+    """
+
+    opened = 0
+    batches = []
+    limit = None
+
+    def open(self):
+        RecordingEmailBackend.opened += 1
+        return super().open()
+
+    def send_messages(self, messages):
+        RecordingEmailBackend.batches.append(len(messages))
+        return super().send_messages(messages[:RecordingEmailBackend.limit])
+
+
+@override_settings(
+    TEMPLATES=STUB_TEMPLATE_SETTINGS,
+    EMAIL_BACKEND="users.tests.RecordingEmailBackend",
+    NOTIFICATION_RATE_PER_MINUTE=0,
+)
+class AssignmentNotificationTests(TestCase):
+    """New assignments are emailed to the course's students by the worker, once each."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty_user = User.objects.create(username="prof")
+        cls.faculty = FacultyProfile.objects.create(user=cls.faculty_user)
+        cls.course = Course.objects.create(code="CS990", name="Mail", faculty=cls.faculty)
+        cls.students = []
+        for i, email in enumerate(["a@example.com", "b@example.com", ""]):
+            student = StudentProfile.objects.create(
+                user=User.objects.create(username=f"s{i}", email=email), roll_no=f"R{i}"
+            )
+            Enrollment.objects.create(student=student, course=cls.course, semester=1)
+            cls.students.append(student)
+        StudentProfile.objects.create(user=User.objects.create(username="outsider", email="o@example.com"))
+
+    def setUp(self):
+        RecordingEmailBackend.opened = 0
+        RecordingEmailBackend.batches = []
+        RecordingEmailBackend.limit = None
+
+    def work(self):
+        call_command("worker", once=True, concurrency=1, stdout=io.StringIO(), stderr=io.StringIO())
+
+    def test_create_assignment_queues_one_email_per_student(self):
+        self.client.force_login(self.faculty_user)
+        session = self.client.session
+        session[SESSION_KEY] = [FACULTY, self.faculty.pk]
+        session.save()
+        response = self.client.post(reverse("create_assignment"), {
+            "course": self.course.pk, "title": "Essay", "description": "500 words", "due_date": "2030-01-31",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(mail.outbox, [])
+
+        self.work()
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["a@example.com", "b@example.com"])
+        self.assertEqual(mail.outbox[0].subject, "[CS990] New assignment: Essay")
+        self.assertIn("500 words", mail.outbox[0].body)
+        self.assertEqual((RecordingEmailBackend.opened, RecordingEmailBackend.batches), (1, [2]))
+
+        # A repeat of the job (a retry, a double click) sends nothing new.
+        assignment = Assignment.objects.get()
+        Job.objects.create(task="users.notifications.notify_assignment_created", kwargs={"assignment_id": assignment.pk})
+        self.work()
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(NotificationLog.objects.filter(object_id=assignment.pk).count(), 2)
+
+    def test_batches_share_one_connection(self):
+        recipients = [(student.user_id, f"{student.user.username}@example.com") for student in self.students]
+        sent = fan_out(NotificationLog.ASSIGNMENT_CREATED, 1, "Subject", "Body", recipients, batch_size=2)
+        self.assertEqual(sent, 3)
+        self.assertEqual((RecordingEmailBackend.opened, RecordingEmailBackend.batches), (1, [2, 1]))
+
+    def test_partly_sent_batch_logs_only_the_sent_and_retries(self):
+        assignment = Assignment.objects.create(course=self.course, title="Quiz", due_date=date(2030, 1, 31))
+        job = notify_assignment_created.enqueue(assignment_id=assignment.pk)
+        RecordingEmailBackend.limit = 1
+        with self.assertLogs("users.tasks", "WARNING"):
+            self.work()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn("DeliveryError: Mail backend sent 1 of 2 messages", job.last_error)
+        self.assertEqual([m.to[0] for m in mail.outbox], ["a@example.com"])
+        logged = NotificationLog.objects.filter(object_id=assignment.pk).values_list("user__email", flat=True)
+        self.assertEqual(list(logged), ["a@example.com"])
+
+        # The retry sends only to the student who was missed.
+        RecordingEmailBackend.limit = None
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.work()
+        self.assertEqual([m.to[0] for m in mail.outbox], ["a@example.com", "b@example.com"])
+        self.assertEqual(NotificationLog.objects.filter(object_id=assignment.pk).count(), 2)
+
+
+@override_settings(TEMPLATES=STUB_TEMPLATE_SETTINGS)
+class GradebookTests(TestCase):
+    """Weighted totals, grades, ranks and GPAs computed for a whole cohort at once."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty_user = User.objects.create(username="prof")
+        cls.faculty = FacultyProfile.objects.create(user=cls.faculty_user)
+        cls.theory = Course.objects.create(code="CS501", name="Theory", faculty=cls.faculty, credits=4)
+        cls.lab = Course.objects.create(code="CS502", name="Lab", faculty=cls.faculty, credits=2)
+        cls.seminar = Course.objects.create(code="CS503", name="Seminar", faculty=cls.faculty)
+        cls.earlier = Course.objects.create(code="CS401", name="Earlier", faculty=cls.faculty, credits=3)
+        cls.mid = Assessment.objects.create(course=cls.theory, title="Mid", max_marks=50, weight=40)
+        cls.final = Assessment.objects.create(course=cls.theory, title="Final", max_marks=100, weight=60)
+        cls.practical = Assessment.objects.create(course=cls.lab, title="Practical", max_marks=10, weight=1)
+        cls.students = [
+            StudentProfile.objects.create(user=User.objects.create(username=name), roll_no=f"R{i}", department="CSE")
+            for i, name in enumerate(["amy", "ben", "cy"])
+        ]
+        for student in cls.students:
+            for course in (cls.theory, cls.lab, cls.seminar):
+                Enrollment.objects.create(student=student, course=course, semester=2)
+        amy, ben, cy = cls.students
+        for student, scores in [(amy, (45, 90, 10)), (ben, (40, 80, 10)), (cy, (20, 30, None))]:
+            for assessment, score in zip((cls.mid, cls.final, cls.practical), scores):
+                if score is not None:
+                    Mark.objects.create(assessment=assessment, student=student, score=score)
+        CourseResult.objects.create(
+            student=amy, course=cls.earlier, semester=1, total=55, grade="B", grade_point=6, rank=1
+        )
+
+    def test_competition_ranks(self):
+        self.assertEqual(list(competition_ranks([70, 90, 90, 50])), [3, 1, 1, 4])
+        self.assertEqual(list(competition_ranks([1, 2, 5, 5], groups=[7, 7, 8, 8])), [2, 1, 1, 1])
+
+    def test_publish_results(self):
+        report = publish_results(2, department="CSE")
+        self.assertEqual((report.students, report.course_results, report.ungraded), (3, 6, {self.seminar.pk}))
+        amy, ben, cy = self.students
+        results = {
+            (r.student_id, r.course_id): (str(r.total), r.grade, r.grade_point, r.rank)
+            for r in CourseResult.objects.filter(semester=2)
+        }
+        self.assertEqual(results[amy.pk, self.theory.pk], ("90.00", "O", 10, 1))
+        self.assertEqual(results[ben.pk, self.theory.pk], ("80.00", "A+", 9, 2))
+        self.assertEqual(results[cy.pk, self.theory.pk], ("34.00", "F", 0, 3))
+        self.assertEqual(results[ben.pk, self.lab.pk][3], 1)  # Tied with amy.
+        self.assertEqual(results[cy.pk, self.lab.pk], ("0.00", "F", 0, 3))
+
+        semesters = {r.student_id: (str(r.sgpa), str(r.cgpa), r.credits, r.rank) for r in SemesterResult.objects.all()}
+        self.assertEqual(semesters[amy.pk], ("10.00", "8.67", 6, 1))
+        self.assertEqual(semesters[ben.pk], ("9.33", "9.33", 6, 2))
+        self.assertEqual(semesters[cy.pk], ("0.00", "0.00", 6, 3))
+
+        # Publishing again replaces rather than duplicates.
+        Mark.objects.filter(student=cy, assessment=self.final).update(score=100)
+        publish_results(2)
+        self.assertEqual(CourseResult.objects.filter(semester=2).count(), 6)
+        self.assertEqual(CourseResult.objects.get(student=cy, course=self.theory, semester=2).grade, "A")
+
+    def test_gradebook_saves_marks(self):
+        self.client.force_login(self.faculty_user)
+        session = self.client.session
+        session[SESSION_KEY] = [FACULTY, self.faculty.pk]
+        session.save()
+        url = reverse("course_gradebook", args=[self.lab.id])
+        amy, ben, cy = self.students
+
+        for bad in ("11", "abc", "NaN", "sNaN", "-Infinity"):
+            response = self.client.post(url, {"assessment": self.practical.pk, f"mark_{cy.pk}": bad})
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(Mark.objects.filter(student=cy, assessment=self.practical).exists())
+
+        # Only assessments of this course can be saved from its gradebook.
+        response = self.client.post(url, {"assessment": self.mid.pk, f"mark_{cy.pk}": "4"})
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(url, {
+            "assessment": self.practical.pk, f"mark_{amy.pk}": "9.5", f"mark_{ben.pk}": "", f"mark_{cy.pk}": "4",
+        })
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        marks = dict(Mark.objects.filter(assessment=self.practical).values_list("student_id", "score"))
+        self.assertEqual(marks, {amy.pk: Decimal("9.50"), cy.pk: Decimal("4.00")})
+
+        response = self.client.get(url)
+        rows = {student.pk: total for student, _, total in response.context["rows"]}
+        self.assertEqual(rows[amy.pk], (Decimal("95.00"), "O", 10))
+        self.assertEqual(rows[ben.pk], (Decimal("0.00"), "F", 0))
+
+        self.client.post(url, {"add_assessment": "1", "title": "Viva", "kind": "other", "max_marks": "20", "weight": "1"})
+        self.assertEqual(list(self.lab.assessments.values_list("title", flat=True)), ["Practical", "Viva"])
+
+    def test_large_roster_saves_within_the_field_limit(self):
+        course = Course.objects.create(code="CS600", name="Big", faculty=self.faculty)
+        assessments = [
+            Assessment.objects.create(course=course, title=f"Quiz {n}", max_marks=10, weight=1) for n in range(4)
+        ]
+        users = User.objects.bulk_create(User(username=f"big{i}") for i in range(300))
+        students = StudentProfile.objects.bulk_create(
+            StudentProfile(user=user, roll_no=f"B{i:03}") for i, user in enumerate(users)
+        )
+        Enrollment.objects.bulk_create(Enrollment(student=s, course=course, semester=2) for s in students)
+        self.assertGreater(len(assessments) * len(students), settings.DATA_UPLOAD_MAX_NUMBER_FIELDS)
+
+        self.client.force_login(self.faculty_user)
+        session = self.client.session
+        session[SESSION_KEY] = [FACULTY, self.faculty.pk]
+        session.save()
+        url = reverse("course_gradebook", args=[course.id])
+        for assessment in assessments:
+            response = self.client.post(url, {"assessment": assessment.pk, **{f"mark_{s.pk}": "5" for s in students}})
+            self.assertRedirects(response, url, fetch_redirect_response=False)
+        self.assertEqual(Mark.objects.filter(assessment__course=course).count(), 1200)
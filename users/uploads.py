@@ -0,0 +1,295 @@
+import hashlib
+import os
+import re
+import uuid
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import (
+    Assignment,
+    AssignmentSubmission,
+    Course,
+    CourseMaterial,
+    StudentProfile,
+    UploadSession,
+)
+from .tasks import task
+
+# Clients are told to send UPLOAD_CHUNK_SIZE bytes per request; anything up to
+# UPLOAD_MAX_CHUNK is accepted so a client may pick its own size.
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+UPLOAD_MAX_CHUNK = 32 * 1024 * 1024
+UPLOAD_MAX_SIZE = 4 * 1024 * 1024 * 1024
+UPLOAD_PART_DIR = "uploads/partial"
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Protocol
+# --------
+# 1. ``start_upload`` records the file's name, size and (optionally) SHA-256.
+# 2. Each chunk is sent as a raw request body together with the byte offset
+#    it starts at. ``write_chunk`` streams it into its own storage object
+#    under ``uploads/partial/<session>/``, then records it in
+#    ``UploadSession.parts`` and advances ``UploadSession.received``. A request therefore only ever holds one chunk,
+#    and a dropped connection loses at most that chunk: the client asks for
+#    the session's offset and carries on from there.
+# 3. ``complete_upload`` marks the session ``assembling`` and queues the
+#    ``assemble_upload`` job; the request returns at once. The job streams
+#    the parts, in order, into the target FileField's storage, checks
+#    length and checksum, creates the CourseMaterial or
+#    AssignmentSubmission and deletes the parts. Copying and hashing a
+#    4 GiB file takes minutes, far longer than a request may.
+# 4. The client polls the session until its status is ``done`` or
+#    ``failed``; a failed session carries the reason in ``error``.
+
+
+class UploadError(Exception):
+    """A protocol error, carrying the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# ---------------- Readers ----------------
+class _HashingReader:
+    """Read-only stream wrapper that counts and hashes bytes and enforces a limit."""
+
+    def __init__(self, stream, limit):
+        self.stream = stream
+        self.limit = limit
+        self.count = 0
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.count += len(data)
+        if self.count > self.limit:
+            raise UploadError(f"Chunk is larger than the {self.limit} bytes allowed here.", status=413)
+        self.digest.update(data)
+        return data
+
+
+class _PartsReader:
+    """The parts of an upload read back-to-back as one stream, in offset order."""
+
+    def __init__(self, storage, names):
+        self.storage = storage
+        self.names = iter(names)
+        self.current = None
+
+    def read(self, size=-1):
+        while True:
+            if self.current is None:
+                name = next(self.names, None)
+                if name is None:
+                    return b""
+                self.current = self.storage.open(name, "rb")
+            data = self.current.read(size)
+            if data:
+                return data
+            self.current.close()
+            self.current = None
+
+
+# ---------------- Parts ----------------
+def _part_dir(session):
+    return f"{UPLOAD_PART_DIR}/{session.pk}"
+
+
+def purge_parts(session):
+    """Delete every stored chunk of a session, accepted or abandoned."""
+    directory = _part_dir(session)
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        files = []
+    for name in files:
+        default_storage.delete(f"{directory}/{name}")
+    try:
+        default_storage.delete(directory)
+    except OSError:
+        pass
+
+
+# ---------------- Protocol ----------------
+def _resolve_target(user, purpose, target_id):
+    if purpose == UploadSession.MATERIAL:
+        course = Course.objects.filter(pk=target_id, faculty__user=user).first()
+        if course is None:
+            raise UploadError("Course not found.", status=404)
+        return course
+    if purpose == UploadSession.SUBMISSION:
+        student = StudentProfile.objects.filter(user=user).first()
+        assignment = (
+            Assignment.objects.filter(pk=target_id, course__in=Course.objects.taken_by(student)).first()
+            if student else None
+        )
+        if assignment is None:
+            raise UploadError("Assignment not found.", status=404)
+        if AssignmentSubmission.objects.filter(assignment=assignment, student=student).exists():
+            raise UploadError("You have already submitted this assignment.", status=409)
+        return assignment
+    raise UploadError("Unknown upload purpose.")
+
+
+def start_upload(user, purpose, target_id, filename, size, sha256="", metadata=None):
+    """Validate an upload request and open an ``UploadSession`` for it."""
+    try:
+        target_id, size = int(target_id), int(size)
+    except (TypeError, ValueError):
+        raise UploadError("target and size must be integers.") from None
+    filename = os.path.basename((filename or "").replace("\\", "/")).strip()
+    sha256 = (sha256 or "").strip().lower()
+    metadata = metadata or {}
+    if not filename:
+        raise UploadError("A file name is required.")
+    if not 0 < size <= UPLOAD_MAX_SIZE:
+        raise UploadError(f"File size must be between 1 and {UPLOAD_MAX_SIZE} bytes.")
+    if sha256 and not SHA256_RE.match(sha256):
+        raise UploadError("sha256 must be 64 hex digits.")
+    if purpose == UploadSession.MATERIAL and not metadata.get("title"):
+        raise UploadError("A title is required for course material.")
+    _resolve_target(user, purpose, target_id)
+    return UploadSession.objects.create(
+        user=user, purpose=purpose, target_id=target_id, filename=filename[:255],
+        size=size, sha256=sha256, metadata=metadata,
+    )
+
+
+def write_chunk(session, offset, stream, sha256=""):
+    """Store the chunk starting at ``offset`` and return the new offset.
+
+    ``offset`` must equal the bytes already received; a retry of a chunk that
+    did arrive, or one sent out of order, gets a 409 so the client can
+    re-sync from ``session.received``.
+    """
+    if session.status != UploadSession.RECEIVING:
+        raise UploadError("This upload is already complete.", status=409)
+    if offset != session.received:
+        raise UploadError(f"Expected offset {session.received}.", status=409)
+
+    reader = _HashingReader(stream, min(UPLOAD_MAX_CHUNK, session.size - offset))
+    # A fresh name per attempt: a retry may arrive while the original is still streaming.
+    name = f"{_part_dir(session)}/{offset:015d}-{uuid.uuid4().hex[:8]}.part"
+    try:
+        saved = default_storage.save(name, File(reader, name=os.path.basename(name)))
+    except UploadError:
+        default_storage.delete(name)
+        raise
+    try:
+        if reader.count == 0:
+            raise UploadError("Empty chunk.")
+        if sha256 and reader.digest.hexdigest() != sha256.strip().lower():
+            raise UploadError("Chunk checksum mismatch.", status=422)
+        with transaction.atomic():
+            locked = UploadSession.objects.select_for_update().get(pk=session.pk)
+            if locked.status != UploadSession.RECEIVING or locked.received != offset:
+                raise UploadError(f"Expected offset {locked.received}.", status=409)
+            locked.parts.append([offset, saved, reader.count])
+            locked.received = offset + reader.count
+            locked.save(update_fields=["parts", "received", "updated_at"])
+    except BaseException:
+        default_storage.delete(saved)
+        raise
+    session.parts, session.received = locked.parts, locked.received
+    return session.received
+
+
+def _build_instance(session):
+    if session.purpose == UploadSession.MATERIAL:
+        instance = CourseMaterial(
+            course_id=session.target_id,
+            title=session.metadata.get("title", "")[:200],
+            description=session.metadata.get("description") or None,
+        )
+        return instance, CourseMaterial._meta.get_field("file")
+    student = StudentProfile.objects.get(user_id=session.user_id)
+    instance = AssignmentSubmission(assignment_id=session.target_id, student=student)
+    return instance, AssignmentSubmission._meta.get_field("submitted_file")
+
+
+def complete_upload(session):
+    """Queue the assembly of a fully received upload.
+
+    The session moves to ``assembling`` first, so a retried ``complete``
+    cannot queue it twice.
+    """
+    if session.status != UploadSession.RECEIVING:
+        raise UploadError("This upload is already complete.", status=409)
+    if session.received != session.size:
+        raise UploadError(f"Only {session.received} of {session.size} bytes received.", status=409)
+    claimed = UploadSession.objects.filter(pk=session.pk, status=UploadSession.RECEIVING).update(
+        status=UploadSession.ASSEMBLING, updated_at=timezone.now(),
+    )
+    if not claimed:
+        raise UploadError("This upload is already complete.", status=409)
+    session.status = UploadSession.ASSEMBLING
+    assemble_upload.enqueue(upload_id=str(session.pk))
+
+
+@task(priority=5, max_attempts=1)
+def assemble_upload(upload_id):
+    """Job: assemble a session's parts into its material or submission.
+
+    Whatever happens, the session ends ``done`` or ``failed`` and its parts
+    are deleted: a length or checksum mismatch means the client has to
+    start over, since there is no telling which chunk was bad.
+    """
+    session = UploadSession.objects.select_related("user").filter(
+        pk=upload_id, status=UploadSession.ASSEMBLING
+    ).first()
+    if session is None:
+        return
+    try:
+        _assemble(session)
+    except UploadError as exc:
+        _finish(session, UploadSession.FAILED, str(exc))
+        return
+    except Exception:
+        _finish(session, UploadSession.FAILED, "The file could not be assembled; upload it again.")
+        raise
+    _finish(session, UploadSession.DONE)
+
+
+def _finish(session, status, error=""):
+    purge_parts(session)
+    UploadSession.objects.filter(pk=session.pk).update(
+        status=status, error=error, parts=[], completed_at=timezone.now(), updated_at=timezone.now(),
+    )
+
+
+def _assemble(session):
+    _resolve_target(session.user, session.purpose, session.target_id)
+    instance, field = _build_instance(session)
+    names = [name for _, name, _ in sorted(session.parts)]
+    reader = _HashingReader(_PartsReader(default_storage, names), session.size)
+    stored = field.storage.save(
+        field.generate_filename(instance, session.filename),
+        File(reader, name=session.filename),
+    )
+    if reader.count != session.size or (session.sha256 and reader.digest.hexdigest() != session.sha256):
+        field.storage.delete(stored)
+        raise UploadError("The assembled file does not match its size or checksum; upload it again.", status=422)
+    setattr(instance, field.name, stored)
+    try:
+        with transaction.atomic():
+            instance.save()
+    except IntegrityError:
+        field.storage.delete(stored)
+        raise UploadError("You have already submitted this assignment.", status=409) from None
+    return instance
+
+
+def upload_state(session):
+    return {
+        "upload": str(session.pk),
+        "offset": session.received,
+        "size": session.size,
+        "chunk_size": UPLOAD_CHUNK_SIZE,
+        "status": session.status,
+        "complete": session.status == UploadSession.DONE,
+        "error": session.error,
+    }
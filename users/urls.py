@@ -52,7 +52,10 @@ urlpatterns = [
         name="upload_course_material",
     ),
     path("faculty/attendance/", views.faculty_attendance, name="faculty_attendance"),
+    path("faculty/attendance/export/", views.export_attendance, name="export_attendance"),
+    path("faculty/attendance/import/", views.import_attendance, name="import_attendance"),
     path("faculty/results/", views.faculty_results, name="faculty_results"),
+    path("faculty/results/<int:course_id>/", views.course_gradebook, name="course_gradebook"),
     path("faculty/assignments/", views.faculty_assignments, name="faculty_assignments"),
     path("faculty/assignments/create/", views.create_assignment, name="create_assignment"),
     path(
@@ -60,11 +63,31 @@ urlpatterns = [
         views.view_submissions,
         name="view_submissions",
     ),
+    path(
+        "faculty/assignments/<int:assignment_id>/submissions/download/",
+        views.download_submissions,
+        name="download_submissions",
+    ),
+    path(
+        "faculty/assignments/<int:assignment_id>/missing/",
+        views.missing_submissions,
+        name="missing_submissions",
+    ),
+
+    # ---------------- Resumable Uploads ----------------
+    path("uploads/", views.upload_start, name="upload_start"),
+    path("uploads/<uuid:upload_id>/", views.upload_status, name="upload_status"),
+    path("uploads/<uuid:upload_id>/chunk/", views.upload_chunk, name="upload_chunk"),
+    path("uploads/<uuid:upload_id>/complete/", views.upload_complete, name="upload_complete"),
+
+    # ---------------- Protected Downloads ----------------
+    path("files/<str:kind>/<int:pk>/", views.download_file, name="download_file"),
 
     # ---------------- Logout ----------------
     path("logout/", views.user_logout, name="user_logout"),
 ]
 
-# Serve media files only in development
+# Serve media files only in development; everywhere else uploads go through
+# download_file, which checks access first.
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,9 +1,15 @@
+import io
+import zipfile
 from datetime import date, datetime
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.db.models import Count
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
+from django.urls import reverse
+from django.views.decorators.http import condition, require_http_methods, require_POST
 
 from .models import (
     StudentProfile,
@@ -12,16 +18,51 @@ from .models import (
     Attendance,
     Assignment,
     AssignmentSubmission,
-    CourseMaterial,
+    Assessment,
+    Mark,
+    CourseResult,
+    SemesterResult,
+    UploadSession,
 )
 from .forms import (
     StudentProfileForm,
     FacultyProfileForm,
     AssignmentForm,
     AssignmentSubmissionForm,
+    AttendanceImportForm,
+    AssessmentForm,
     CourseForm,
     CourseMaterialForm,
 )
+from .profiles import FACULTY, STUDENT, find_profile, get_role, remember_profile, require_profile
+from .caching import catalog_course, course_catalog, course_materials
+from .conditional import (
+    assignments_etag,
+    assignments_last_modified,
+    materials_etag,
+    materials_last_modified,
+)
+from .dashboards import faculty_dashboard_context, student_dashboard_context
+from .downloads import DOWNLOADS, can_download, file_response, submission_archive_members
+from .exports import stream_csv, stream_xlsx, stream_zip
+from .notifications import notify_assignment_created
+from .results import course_totals, save_marks
+from .importers import AttendanceImporter
+from .attendance import (
+    attendance_sheet,
+    save_course_attendance,
+    summary_course_stats,
+)
+from .submissions import (
+    SUBMISSION_FILTERS,
+    SUBMISSION_SORTS,
+    assignment_statuses,
+    missing_students,
+    student_assignments,
+    submission_counts,
+    submission_page,
+)
+from .uploads import UploadError, complete_upload, start_upload, upload_state, write_chunk
 
 # ---------------- Landing ----------------
 def landing(request):
@@ -42,7 +83,7 @@ def student_register(request):
             messages.error(request, "Username already exists.")
         else:
             user = User.objects.create_user(username=username, email=email, password=password)
-            StudentProfile.objects.get_or_create(user=user)
+            StudentProfile.objects.create(user=user)
             messages.success(request, "Student registration successful.")
             return redirect("student_login")
     return render(request, "users/student_register.html")
@@ -60,7 +101,7 @@ def faculty_register(request):
             messages.error(request, "Username already exists.")
         else:
             user = User.objects.create_user(username=username, email=email, password=password)
-            FacultyProfile.objects.get_or_create(user=user)
+            FacultyProfile.objects.create(user=user)
             messages.success(request, "Faculty registration successful.")
             return redirect("faculty_login")
     return render(request, "users/faculty_register.html")
@@ -68,30 +109,34 @@ def faculty_register(request):
 
 # ---------------- Login ----------------
 def student_login(request):
-    if request.user.is_authenticated and hasattr(request.user, "studentprofile"):
+    if request.user.is_authenticated and get_role(request) == STUDENT:
         return redirect("student_dashboard")
 
     if request.method == "POST":
         username = request.POST.get("username", "").strip()
         password = request.POST.get("password", "")
         user = authenticate(request, username=username, password=password)
-        if user and hasattr(user, "studentprofile"):
+        profile = find_profile(user, STUDENT) if user else None
+        if profile:
             login(request, user)
+            remember_profile(request, STUDENT, profile)
             return redirect("student_dashboard")
         messages.error(request, "Invalid credentials or not a student.")
     return render(request, "users/student_login.html")
 
 
 def faculty_login(request):
-    if request.user.is_authenticated and hasattr(request.user, "facultyprofile"):
+    if request.user.is_authenticated and get_role(request) == FACULTY:
         return redirect("faculty_dashboard")
 
     if request.method == "POST":
         username = request.POST.get("username", "").strip()
         password = request.POST.get("password", "")
         user = authenticate(request, username=username, password=password)
-        if user and hasattr(user, "facultyprofile"):
+        profile = find_profile(user, FACULTY) if user else None
+        if profile:
             login(request, user)
+            remember_profile(request, FACULTY, profile)
             return redirect("faculty_dashboard")
         messages.error(request, "Invalid credentials or not a faculty.")
     return render(request, "users/faculty_login.html")
@@ -100,26 +145,26 @@ def faculty_login(request):
 # ---------------- Dashboards ----------------
 @login_required
 def student_dashboard(request):
-    student = get_object_or_404(StudentProfile, user=request.user)
-    return render(request, "users/student_dashboard.html", {"student": student})
+    student = require_profile(request, STUDENT)
+    return render(request, "users/student_dashboard.html", student_dashboard_context(student))
 
 
 @login_required
 def faculty_dashboard(request):
-    faculty = get_object_or_404(FacultyProfile, user=request.user)
-    return render(request, "users/faculty_dashboard.html", {"faculty": faculty})
+    faculty = require_profile(request, FACULTY)
+    return render(request, "users/faculty_dashboard.html", faculty_dashboard_context(faculty))
 
 
 # ---------------- Profiles ----------------
 @login_required
 def student_profile(request):
-    student = get_object_or_404(StudentProfile, user=request.user)
+    student = require_profile(request, STUDENT)
     return render(request, "users/student_profile.html", {"student": student})
 
 
 @login_required
 def edit_student_profile(request):
-    student = get_object_or_404(StudentProfile, user=request.user)
+    student = require_profile(request, STUDENT)
     if request.method == "POST":
         form = StudentProfileForm(request.POST, request.FILES, instance=student)
         if form.is_valid():
@@ -133,13 +178,13 @@ def edit_student_profile(request):
 
 @login_required
 def faculty_profile(request):
-    faculty = get_object_or_404(FacultyProfile, user=request.user)
+    faculty = require_profile(request, FACULTY)
     return render(request, "users/faculty_profile.html", {"faculty": faculty})
 
 
 @login_required
 def edit_faculty_profile(request):
-    faculty = get_object_or_404(FacultyProfile, user=request.user)
+    faculty = require_profile(request, FACULTY)
     if request.method == "POST":
         form = FacultyProfileForm(request.POST, request.FILES, instance=faculty)
         if form.is_valid():
@@ -154,32 +199,27 @@ def edit_faculty_profile(request):
 # ---------------- Student Pages ----------------
 @login_required
 def courses_page(request):
-    student = get_object_or_404(StudentProfile, user=request.user)
-    courses = Course.objects.all()
+    student = require_profile(request, STUDENT)
+    courses = course_catalog()
     return render(request, "users/courses.html", {"student": student, "courses": courses})
 
 
 @login_required
+@condition(etag_func=materials_etag, last_modified_func=materials_last_modified)
 def view_course_materials(request, course_id):
-    course = get_object_or_404(Course, id=course_id)
-    materials = CourseMaterial.objects.filter(course=course)
+    course = catalog_course(course_id)
+    if course is None:
+        raise Http404("No course matches the given query.")
+    materials = course_materials(course.id)
     return render(request, "users/view_course_materials.html", {"course": course, "materials": materials})
 
 
 @login_required
 def attendance_page(request):
-    student = get_object_or_404(StudentProfile, user=request.user)
-    records = Attendance.objects.filter(student=student).order_by("date")
-    course_stats = {}
-    for rec in records:
-        c = rec.course
-        course_stats.setdefault(c, {"total": 0, "present": 0})
-        course_stats[c]["total"] += 1
-        if rec.status == "Present":
-            course_stats[c]["present"] += 1
-    for c, stats in course_stats.items():
-        total = stats["total"]
-        stats["percentage"] = round((stats["present"] / total) * 100, 2) if total else 0
+    student = require_profile(request, STUDENT)
+    course_stats = summary_course_stats(student)
+    # Lazy: only hits the database if the template lists individual records.
+    records = Attendance.objects.filter(student=student).select_related("course").order_by("date")
     return render(
         request,
         "users/attendance.html",
@@ -189,30 +229,46 @@ def attendance_page(request):
 
 @login_required
 def results_page(request):
-    student = get_object_or_404(StudentProfile, user=request.user)
-    courses = Course.objects.all()
-    return render(request, "users/results.html", {"student": student, "courses": courses})
+    student = require_profile(request, STUDENT)
+    courses = course_catalog()
+    course_results = (
+        CourseResult.objects.filter(student=student).select_related("course").order_by("semester", "course__code")
+    )
+    return render(
+        request,
+        "users/results.html",
+        {
+            "student": student,
+            "courses": courses,
+            "course_results": course_results,
+            "semester_results": SemesterResult.objects.filter(student=student),
+        },
+    )
 
 
 # ---------------- Student Assignments ----------------
 @login_required
+@condition(etag_func=assignments_etag, last_modified_func=assignments_last_modified)
 def assignments_page(request):
-    student = get_object_or_404(StudentProfile, user=request.user)
-    assignments = Assignment.objects.filter(course__in=student.course_set.all())
-    submission_status = {
-        a.id: AssignmentSubmission.objects.filter(assignment=a, student=student).first()
-        for a in assignments
-    }
+    student = require_profile(request, STUDENT)
+    assignments = list(student_assignments(student))
+    statuses = assignment_statuses(assignments)
+    submission_status = {row.assignment.id: row.submission for row in statuses}
     return render(
         request,
         "users/assignments_page.html",
-        {"student": student, "assignments": assignments, "submission_status": submission_status},
+        {
+            "student": student,
+            "assignments": assignments,
+            "assignment_statuses": statuses,
+            "submission_status": submission_status,
+        },
     )
 
 
 @login_required
 def submit_assignment(request, assignment_id):
-    student = get_object_or_404(StudentProfile, user=request.user)
+    student = require_profile(request, STUDENT)
     assignment = get_object_or_404(Assignment, id=assignment_id)
     submission = AssignmentSubmission.objects.filter(assignment=assignment, student=student).first()
     submitted = submission is not None
@@ -239,14 +295,14 @@ def submit_assignment(request, assignment_id):
 # ---------------- Faculty Pages ----------------
 @login_required
 def faculty_courses(request):
-    faculty = get_object_or_404(FacultyProfile, user=request.user)
+    faculty = require_profile(request, FACULTY)
     courses = Course.objects.filter(faculty=faculty)
     return render(request, "users/faculty_courses.html", {"faculty": faculty, "courses": courses})
 
 
 @login_required
 def create_course(request):
-    faculty = get_object_or_404(FacultyProfile, user=request.user)
+    faculty = require_profile(request, FACULTY)
     if request.method == "POST":
         form = CourseForm(request.POST)
         if form.is_valid():
@@ -263,7 +319,7 @@ def create_course(request):
 @login_required
 def upload_course_material(request, course_id):
     """Upload course material (with file)."""
-    faculty = get_object_or_404(FacultyProfile, user=request.user)
+    faculty = require_profile(request, FACULTY)
     course = get_object_or_404(Course, id=course_id, faculty=faculty)
     if request.method == "POST":
         form = CourseMaterialForm(request.POST, request.FILES)
@@ -284,7 +340,7 @@ def upload_course_material(request, course_id):
 
 @login_required
 def faculty_attendance(request):
-    faculty = get_object_or_404(FacultyProfile, user=request.user)
+    faculty = require_profile(request, FACULTY)
     courses = Course.objects.filter(faculty=faculty)
     selected_course_id = request.GET.get("course")
     selected_date_str = request.GET.get("date")
@@ -296,21 +352,20 @@ def faculty_attendance(request):
     attendance_records = {}
     if selected_course_id:
         course = get_object_or_404(Course, id=selected_course_id, faculty=faculty)
-        students = StudentProfile.objects.filter(course=course)  # FIXED: only course students
-        attendance_records = {
-            att.student.id: att.status
-            for att in Attendance.objects.filter(course=course, date=selected_date)
+        students = StudentProfile.objects.enrolled_in(course).select_related("user").order_by("roll_no", "id")
+        existing = {
+            att.student_id: att
+            for att in Attendance.objects.filter(course=course, date=selected_date).only("id", "student_id", "status")
         }
+        attendance_records = {student_id: att.status for student_id, att in existing.items()}
         if request.method == "POST":
-            for s in students:
-                status = request.POST.get(f"status_{s.id}", "Absent")
-                Attendance.objects.update_or_create(
-                    student=s,
-                    course=course,
-                    date=selected_date,
-                    defaults={"status": status},
-                )
-            messages.success(request, f"Attendance for {course.name} on {selected_date} saved.")
+            statuses = {s.id: request.POST.get(f"status_{s.id}", Attendance.ABSENT) for s in students}
+            try:
+                save_course_attendance(course, selected_date, statuses, existing=existing)
+            except ValueError as exc:
+                messages.error(request, str(exc))
+            else:
+                messages.success(request, f"Attendance for {course.name} on {selected_date} saved.")
             return redirect(f"{request.path}?course={course.id}&date={selected_date}")
     return render(
         request,
@@ -326,22 +381,125 @@ def faculty_attendance(request):
     )
 
 
+@login_required
+def export_attendance(request):
+    """Stream a course's attendance as a student x date sheet (``format=csv`` or ``xlsx``)."""
+    faculty = require_profile(request, FACULTY)
+    try:
+        course_id = int(request.GET.get("course", ""))
+        semester = int(request.GET["semester"]) if request.GET.get("semester") else None
+        start = datetime.strptime(request.GET["start"], "%Y-%m-%d").date() if request.GET.get("start") else None
+        end = datetime.strptime(request.GET["end"], "%Y-%m-%d").date() if request.GET.get("end") else None
+    except ValueError:
+        return HttpResponseBadRequest("Invalid course, semester or date.")
+    course = get_object_or_404(Course, id=course_id, faculty=faculty)
+    header, rows = attendance_sheet(course, semester=semester, start=start, end=end)
+    filename = f"attendance-{course.code}" + (f"-sem{semester}" if semester else "")
+    if request.GET.get("format") == "xlsx":
+        return stream_xlsx(f"{filename}.xlsx", header, rows, sheet_name=course.code)
+    return stream_csv(f"{filename}.csv", header, rows)
+
+
+@login_required
+def import_attendance(request):
+    """Upload a biometric CSV dump into the faculty member's own courses."""
+    faculty = require_profile(request, FACULTY)
+    report = None
+    status = 200
+    if request.method == "POST":
+        form = AttendanceImportForm(request.POST, request.FILES, faculty=faculty)
+        if form.is_valid():
+            course = form.cleaned_data["course"]
+            importer = AttendanceImporter(course=course, courses=Course.objects.filter(faculty=faculty))
+            lines = io.TextIOWrapper(form.cleaned_data["file"].file, encoding="utf-8-sig", newline="")
+            report = importer.run(lines)
+            if report.errors:
+                messages.warning(
+                    request, f"Imported {report.written} of {report.rows} rows; {len(report.errors)} rows had errors."
+                )
+            else:
+                messages.success(
+                    request, f"Imported {report.written} attendance rows; {report.existing} were already up to date."
+                )
+        else:
+            status = 400  # An unknown course or a missing file.
+    else:
+        form = AttendanceImportForm(faculty=faculty)
+    return render(
+        request,
+        "users/import_attendance.html",
+        {"faculty": faculty, "form": form, "report": report},
+        status=status,
+    )
+
+
 @login_required
 def faculty_results(request):
-    faculty = get_object_or_404(FacultyProfile, user=request.user)
-    courses = Course.objects.filter(faculty=faculty)
+    faculty = require_profile(request, FACULTY)
+    courses = Course.objects.filter(faculty=faculty).annotate(assessment_count=Count("assessments"))
     return render(request, "users/faculty_results.html", {"faculty": faculty, "courses": courses})
 
 
+@login_required
+def course_gradebook(request, course_id):
+    """Assessments x students grid for one course, with live weighted totals and grades."""
+    faculty = require_profile(request, FACULTY)
+    course = get_object_or_404(Course, id=course_id, faculty=faculty)
+    assessments = list(Assessment.objects.filter(course=course))
+    students = list(StudentProfile.objects.enrolled_in(course).select_related("user").order_by("roll_no", "id"))
+    form = AssessmentForm()
+    if request.method == "POST":
+        if "add_assessment" in request.POST:
+            form = AssessmentForm(request.POST)
+            if form.is_valid():
+                assessment = form.save(commit=False)
+                assessment.course = course
+                assessment.position = len(assessments)
+                assessment.save()
+                messages.success(request, f"Added {assessment.title}.")
+                return redirect("course_gradebook", course_id=course.id)
+        else:
+            # One column per POST: ``assessment`` names it, ``mark_<student id>`` holds each cell.
+            assessment = next((a for a in assessments if str(a.pk) == request.POST.get("assessment")), None)
+            if assessment is None:
+                raise Http404("No such assessment in this course.")
+            entries = {student.pk: request.POST.get(f"mark_{student.pk}") for student in students}
+            try:
+                saved = save_marks(assessment, students, entries)
+            except ValueError as exc:
+                messages.error(request, str(exc))
+            else:
+                messages.success(request, f"Saved {saved} {assessment.title} marks for {course.code}.")
+                return redirect("course_gradebook", course_id=course.id)
+
+    scores = {
+        (assessment_id, student_id): score
+        for assessment_id, student_id, score in Mark.objects.filter(
+            assessment__course=course, student__in=students
+        ).values_list("assessment_id", "student_id", "score")
+    }
+    totals = course_totals(course, students, assessments, scores)
+    rows = [
+        (student, [scores.get((assessment.pk, student.pk)) for assessment in assessments], totals.get(student.pk))
+        for student in students
+    ]
+    return render(
+        request,
+        "users/course_gradebook.html",
+        {"faculty": faculty, "course": course, "assessments": assessments, "rows": rows, "form": form},
+    )
+
+
 @login_required
 def create_assignment(request):
-    faculty = get_object_or_404(FacultyProfile, user=request.user)
+    faculty = require_profile(request, FACULTY)
     if request.method == "POST":
         form = AssignmentForm(request.POST, request.FILES)
         if form.is_valid():
             assignment = form.save(commit=False)
-            if assignment.course.faculty == faculty:
+            if assignment.course.faculty_id == faculty.pk:
                 assignment.save()
+                notify_assignment_created.enqueue(assignment_id=assignment.pk)
                 messages.success(request, "Assignment created successfully.")
                 return redirect("faculty_assignments")
             messages.error(request, "Invalid course selection.")
@@ -352,7 +510,7 @@ def create_assignment(request):
 
 @login_required
 def faculty_assignments(request):
-    faculty = get_object_or_404(FacultyProfile, user=request.user)
+    faculty = require_profile(request, FACULTY)
     courses = Course.objects.filter(faculty=faculty)
     assignments = Assignment.objects.filter(course__faculty=faculty)
     form = AssignmentForm()
@@ -365,14 +523,176 @@ def faculty_assignments(request):
 
 @login_required
 def view_submissions(request, assignment_id):
-    faculty = get_object_or_404(FacultyProfile, user=request.user)
+    faculty = require_profile(request, FACULTY)
     assignment = get_object_or_404(Assignment, id=assignment_id, course__faculty=faculty)
-    submissions = AssignmentSubmission.objects.filter(assignment=assignment)
+    sort = request.GET.get("sort", "submitted_at")
+    if sort not in SUBMISSION_SORTS:
+        sort = "submitted_at"
+    status = request.GET.get("status", "all")
+    if status not in SUBMISSION_FILTERS:
+        status = "all"
+    try:
+        submissions, next_cursor = submission_page(assignment, sort, status, request.GET.get("after"))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid page cursor.")
     return render(
         request,
         "users/view_submissions.html",
-        {"faculty": faculty, "assignment": assignment, "submissions": submissions},
+        {
+            "faculty": faculty,
+            "assignment": assignment,
+            "submissions": submissions,
+            "next_cursor": next_cursor,
+            "sort": sort,
+            "status": status,
+            "counts": submission_counts(assignment),
+        },
+    )
+
+
+@login_required
+def download_submissions(request, assignment_id):
+    """Every file submitted for an assignment, streamed as one ZIP archive.
+
+    Members are stored uncompressed: submissions are mostly PDFs and Office
+    files, which are compressed already, and storing keeps the worker's CPU
+    and memory flat however large the assignment is.
+    """
+    faculty = require_profile(request, FACULTY)
+    assignment = get_object_or_404(
+        Assignment.objects.select_related("course"), id=assignment_id, course__faculty=faculty
+    )
+    filename = f"{assignment.course.code}-assignment-{assignment.id}-submissions.zip"
+    return stream_zip(filename, submission_archive_members(assignment), compression=zipfile.ZIP_STORED)
+
+
+@login_required
+def missing_submissions(request, assignment_id):
+    """Enrolled students who have not submitted; ``?format=csv`` streams the full list."""
+    faculty = require_profile(request, FACULTY)
+    assignment = get_object_or_404(
+        Assignment.objects.select_related("course"), id=assignment_id, course__faculty=faculty
     )
+    if request.GET.get("format") == "csv":
+        rows = (
+            missing_students(assignment)
+            .order_by("roll_no", "id")
+            .values_list("roll_no", "user__username", "user__first_name", "user__last_name", "user__email")
+            .iterator(chunk_size=2000)
+        )
+        return stream_csv(
+            f"missing-{assignment.course.code}-{assignment.id}.csv",
+            ["roll_no", "username", "first_name", "last_name", "email"],
+            rows,
+        )
+    try:
+        students, next_cursor = submission_page(assignment, "roll_no", "missing", request.GET.get("after"))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid page cursor.")
+    return render(
+        request,
+        "users/missing_submissions.html",
+        {
+            "faculty": faculty,
+            "assignment": assignment,
+            "students": students,
+            "next_cursor": next_cursor,
+            "missing_count": missing_students(assignment).count(),
+        },
+    )
+
+
+# ---------------- Resumable Uploads ----------------
+def _upload_response(session, status=200, **extra):
+    state = upload_state(session)
+    state["chunk_url"] = reverse("upload_chunk", args=[session.pk])
+    state["complete_url"] = reverse("upload_complete", args=[session.pk])
+    state["status_url"] = reverse("upload_status", args=[session.pk])
+    return JsonResponse({**state, **extra}, status=status)
+
+
+@login_required
+@require_POST
+def upload_start(request):
+    """Open a resumable upload; the file itself follows in chunks."""
+    metadata = {key: request.POST[key] for key in ("title", "description") if request.POST.get(key)}
+    try:
+        session = start_upload(
+            request.user,
+            request.POST.get("purpose"),
+            request.POST.get("target"),
+            request.POST.get("filename"),
+            request.POST.get("size"),
+            sha256=request.POST.get("sha256", ""),
+            metadata=metadata,
+        )
+    except UploadError as exc:
+        return JsonResponse({"error": str(exc)}, status=exc.status)
+    return _upload_response(session, status=201)
+
+
+@login_required
+@require_http_methods(["PUT", "POST"])
+def upload_chunk(request, upload_id):
+    """Append the raw request body at the ``Upload-Offset`` header's position."""
+    session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        return JsonResponse({"error": "Upload-Offset header is required.", "offset": session.received}, status=400)
+    try:
+        write_chunk(session, offset, request, sha256=request.headers.get("Upload-Checksum", ""))
+    except UploadError as exc:
+        session.refresh_from_db()
+        return JsonResponse({"error": str(exc), "offset": session.received}, status=exc.status)
+    return _upload_response(session)
+
+
+@login_required
+def upload_status(request, upload_id):
+    """Where to resume while chunks arrive; whether assembly has finished once they have."""
+    session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+    if session.status != UploadSession.DONE:
+        return _upload_response(session)
+    # Clients poll, and may do so again after ``done``: only the first poll flashes.
+    first = not session.acknowledged and UploadSession.objects.filter(
+        pk=session.pk, acknowledged=False
+    ).update(acknowledged=True)
+    if session.purpose == UploadSession.MATERIAL:
+        if first:
+            messages.success(request, "Material uploaded successfully.")
+        redirect_to = reverse("faculty_courses")
+    else:
+        if first:
+            messages.success(request, "Assignment submitted successfully.")
+        redirect_to = reverse("assignments_page")
+    return _upload_response(session, redirect=redirect_to)
+
+
+@login_required
+@require_POST
+def upload_complete(request, upload_id):
+    """Queue the assembly of the chunks; the client then polls ``upload_status``."""
+    session = get_object_or_404(UploadSession, pk=upload_id, user=request.user)
+    try:
+        complete_upload(session)
+    except UploadError as exc:
+        return JsonResponse({"error": str(exc)}, status=exc.status)
+    return _upload_response(session, status=202)
+
+
+# ---------------- Protected Downloads ----------------
+@login_required
+def download_file(request, kind, pk):
+    """Serve an uploaded file to the users allowed to see it."""
+    if kind not in DOWNLOADS:
+        raise Http404("Unknown download.")
+    model, field_name, related = DOWNLOADS[kind]
+    obj = get_object_or_404(model.objects.select_related(*related), pk=pk)
+    field_file = getattr(obj, field_name)
+    if not field_file or not can_download(request, kind, obj):
+        raise Http404("File not found.")
+    return file_response(request, field_file)
 
 
 # ---------------- Logout ----------------